@@ -9,7 +9,15 @@ import os
 import sys
 import logging
 from datetime import datetime
-import boto3
+
+from src.repositories.idempotency_store import get_idempotency_store
+from src.services.chat_stream import stream_to_client
+from src.services.connection_session import ConnectionClosedError, ConnectionSession
+from src.services.context_builder import build_messages
+from src.services.generation import finish_generation, new_generation_id, start_generation
+from src.services.idempotency import claim_request, complete_request, scoped_key, serve_duplicate
+from src.services.llm_provider import get_provider
+from src.services.prompt_service import build_system_prompt
 
 # Windows asyncio 문제 해결
 if sys.platform == 'win32':
@@ -18,137 +26,115 @@ if sys.platform == 'win32':
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# AWS 설정
-AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
-BEDROCK_CONFIG = {
-    'region_name': AWS_REGION,
-    'model_id': 'us.anthropic.claude-opus-4-5-20251101-v1:0',
-    'max_tokens': int(os.environ.get('BEDROCK_MAX_TOKENS', '4000')),
-    'temperature': float(os.environ.get('BEDROCK_TEMPERATURE', '0.7')),
-    'top_p': float(os.environ.get('BEDROCK_TOP_P', '0.9')),
-    'top_k': int(os.environ.get('BEDROCK_TOP_K', '50')),
-    'anthropic_version': os.environ.get('ANTHROPIC_VERSION', 'bedrock-2023-05-31')
-}
+# 스트리밍 프로바이더 (LLM_PROVIDER 미설정 시 Bedrock)
+llm_provider = get_provider()
+# 재연결 후 다시 보낸 sendMessage 중복 제거
+idempotency_store = get_idempotency_store('memory')
 
-# Bedrock Runtime 클라이언트 초기화
-bedrock_runtime = boto3.client('bedrock-runtime', region_name=AWS_REGION)
+async def generate_claude_response(session, message, engine, history=None, stop=None):
+    """Claude 응답 생성 및 스트리밍 (stop 이 설정되면 중단하고 stopped 로 종료 알림)
 
-async def generate_claude_response(websocket, message, engine):
-    """AWS Bedrock Claude 3.5 Sonnet을 사용한 AI 응답 생성 및 스트리밍"""
+    스트리밍 결과를 반환하고, 생성 오류로 끝나면 None.
+    """
     
-    print(f"=== AWS Bedrock Claude 서비스 시작 ===")
+    print(f"=== Claude 서비스 시작 ({llm_provider.name}) ===")
     print(f"Message: {message[:100]}...")
     print(f"Engine: {engine}")
-    print(f"Model ID: {BEDROCK_CONFIG['model_id']}")
+    
+    # 한 연결에서 여러 생성이 동시에 진행될 수 있으므로 프레임마다 generationId 표시
+    send = session.sender(generationId=stop.generation_id) if stop else session.send
     
     try:
-        # Bedrock 요청 본문 구성
-        body = {
-            "anthropic_version": BEDROCK_CONFIG['anthropic_version'],
-            "max_tokens": BEDROCK_CONFIG['max_tokens'],
-            "temperature": BEDROCK_CONFIG['temperature'],
-            "messages": [{
-                "role": "user",
-                "content": message
-            }],
-            "top_k": BEDROCK_CONFIG['top_k'],
-            "top_p": BEDROCK_CONFIG['top_p']
-        }
-        
-        print(f"AWS Bedrock 요청 전송 중...")
-        
-        # Bedrock 스트리밍 호출
-        response = bedrock_runtime.invoke_model_with_response_stream(
-            modelId=BEDROCK_CONFIG['model_id'],
-            body=json.dumps(body)
+        system = build_system_prompt(engine)
+        messages = build_messages(message, history, engine_type=engine, system=system)
+        result = await stream_to_client(
+            send, llm_provider, messages, engine_type=engine, stop=stop, system=system
         )
-        
-        print(f"AWS Bedrock 응답 수신 시작")
-        
-        chunk_index = 0
-        stream = response.get('body')
-        
-        if stream:
-            for event in stream:
-                chunk = event.get('chunk')
-                if chunk:
-                    chunk_obj = json.loads(chunk.get('bytes').decode())
-                    print(f"Chunk type: {chunk_obj.get('type')}")
-                    
-                    if chunk_obj.get('type') == 'content_block_delta':
-                        delta = chunk_obj.get('delta', {})
-                        if delta.get('type') == 'text_delta':
-                            text = delta.get('text', '')
-                            if text:
-                                print(f"Sending chunk {chunk_index}: {text[:50]}...")
-                                await websocket.send(json.dumps({
-                                    "type": "ai_chunk",
-                                    "chunk": text,
-                                    "chunk_index": chunk_index
-                                }))
-                                chunk_index += 1
-                    
-                    elif chunk_obj.get('type') == 'message_stop':
-                        print("Message stop received")
-                        break
+        chunk_index = result.total_chunks
+        usage = result.usage
         
         print(f"Total chunks sent: {chunk_index}")
+        logger.info(f"LLM usage totals: {llm_provider.usage_stats()}")
         
         # 스트리밍 완료
-        await websocket.send(json.dumps({
+        await send({
             "type": "chat_end",
             "total_chunks": chunk_index,
-            "engine": engine
-        }))
+            "engine": engine,
+            "usage": usage,
+            "cached": result.cached,
+            "stopped": result.stopped
+        })
         
-        print("=== AWS Bedrock Claude 서비스 완료 ===")
+        print("=== Claude 서비스 완료 ===")
+        return result
         
+    except ConnectionClosedError:
+        raise
+    
     except Exception as e:
-        print(f"AWS Bedrock API 오류: {e}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"LLM 스트리밍 오류: {e}", exc_info=True)
+        
+        await send({
+            "type": "error",
+            "message": f"AI 응답 생성 중 오류: {str(e)}"
+        })
+        return None
+    
+    finally:
+        if stop is not None:
+            finish_generation(stop)
+
+async def dispatch(session, data):
+    """요청 1건 처리 (연결 세션이 요청마다 태스크로 실행)"""
+    action = data.get('action', 'sendMessage')
+    
+    if action == 'sendMessage':
+        user_message = data.get('message', '')
+        engine_type = data.get('engineType', 'claude')
+        idempotency_key = scoped_key(data.get('idempotencyKey'), data.get('userId') or session.connection_id)
+        
+        generation_id = new_generation_id()
+        duplicate = claim_request(idempotency_store, idempotency_key, generation_id)
+        if duplicate is not None:
+            # 재연결 후 다시 보낸 요청 - 새로 생성하지 않고 첫 요청의 응답을 받는다
+            await serve_duplicate(
+                session.sender(generationId=duplicate['generationId']),
+                idempotency_store, idempotency_key, duplicate, engine=engine_type
+            )
+            return
         
-        await websocket.send(json.dumps({
+        stop = start_generation(session.connection_id, generation_id=generation_id)
+        
+        # AI 시작 알림
+        await session.send({
+            "type": "ai_start",
+            "generationId": stop.generation_id,
+            "timestamp": datetime.utcnow().isoformat() + 'Z'
+        })
+        
+        # Claude 응답 생성
+        result = None
+        try:
+            result = await generate_claude_response(
+                session, user_message, engine_type, data.get('conversationHistory'), stop
+            )
+        finally:
+            complete_request(idempotency_store, idempotency_key, result)
+        
+    else:
+        await session.send({
             "type": "error",
-            "message": f"AWS Bedrock AI 응답 생성 중 오류: {str(e)}"
-        }))
+            "message": f"Unknown action: {action}"
+        })
 
 async def handle_websocket(websocket, path):
     logger.info("New WebSocket connection")
     
     try:
-        async for message in websocket:
-            try:
-                data = json.loads(message)
-                action = data.get('action', 'sendMessage')
-                
-                if action == 'sendMessage':
-                    user_message = data.get('message', '')
-                    engine_type = data.get('engineType', 'claude')
-                    
-                    # AI 시작 알림
-                    await websocket.send(json.dumps({
-                        "type": "ai_start",
-                        "timestamp": datetime.utcnow().isoformat() + 'Z'
-                    }))
-                    
-                    # Claude 응답 생성
-                    await generate_claude_response(websocket, user_message, engine_type)
-                    
-                else:
-                    await websocket.send(json.dumps({
-                        "type": "error",
-                        "message": f"Unknown action: {action}"
-                    }))
-                    
-            except Exception as e:
-                logger.error(f"Error: {e}")
-                await websocket.send(json.dumps({
-                    "type": "error",
-                    "message": f"오류: {str(e)}"
-                }))
-                
+        # 생성 중에도 ping/stopGeneration/다른 요청을 읽고, 송신은 연결당 writer 하나가 순서대로 처리
+        await ConnectionSession(websocket).serve(dispatch)
+        
     except websockets.exceptions.ConnectionClosed:
         logger.info("Connection closed")
 
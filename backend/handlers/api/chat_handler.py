@@ -1,6 +1,6 @@
 import json
-import os
-import anthropic
+
+from src.services.llm_provider import get_provider, run_sync
 
 def lambda_handler(event, context):
     """채팅 API 핸들러"""
@@ -30,27 +30,21 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': '메시지가 필요합니다'})
             }
         
-        # Claude API 호출
-        client = anthropic.Anthropic(
-            api_key=os.environ.get('CLAUDE_API_KEY')
-        )
-        
-        response = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=4000,
-            messages=[{
-                "role": "user",
-                "content": message
-            }]
-        )
+        # Claude API 호출 (프로바이더 공유 - 웜 호출 간 연결 재사용)
+        provider = get_provider(default='anthropic')
+        response_text, usage = run_sync(provider.complete([{
+            "role": "user",
+            "content": message
+        }]))
         
         # 응답 반환
         return {
             'statusCode': 200,
             'headers': headers,
             'body': json.dumps({
-                'response': response.content[0].text,
-                'engine': 'claude'
+                'response': response_text,
+                'engine': 'claude',
+                'usage': usage
             })
         }
         
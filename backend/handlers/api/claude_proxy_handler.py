@@ -1,8 +1,9 @@
 import json
 import os
-import requests
 from typing import Dict, Any
 
+from src.clients import get_http_session
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Claude API 프록시 Lambda 핸들러"""
     
@@ -42,7 +43,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             }
         
         # Claude API 요청
-        claude_response = requests.post(
+        claude_response = get_http_session().post(
             'https://api.anthropic.com/v1/messages',
             headers={
                 'Content-Type': 'application/json',
@@ -14,6 +14,14 @@ from utils.logger import setup_logger
 # 로깅 설정
 logger = setup_logger(__name__)
 
+# 목록 조회 페이지 크기 (limit 미지정 시 기존과 동일하게 최대치 반환)
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+
+# 일괄 조회(ids) 최대 대화 수와 대화별 메시지 수 (전체 이력은 상세 조회의 beforeSequence로)
+MAX_BATCH_IDS = 100
+DEFAULT_BATCH_MESSAGE_LIMIT = 20
+MAX_BATCH_MESSAGE_LIMIT = 100
 
 
 def handler(event, context):
@@ -41,8 +49,39 @@ def handler(event, context):
         # Service 초기화
         conversation_service = ConversationService()
         
+        # GET /conversations?ids=a,b,c - 일괄 조회 (탭 복원, 최근 대화 프리페치)
+        if http_method == 'GET' and not path_params and (event.get('queryStringParameters') or {}).get('ids'):
+            query_params = event['queryStringParameters']
+            user_id = query_params.get('userId')
+            ids = [i.strip() for i in query_params['ids'].split(',') if i.strip()]
+            ids = list(dict.fromkeys(ids))
+            
+            if not user_id:
+                return APIResponse.error('userId is required', 400)
+            
+            if len(ids) > MAX_BATCH_IDS:
+                return APIResponse.error(f'Too many ids (max {MAX_BATCH_IDS})', 400)
+            
+            try:
+                message_limit = int(query_params.get('messageLimit') or DEFAULT_BATCH_MESSAGE_LIMIT)
+            except ValueError:
+                return APIResponse.error('messageLimit must be an integer', 400)
+            message_limit = max(1, min(message_limit, MAX_BATCH_MESSAGE_LIMIT))
+            
+            # 다른 사용자의 대화는 메시지를 읽기 전에 제외 (missing으로 표시)
+            conversations = conversation_service.get_conversations(
+                ids, message_limit=message_limit, user_id=user_id
+            )
+            
+            found_ids = {c.conversation_id for c in conversations}
+            return APIResponse.success({
+                'conversations': [conv.to_dict() for conv in conversations],
+                'count': len(conversations),
+                'missing': [i for i in ids if i not in found_ids]
+            })
+        
         # GET /conversations - 목록 조회
-        if http_method == 'GET' and not path_params:
+        elif http_method == 'GET' and not path_params:
             # 쿼리 파라미터에서 userId와 engineType 추출
             query_params = event.get('queryStringParameters', {}) or {}
             user_id = query_params.get('userId')
@@ -51,29 +90,50 @@ def handler(event, context):
             if not user_id:
                 return APIResponse.error('userId is required', 400)
             
-            # get_user_conversations 메서드 사용
-            conversations = conversation_service.get_user_conversations(user_id, limit=1000)
-
-            # engine_type으로 필터링이 필요한 경우
-            if engine_type:
-                conversations = [c for c in conversations if c.engine_type == engine_type]
+            # 페이지 크기 및 커서 (nextToken은 이전 응답의 값을 그대로 전달)
+            try:
+                limit = int(query_params.get('limit') or DEFAULT_PAGE_SIZE)
+            except ValueError:
+                return APIResponse.error('limit must be an integer', 400)
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+            next_token = query_params.get('nextToken')
 
-            # updatedAt 기준으로 내림차순 정렬 (최신이 위로)
-            conversations.sort(key=lambda x: x.updated_at or x.created_at or '', reverse=True)
+            # updatedAt 내림차순으로 반환되며 engineType 필터는 조회 시 적용됨
+            try:
+                conversations, next_token = conversation_service.get_user_conversations_page(
+                    user_id,
+                    limit=limit,
+                    next_token=next_token,
+                    engine_type=engine_type
+                )
+            except ValueError as e:
+                return APIResponse.error(str(e), 400)
 
-            # to_dict 메서드로 변환
+            # 요약 모델 변환 (메시지 본문 제외)
             conversations_dict = [conv.to_dict() for conv in conversations]
 
             return APIResponse.success({
                 'conversations': conversations_dict,
-                'count': len(conversations_dict)
+                'count': len(conversations_dict),
+                'nextToken': next_token
             })
         
         # GET /conversations/{conversationId} - 상세 조회
         elif http_method == 'GET' and 'conversationId' in path_params:
+            # 메시지 범위 (messageLimit: 최근 N개, beforeSequence: 해당 순번 이전부터)
+            query_params = event.get('queryStringParameters', {}) or {}
+            try:
+                message_limit = _optional_int(query_params.get('messageLimit'))
+                before_sequence = _optional_int(query_params.get('beforeSequence'))
+            except ValueError:
+                return APIResponse.error('messageLimit and beforeSequence must be integers', 400)
+            
             conversation = conversation_service.get_conversation(
-                path_params['conversationId']
+                path_params['conversationId'],
+                message_limit=message_limit,
+                before_sequence=before_sequence
             )
+            logger.info(f"Conversation cache stats: {conversation_service.cache_stats()}")
             if conversation:
                 return APIResponse.success(conversation.to_dict())
             else:
@@ -94,28 +154,33 @@ def handler(event, context):
             if not user_id:
                 return APIResponse.error('userId is required', 400)
             
-            # conversationId가 있으면 기존 대화가 있는지 확인
-            if conversation_id:
-                existing = conversation_service.get_conversation(conversation_id)
-                if existing:
-                    # 기존 대화가 있으면 무시 (이미 저장됨)
-                    logger.info(f"Conversation {conversation_id} already exists, skipping save")
-                    return APIResponse.success({
-                        'conversationId': conversation_id,
-                        'userId': user_id,
-                        'engineType': engine_type,
-                        'title': existing.title if existing else title,
-                        'message': 'Conversation already exists'
-                    }, 200)
-            
-            # 새 대화 생성
-            saved = conversation_service.create_conversation(
+            # idempotency key: 본문 또는 Idempotency-Key 헤더
+            headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+            idempotency_key = body.get('idempotencyKey') or headers.get('idempotency-key')
+            
+            # 조건부 쓰기 1회로 생성 (이미 있으면 기존 대화 반환)
+            saved, created = conversation_service.get_or_create_conversation(
                 user_id=user_id,
                 engine_type=engine_type,
                 title=title,
-                initial_message=initial_message
+                initial_message=initial_message,
+                conversation_id=conversation_id,
+                idempotency_key=idempotency_key
             )
             
+            if not created:
+                # 다른 사용자의 대화와 ID 가 겹치면 내용을 돌려주지 않는다
+                if saved.user_id != user_id:
+                    logger.warning(f"Conversation {saved.conversation_id} belongs to another user")
+                    return APIResponse.error('Conversation already exists', 409)
+                return APIResponse.success({
+                    'conversationId': saved.conversation_id,
+                    'userId': saved.user_id,
+                    'engineType': saved.engine_type,
+                    'title': saved.title,
+                    'message': 'Conversation already exists'
+                }, 200)
+            
             # to_dict 메서드로 변환하여 반환
             return APIResponse.success(saved.to_dict(), 201)
         
@@ -160,4 +225,11 @@ def handler(event, context):
             
     except Exception as e:
         logger.error(f"Error in conversation handler: {e}", exc_info=True)
-        return APIResponse.error(str(e), 500)
\ No newline at end of file
+        return APIResponse.error(str(e), 500)
+
+
+def _optional_int(value):
+    """쿼리 파라미터를 정수로 변환 (없으면 None)"""
+    if value in (None, ''):
+        return None
+    return int(value)
@@ -1,6 +1,8 @@
 import json
 import logging
 
+from src.services.prompt_service import get_prompt_data, get_prompt_files
+
 # 로깅 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -65,13 +67,8 @@ def lambda_handler(event, context):
 def get_prompt(engine_type, headers):
     """프롬프트 정보 조회"""
     
-    # 기본 프롬프트 데이터
-    prompt_data = {
-        'engineType': engine_type,
-        'description': f'{engine_type} 엔진 전용 AI 어시스턴트',
-        'instructions': f'{engine_type} 엔진에 맞는 전문적인 답변을 제공해주세요.',
-        'files': []
-    }
+    # 모델 호출 시스템 프롬프트와 같은 데이터
+    prompt_data = get_prompt_data(engine_type)
     
     return {
         'statusCode': 200,
@@ -82,9 +79,8 @@ def get_prompt(engine_type, headers):
 def get_files(engine_type, headers):
     """파일 목록 조회"""
     
-    # 빈 파일 목록 반환
     files_data = {
-        'files': []
+        'files': get_prompt_files(engine_type)
     }
     
     return {
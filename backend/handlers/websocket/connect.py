@@ -3,11 +3,11 @@ WebSocket Connect Handler
 WebSocket 연결 처리 Lambda 핸들러
 """
 import json
-import boto3
 import logging
 import os
 from datetime import datetime
 
+from src.clients import get_resource
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -23,7 +23,7 @@ def handler(event, context):
     
     try:
         # DynamoDB에 연결 정보 저장
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+        dynamodb = get_resource('dynamodb')
         connections_table = dynamodb.Table(os.environ.get('CONNECTIONS_TABLE', 'one-connections'))
         
         connections_table.put_item(
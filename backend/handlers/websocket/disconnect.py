@@ -3,10 +3,10 @@ WebSocket Disconnect Handler
 WebSocket 연결 해제 처리 Lambda 핸들러
 """
 import json
-import boto3
 import logging
 import os
 
+from src.clients import get_resource
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -22,7 +22,7 @@ def handler(event, context):
     
     try:
         # DynamoDB에서 연결 정보 삭제
-        dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+        dynamodb = get_resource('dynamodb')
         connections_table = dynamodb.Table(os.environ.get('CONNECTIONS_TABLE', 'one-connections'))
         
         connections_table.delete_item(
@@ -2,17 +2,35 @@
 WebSocket Message Handler
 WebSocket 메시지 처리 Lambda 핸들러
 """
+import asyncio
 import json
-import boto3
 import logging
 from datetime import datetime
 
-from services.websocket_service import WebSocketService
+from src.clients import get_apigateway_client
+from src.repositories.chunk_log_store import get_chunk_log_store
+from src.repositories.chunk_upload_store import ChunkUploadError, get_chunk_upload_store
+from src.repositories.generation_store import get_generation_store
+from src.repositories.idempotency_store import get_idempotency_store
+from src.services.chat_stream import stream_to_client
+from src.services.context_builder import build_messages
+from src.services.generation import finish_generation, new_generation_id, start_generation, stop_generation
+from src.services.idempotency import claim_request, complete_request, scoped_key, serve_duplicate
+from src.services.llm_provider import get_provider, run_sync
+from src.services.message_assembler import reassemble_message
+from src.services.prompt_service import build_system_prompt
+from src.services.stream_resume import ChunkLogger, serve_resume
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+def _request_owner(event, user_id):
+    """중복 제거 키를 구분할 요청 주체 - 인증된 사용자(authorizer)가 있으면 우선 사용"""
+    authorizer = event['requestContext'].get('authorizer') or {}
+    return authorizer.get('principalId') or authorizer.get('userId') or user_id
+
+
 def handler(event, context):
     """
     WebSocket 메시지 핸들러
@@ -24,12 +42,8 @@ def handler(event, context):
     domain_name = event['requestContext']['domainName']
     stage = event['requestContext']['stage']
     
-    # API Gateway Management API 클라이언트
-    apigateway_client = boto3.client(
-        'apigatewaymanagementapi',
-        endpoint_url=f'https://{domain_name}/{stage}',
-        region_name='us-east-1'
-    )
+    # API Gateway Management API 클라이언트 (엔드포인트별로 컨테이너 내 재사용)
+    apigateway_client = get_apigateway_client(domain_name, stage)
     
     try:
         # 요청 파싱
@@ -41,6 +55,24 @@ def handler(event, context):
         
         # 메시지 전송 액션
         if action == 'sendMessage':
+            # 분할 전송된 메시지는 조각마다 다른 호출로 들어오므로 마지막 조각을 받은 호출만 처리
+            try:
+                body = reassemble_message(get_chunk_upload_store(), connection_id, body)
+            except ChunkUploadError as e:
+                send_message_to_client(connection_id, {
+                    'type': 'error',
+                    'message': str(e)
+                }, apigateway_client)
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': str(e)})
+                }
+            if body is None:
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({'message': 'Chunk received'})
+                }
+            
             user_message = body.get('message', '')
             engine_type = body.get('engineType', '11')
             conversation_id = body.get('conversationId')
@@ -48,22 +80,63 @@ def handler(event, context):
             
             logger.info(f"Processing message for {engine_type}, user: {user_id}")
             
-            # 응답 시뮬레이션 (실제로는 AI 모델 호출)
-            response_text = f"Echo: {user_message} (Engine: {engine_type})"
+            # 재연결 후 다시 보낸 요청은 새로 생성하지 않고 첫 요청의 응답을 받는다
+            # (다른 호출에서 생성 중이면 그 결과가 저장소에 기록될 때까지 기다린다)
+            idempotency_key = scoped_key(body.get('idempotencyKey'), _request_owner(event, user_id))
+            generation_id = new_generation_id()
+            duplicate = claim_request(get_idempotency_store(), idempotency_key, generation_id)
+            if duplicate is not None:
+                run_sync(serve_duplicate(
+                    client_sender(connection_id, apigateway_client, generationId=duplicate['generationId']),
+                    get_idempotency_store(), idempotency_key, duplicate,
+                    engine=engine_type, conversationId=conversation_id
+                ))
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({'message': 'Duplicate message', 'generationId': duplicate['generationId']})
+                }
+            
+            # 중단 요청은 다른 Lambda 호출로 들어오므로 상태 저장소를 통해 전달받는다
+            stop = start_generation(connection_id, store=get_generation_store(), generation_id=generation_id)
+            
+            # 연결이 끊겨도 재연결 후 resume 으로 이어받을 수 있도록 전송한 청크를 기록
+            chunk_log = ChunkLogger(get_chunk_log_store(), generation_id)
+            chunk_log.start()
             
-            # 응답 전송
             send_message_to_client(connection_id, {
-                'type': 'ai_chunk',
-                'chunk': response_text,
+                'type': 'ai_start',
+                'engine': engine_type,
+                'generationId': stop.generation_id,
+                'conversationId': conversation_id,
                 'timestamp': datetime.utcnow().isoformat() + 'Z'
             }, apigateway_client)
-            
+
+            # 생성되는 델타를 도착 즉시 전달 (전체 응답을 기다리지 않음)
+            system = build_system_prompt(engine_type)
+            messages = build_messages(
+                user_message, body.get('conversationHistory'), engine_type=engine_type, system=system
+            )
+            result = None
+            try:
+                result = run_sync(stream_reply(
+                    connection_id, messages, apigateway_client,
+                    engine_type=engine_type, stop=stop, system=system, chunk_log=chunk_log
+                ))
+            finally:
+                finish_generation(stop)
+                complete_request(get_idempotency_store(), idempotency_key, result)
+
             # 완료 알림
             send_message_to_client(connection_id, {
                 'type': 'chat_end',
                 'engine': engine_type,
                 'conversationId': conversation_id,
-                'message': '응답 생성이 완료되었습니다.',
+                'generationId': stop.generation_id,
+                'total_chunks': result.total_chunks,
+                'usage': result.usage,
+                'cached': result.cached,
+                'stopped': result.stopped,
+                'message': '응답 생성이 중단되었습니다.' if result.stopped else '응답 생성이 완료되었습니다.',
                 'timestamp': datetime.utcnow().isoformat() + 'Z'
             }, apigateway_client)
             
@@ -72,6 +145,40 @@ def handler(event, context):
                 'body': json.dumps({'message': 'Message processed successfully'})
             }
         
+        # 스트림 재개 액션 - 다른 호출에서 생성 중이어도 청크 기록을 읽으며 끝까지 이어서 전송
+        elif action == 'resume':
+            generation_id = body.get('generationId')
+            run_sync(serve_resume(
+                client_sender(connection_id, apigateway_client, generationId=generation_id),
+                generation_id, body.get('lastChunkIndex', -1), store=get_chunk_log_store()
+            ))
+            
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Resume processed'})
+            }
+        
+        # 생성 중단 액션 - 생성 중인 호출이 플러시 사이에 플래그를 확인해 chat_end(stopped) 전송
+        # (생성은 다른 호출에서 진행되므로 연결 단위 중단은 지원하지 않고 generationId 필수)
+        elif action == 'stopGeneration':
+            generation_id = body.get('generationId')
+            if not generation_id:
+                send_message_to_client(connection_id, {
+                    'type': 'error',
+                    'message': 'stopGeneration 에는 generationId 가 필요합니다.'
+                }, apigateway_client)
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'generationId is required'})
+                }
+            
+            stopped = stop_generation(generation_id, connection_id, store=get_generation_store())
+            
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'stopped': stopped})
+            }
+        
         else:
             send_message_to_client(connection_id, {
                 'type': 'error',
@@ -100,6 +207,36 @@ def handler(event, context):
         }
 
 
+async def stream_reply(
+    connection_id, messages, apigateway_client, engine_type=None, stop=None, system=None, chunk_log=None
+):
+    """LLM 응답을 병합된 청크로 클라이언트에 전달
+
+    post_to_connection 은 스레드에서 실행하고, 모델 스트림은 전송과 별개로 계속 읽는다
+    (같은 컨테이너에서 같은 요청이 진행 중이면 그 생성에 합류). chunk_log 가 있으면 전송한 청크를 기록한다.
+    """
+    send = client_sender(connection_id, apigateway_client)
+    if chunk_log is not None:
+        send = chunk_log.wrap(send)
+    
+    result = None
+    try:
+        result = await stream_to_client(
+            send, get_provider(default='anthropic'), messages, engine_type=engine_type, stop=stop, system=system
+        )
+        return result
+    finally:
+        if chunk_log is not None:
+            await chunk_log.close(result)
+
+
+def client_sender(connection_id, apigateway_client, **fields):
+    """프레임마다 필드(generationId 등)를 붙여 스레드에서 post_to_connection 하는 async send 함수"""
+    async def send(frame):
+        await asyncio.to_thread(send_message_to_client, connection_id, {**frame, **fields}, apigateway_client)
+    return send
+
+
 def send_message_to_client(connection_id, message, apigateway_client):
     """클라이언트에게 메시지 전송"""
     try:
@@ -15,177 +15,165 @@ logger = logging.getLogger(__name__)
 
 # 경로 설정
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.repositories.idempotency_store import get_idempotency_store
+from src.services.chat_stream import stream_to_client
+from src.services.connection_session import ConnectionClosedError, ConnectionSession
+from src.services.context_builder import build_messages
+from src.services.generation import finish_generation, new_generation_id, start_generation
+from src.services.idempotency import claim_request, complete_request, scoped_key, serve_duplicate
+from src.services.llm_provider import get_provider
+from src.services.prompt_service import build_system_prompt
+
+# 재연결 후 다시 보낸 sendMessage 중복 제거 (Lambda 는 DynamoDB 저장소 사용)
+idempotency_store = get_idempotency_store('memory')
 
 # 간단한 WebSocket 서비스 (의존성 최소화)
 class SimpleWebSocketService:
     def __init__(self):
         pass
     
-    def stream_response(self, user_message, engine_type, user_role='user'):
-        """간단한 응답 생성 (실제로는 Bedrock 연동)"""
-        # 여기서 실제 Bedrock 호출
-        import boto3
-        from config.aws import AWS_REGION, BEDROCK_CONFIG
-        
-        try:
-            bedrock_client = boto3.client('bedrock-runtime', region_name=AWS_REGION)
-            
-            body = {
-                "anthropic_version": BEDROCK_CONFIG['anthropic_version'],
-                "max_tokens": BEDROCK_CONFIG['max_tokens'],
-                "temperature": BEDROCK_CONFIG['temperature'],
-                "messages": [{"role": "user", "content": user_message}],
-                "top_k": BEDROCK_CONFIG['top_k'],
-                "top_p": BEDROCK_CONFIG['top_p']
-            }
-            
-            response = bedrock_client.invoke_model_with_response_stream(
-                modelId=BEDROCK_CONFIG['model_id'],
-                body=json.dumps(body)
-            )
-            
-            stream = response.get('body')
-            if stream:
-                for event in stream:
-                    chunk = event.get('chunk')
-                    if chunk:
-                        chunk_obj = json.loads(chunk.get('bytes').decode())
-                        
-                        if chunk_obj.get('type') == 'content_block_delta':
-                            delta = chunk_obj.get('delta', {})
-                            if delta.get('type') == 'text_delta':
-                                text = delta.get('text', '')
-                                if text:
-                                    yield text
-                        
-                        elif chunk_obj.get('type') == 'message_stop':
-                            break
-                            
-        except Exception as e:
-            yield f"오류: {str(e)}"
+    async def stream_response(
+        self, send, user_message, engine_type, user_role='user', conversation_history=None, stop=None
+    ):
+        """응답을 병합된 ai_chunk 프레임으로 전송 (LLM 프로바이더 사용)"""
+        system = build_system_prompt(engine_type)
+        messages = build_messages(user_message, conversation_history, engine_type=engine_type, system=system)
+        return await stream_to_client(
+            send, get_provider(), messages, engine_type=engine_type, stop=stop, system=system
+        )
 
 class MockAPIGatewayClient:
-    """API Gateway 클라이언트 모킹"""
-    def __init__(self, websocket):
-        self.websocket = websocket
+    """API Gateway 클라이언트 모킹 (연결 세션의 writer 큐로 전달)"""
+    def __init__(self, session):
+        self.session = session
     
     async def post_to_connection(self, ConnectionId, Data):
         """WebSocket으로 메시지 전송"""
-        await self.websocket.send(Data)
+        await self.session.send(json.loads(Data))
 
-async def handle_websocket(websocket, path):
-    """WebSocket 연결 처리 - 기존 핸들러 로직 사용"""
-    logger.info("New WebSocket connection")
-    
+async def dispatch(session, body):
+    """요청 1건 처리 - 기존 핸들러 로직 사용 (연결 세션이 요청마다 태스크로 실행)"""
     # WebSocket 서비스 초기화
     websocket_service = SimpleWebSocketService()
     
     # Mock API Gateway 클라이언트
-    apigateway_client = MockAPIGatewayClient(websocket)
+    apigateway_client = MockAPIGatewayClient(session)
+    
+    action = body.get('action', 'sendMessage')
+    
+    # 메시지 전송 액션
+    if action == 'sendMessage':
+        idempotency_key = scoped_key(body.get('idempotencyKey'), body.get('userId') or session.connection_id)
+        generation_id = new_generation_id()
+        duplicate = claim_request(idempotency_store, idempotency_key, generation_id)
+        if duplicate is not None:
+            # 재연결 후 다시 보낸 요청 - 새로 생성하지 않고 첫 요청의 응답을 받는다
+            await serve_duplicate(
+                session.sender(generationId=duplicate['generationId']),
+                idempotency_store, idempotency_key, duplicate,
+                engine=body.get('engineType', '11'), conversationId=body.get('conversationId')
+            )
+            return
+        
+        stop = start_generation(session.connection_id, generation_id=generation_id)
+        result = None
+        try:
+            result = await handle_send_message(body, websocket_service, apigateway_client, stop)
+        finally:
+            complete_request(idempotency_store, idempotency_key, result)
+    
+    else:
+        # 알 수 없는 액션
+        await send_message_to_client('local', {
+            'type': 'error',
+            'message': f'Unknown action: {action}'
+        }, apigateway_client)
+
+async def handle_websocket(websocket, path):
+    """WebSocket 연결 처리 - 생성 중에도 ping/stopGeneration/다른 요청을 읽고 송신은 연결당 writer 하나가 처리"""
+    logger.info("New WebSocket connection")
     
     try:
-        async for message in websocket:
-            try:
-                logger.info(f"Received message: {message[:100]}...")
-                
-                # 요청 파싱
-                if not message:
-                    raise ValueError("No message body provided")
-                
-                body = json.loads(message)
-                action = body.get('action', 'sendMessage')
-                
-                # 메시지 전송 액션
-                if action == 'sendMessage':
-                    # 필수 파라미터 추출 및 검증
-                    user_message = body.get('message', '')
-                    engine_type = body.get('engineType', '11')
-                    conversation_id = body.get('conversationId')
-                    user_id = body.get('userId', body.get('email', 'local_user'))
-                    conversation_history = body.get('conversationHistory', [])
-                    user_role = determine_user_role(user_id, body)
-                    
-                    logger.info(f"Processing message for {engine_type}, user: {user_id}, role: {user_role}")
-                    
-                    # AI 시작 알림
-                    await send_message_to_client('local', {
-                        'type': 'ai_start',
-                        'timestamp': datetime.utcnow().isoformat() + 'Z'
-                    }, apigateway_client)
-                    
-                    # 스트리밍 응답 전송
-                    chunk_index = 0
-                    total_response = ""
-                    
-                    try:
-                        for chunk in websocket_service.stream_response(
-                            user_message=user_message,
-                            engine_type=engine_type,
-                            user_role=user_role
-                        ):
-                            total_response += chunk
-                            
-                            # 청크 전송
-                            logger.info(f"Sending chunk {chunk_index}, chunk length: {len(chunk)}")
-                            await send_message_to_client('local', {
-                                'type': 'ai_chunk',
-                                'chunk': chunk,
-                                'chunk_index': chunk_index,
-                                'timestamp': datetime.utcnow().isoformat() + 'Z'
-                            }, apigateway_client)
-                            
-                            chunk_index += 1
-                    except Exception as stream_error:
-                        logger.error(f"Streaming error: {stream_error}")
-                        await send_message_to_client('local', {
-                            'type': 'error',
-                            'message': f'스트리밍 오류: {str(stream_error)}'
-                        }, apigateway_client)
-                        continue
-                    
-                    # 완료 알림
-                    await send_message_to_client('local', {
-                        'type': 'chat_end',
-                        'engine': engine_type,
-                        'conversationId': conversation_id,
-                        'total_chunks': chunk_index,
-                        'response_length': len(total_response),
-                        'message': '응답 생성이 완료되었습니다.',
-                        'timestamp': datetime.utcnow().isoformat() + 'Z'
-                    }, apigateway_client)
-                    
-                    logger.info(f"Chat completed: {chunk_index} chunks, {len(total_response)} chars")
-                
-                else:
-                    # 알 수 없는 액션
-                    await send_message_to_client('local', {
-                        'type': 'error',
-                        'message': f'Unknown action: {action}'
-                    }, apigateway_client)
-                    
-            except json.JSONDecodeError:
-                await send_message_to_client('local', {
-                    'type': 'error',
-                    'message': 'Invalid JSON format'
-                }, apigateway_client)
-            except Exception as e:
-                logger.error(f"Error processing message: {str(e)}", exc_info=True)
-                
-                # 에러 전송
-                try:
-                    await send_message_to_client('local', {
-                        'type': 'error',
-                        'message': f'처리 중 오류가 발생했습니다: {str(e)}'
-                    }, apigateway_client)
-                except:
-                    pass
-                
+        await ConnectionSession(websocket).serve(dispatch)
     except websockets.exceptions.ConnectionClosed:
         logger.info("WebSocket connection closed")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
 
 
+async def handle_send_message(body, websocket_service, apigateway_client, stop):
+    """sendMessage 1건 처리 - ai_start, ai_chunk 스트리밍, chat_end(중단 시 stopped)
+
+    스트리밍 결과를 반환 (생성 오류나 연결 종료로 끝나면 None).
+    """
+    try:
+        # 필수 파라미터 추출 및 검증
+        user_message = body.get('message', '')
+        engine_type = body.get('engineType', '11')
+        conversation_id = body.get('conversationId')
+        user_id = body.get('userId', body.get('email', 'local_user'))
+        conversation_history = body.get('conversationHistory', [])
+        user_role = determine_user_role(user_id, body)
+        
+        logger.info(f"Processing message for {engine_type}, user: {user_id}, role: {user_role}")
+        
+        # AI 시작 알림
+        await send_message_to_client('local', {
+            'type': 'ai_start',
+            'generationId': stop.generation_id,
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }, apigateway_client)
+        
+        # 스트리밍 응답 전송 (한 연결에서 여러 생성이 동시에 진행될 수 있으므로 generationId 표시)
+        async def send(frame):
+            await send_message_to_client('local', {**frame, 'generationId': stop.generation_id}, apigateway_client)
+        
+        try:
+            result = await websocket_service.stream_response(
+                send,
+                user_message=user_message,
+                engine_type=engine_type,
+                user_role=user_role,
+                conversation_history=conversation_history,
+                stop=stop
+            )
+        except Exception as stream_error:
+            logger.error(f"Streaming error: {stream_error}")
+            await send_message_to_client('local', {
+                'type': 'error',
+                'message': f'스트리밍 오류: {str(stream_error)}'
+            }, apigateway_client)
+            return
+        
+        chunk_index = result.total_chunks
+        total_response = result.text
+        
+        # 완료 알림
+        await send_message_to_client('local', {
+            'type': 'chat_end',
+            'engine': engine_type,
+            'conversationId': conversation_id,
+            'generationId': stop.generation_id,
+            'total_chunks': chunk_index,
+            'response_length': len(total_response),
+            'usage': result.usage,
+            'cached': result.cached,
+            'stopped': result.stopped,
+            'message': '응답 생성이 중단되었습니다.' if result.stopped else '응답 생성이 완료되었습니다.',
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }, apigateway_client)
+        
+        logger.info(f"Chat completed: {chunk_index} chunks, {len(total_response)} chars, stopped={result.stopped}")
+        return result
+    
+    except ConnectionClosedError:
+        logger.info("WebSocket connection closed during generation")
+    finally:
+        finish_generation(stop)
+
+
 def determine_user_role(user_id, body):
     """사용자 역할 판단"""
     # body에서 직접 userRole 확인
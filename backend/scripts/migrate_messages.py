@@ -0,0 +1,106 @@
+"""
+메시지 저장 구조 이전 스크립트
+
+1. one-conversations 의 인라인 messages 속성을 one-conversation-messages 아이템으로 이전
+2. (--legacy-table 지정 시) 이전 메시지 테이블(conversation_id + message_id)의 행을
+   아직 메시지가 없는 대화에 timestamp 순으로 순번을 매겨 복사
+
+같은 순번으로 덮어쓰므로 여러 번 실행해도 결과가 같다.
+
+사용법:
+    python scripts/migrate_messages.py [--dry-run] [--legacy-table one-messages]
+"""
+from collections import defaultdict
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boto3.dynamodb.conditions import Attr
+
+from src.models import Message
+from src.models.conversation import build_preview
+from src.repositories.conversation_repository import ConversationRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _scan(table, **kwargs):
+    """테이블 전체 스캔 (페이지 단위)"""
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+
+def migrate_inline(repository: ConversationRepository, dry_run: bool = False) -> int:
+    """인라인 messages 가 남은 대화 이전"""
+    migrated = 0
+    for item in _scan(repository.table, FilterExpression=Attr('messages').exists()):
+        if dry_run:
+            logger.info(f"[dry-run] {item['conversationId']}: {len(item.get('messages') or [])} inline messages")
+        else:
+            repository._migrate_inline(item)
+        migrated += 1
+    return migrated
+
+
+def migrate_legacy_table(repository: ConversationRepository, table_name: str, dry_run: bool = False) -> int:
+    """이전 메시지 테이블 행을 메시지가 없는 대화로 복사"""
+    legacy_table = repository.dynamodb.Table(table_name)
+    grouped = defaultdict(list)
+    for row in _scan(legacy_table):
+        grouped[row['conversation_id']].append(row)
+
+    migrated = 0
+    for conversation_id, rows in grouped.items():
+        header = repository.table.get_item(Key={'conversationId': conversation_id}).get('Item')
+        if not header:
+            logger.warning(f"Skip {conversation_id}: conversation header not found")
+            continue
+        if header.get('messageCount') or header.get('messages'):
+            continue
+
+        rows.sort(key=lambda row: (row.get('timestamp') or '', row['message_id']))
+        messages = [Message.from_dict(row) for row in rows]
+        if dry_run:
+            logger.info(f"[dry-run] {conversation_id}: {len(messages)} messages from {table_name}")
+            migrated += 1
+            continue
+
+        with repository.messages_table.batch_writer() as batch:
+            for sequence, message in enumerate(messages):
+                message.sequence = sequence
+                batch.put_item(Item=repository._message_item(conversation_id, message))
+        repository.table.update_item(
+            Key={'conversationId': conversation_id},
+            UpdateExpression='SET messageCount = :count, preview = :preview',
+            ExpressionAttributeValues={':count': len(messages), ':preview': build_preview(messages)}
+        )
+        repository.invalidate_cache(conversation_id)
+        migrated += 1
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='메시지 저장 구조 이전')
+    parser.add_argument('--dry-run', action='store_true', help='쓰지 않고 대상만 출력')
+    parser.add_argument('--legacy-table', help='이전 메시지 테이블 이름 (예: one-messages)')
+    args = parser.parse_args()
+
+    repository = ConversationRepository()
+    count = migrate_inline(repository, args.dry_run)
+    logger.info(f"Inline conversations migrated: {count}")
+    if args.legacy_table:
+        count = migrate_legacy_table(repository, args.legacy_table, args.dry_run)
+        logger.info(f"Conversations copied from {args.legacy_table}: {count}")
+
+
+if __name__ == '__main__':
+    main()
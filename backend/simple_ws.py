@@ -16,43 +16,65 @@ logger = logging.getLogger(__name__)
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from src.repositories.idempotency_store import get_idempotency_store
 from src.services.claude_service import generate_claude_response
+from src.services.connection_session import ConnectionSession
+from src.services.generation import new_generation_id, start_generation
+from src.services.idempotency import claim_request, complete_request, scoped_key, serve_duplicate
+
+# 재연결 후 다시 보낸 sendMessage 중복 제거
+idempotency_store = get_idempotency_store('memory')
+
+async def dispatch(session, data):
+    """요청 1건 처리 (연결 세션이 요청마다 태스크로 실행)"""
+    action = data.get('action', 'sendMessage')
+    
+    if action == 'sendMessage':
+        user_message = data.get('message', '')
+        engine_type = data.get('engineType', 'claude')
+        idempotency_key = scoped_key(data.get('idempotencyKey'), data.get('userId') or session.connection_id)
+        
+        generation_id = new_generation_id()
+        duplicate = claim_request(idempotency_store, idempotency_key, generation_id)
+        if duplicate is not None:
+            # 재연결 후 다시 보낸 요청 - 새로 생성하지 않고 첫 요청의 응답을 받는다
+            await serve_duplicate(
+                session.sender(generationId=duplicate['generationId']),
+                idempotency_store, idempotency_key, duplicate, engine=engine_type
+            )
+            return
+        
+        stop = start_generation(session.connection_id, generation_id=generation_id)
+        
+        # AI 시작 알림
+        await session.send({
+            "type": "ai_start",
+            "generationId": stop.generation_id,
+            "timestamp": datetime.utcnow().isoformat() + 'Z'
+        })
+        
+        # Claude 응답 생성 (세션의 send_json 으로 writer 큐에 전달)
+        result = None
+        try:
+            result = await generate_claude_response(
+                session, user_message, engine_type, data.get('conversationHistory'), stop
+            )
+        finally:
+            complete_request(idempotency_store, idempotency_key, result)
+        
+    else:
+        await session.send({
+            "type": "error",
+            "message": f"Unknown action: {action}"
+        })
 
 async def handle_websocket(websocket, path):
     logger.info("New WebSocket connection")
     
     try:
-        async for message in websocket:
-            try:
-                data = json.loads(message)
-                action = data.get('action', 'sendMessage')
-                
-                if action == 'sendMessage':
-                    user_message = data.get('message', '')
-                    engine_type = data.get('engineType', 'claude')
-                    
-                    # AI 시작 알림
-                    await websocket.send(json.dumps({
-                        "type": "ai_start",
-                        "timestamp": datetime.utcnow().isoformat() + 'Z'
-                    }))
-                    
-                    # Claude 응답 생성
-                    await generate_claude_response(websocket, user_message, engine_type)
-                    
-                else:
-                    await websocket.send(json.dumps({
-                        "type": "error",
-                        "message": f"Unknown action: {action}"
-                    }))
-                    
-            except Exception as e:
-                logger.error(f"Error: {e}")
-                await websocket.send(json.dumps({
-                    "type": "error",
-                    "message": f"오류: {str(e)}"
-                }))
-                
+        # 생성 중에도 ping/stopGeneration/다른 요청을 읽고, 송신은 연결당 writer 하나가 순서대로 처리
+        await ConnectionSession(websocket).serve(dispatch)
+        
     except websockets.exceptions.ConnectionClosed:
         logger.info("Connection closed")
 
@@ -0,0 +1,120 @@
+"""
+공유 클라이언트 레지스트리
+컨테이너(프로세스)당 한 번만 생성해 웜 호출 간 연결 풀과 TLS 세션을 재사용
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import os
+import threading
+import weakref
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# 풀 크기는 한 프로세스의 동시 요청 수 기준 (로컬 서버는 연결 수, Lambda 는 스레드 전송 수)
+BOTO_MAX_POOL_CONNECTIONS = int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '50'))
+BOTO_CONNECT_TIMEOUT = float(os.environ.get('BOTO_CONNECT_TIMEOUT', '5'))
+BOTO_READ_TIMEOUT = float(os.environ.get('BOTO_READ_TIMEOUT', '60'))
+BOTO_MAX_ATTEMPTS = int(os.environ.get('BOTO_MAX_ATTEMPTS', '3'))
+# 짧은 호출(검색/프록시 등)용 풀과 모델 스트리밍용 풀을 나눠, 오래 열린 스트림이 짧은 호출을 막지 않게 한다
+# (스트리밍 풀 크기가 프로세스당 동시 생성 수 상한 - 0 이면 제한 없음)
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '50'))
+HTTP_STREAM_POOL_MAXSIZE = int(os.environ.get('HTTP_STREAM_POOL_MAXSIZE', '200'))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '60'))
+
+_registry: Dict[Tuple, Any] = {}
+_registry_lock = threading.RLock()
+_async_http_clients = weakref.WeakKeyDictionary()
+
+
+def _get_or_create(key: Tuple, factory: Callable[[], Any]) -> Any:
+    client = _registry.get(key)
+    if client is None:
+        with _registry_lock:
+            client = _registry.get(key)
+            if client is None:
+                client = factory()
+                _registry[key] = client
+    return client
+
+
+def boto_config():
+    """연결 풀/keep-alive/재시도 설정"""
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=BOTO_MAX_POOL_CONNECTIONS,
+        connect_timeout=BOTO_CONNECT_TIMEOUT,
+        read_timeout=BOTO_READ_TIMEOUT,
+        tcp_keepalive=True,
+        retries={'mode': 'standard', 'max_attempts': BOTO_MAX_ATTEMPTS}
+    )
+
+
+def get_session():
+    """공유 boto3 세션 (자격 증명 조회도 한 번만)"""
+    import boto3
+
+    return _get_or_create(('session',), boto3.session.Session)
+
+
+def get_client(service: str, region: str = None, endpoint_url: Optional[str] = None):
+    """boto3 클라이언트 (서비스/리전/엔드포인트별 공유)"""
+    region = region or AWS_REGION
+    return _get_or_create(
+        ('client', service, region, endpoint_url),
+        lambda: get_session().client(
+            service, region_name=region, endpoint_url=endpoint_url, config=boto_config()
+        )
+    )
+
+
+def get_resource(service: str, region: str = None):
+    """boto3 리소스 (서비스/리전별 공유)"""
+    region = region or AWS_REGION
+    return _get_or_create(
+        ('resource', service, region),
+        lambda: get_session().resource(service, region_name=region, config=boto_config())
+    )
+
+
+def get_apigateway_client(domain_name: str, stage: str):
+    """WebSocket 콜백용 API Gateway Management API 클라이언트"""
+    return get_client('apigatewaymanagementapi', endpoint_url=f'https://{domain_name}/{stage}')
+
+
+def get_http_session():
+    """동기 HTTP 세션 (requests, keep-alive 풀)"""
+    def factory():
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_MAXSIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    return _get_or_create(('http_session',), factory)
+
+
+def get_async_http_client(streaming: bool = False):
+    """비동기 HTTP 클라이언트 (httpx) - 이벤트 루프에 묶이므로 루프별로 공유
+
+    streaming=True 는 모델 스트림 전용 풀 (HTTP_STREAM_POOL_MAXSIZE), 그 외는 HTTP_POOL_MAXSIZE 풀.
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    clients = _async_http_clients.setdefault(loop, {})
+    client = clients.get(streaming)
+    if client is None or client.is_closed:
+        maxsize = HTTP_STREAM_POOL_MAXSIZE if streaming else HTTP_POOL_MAXSIZE
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=maxsize or None,
+                max_keepalive_connections=maxsize or None,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+        clients[streaming] = client
+    return client
@@ -1,3 +1,3 @@
-from .conversation import Conversation, Message
+from .conversation import Conversation, ConversationSummary, Message
 
-__all__ = ['Conversation', 'Message']
\ No newline at end of file
+__all__ = ['Conversation', 'ConversationSummary', 'Message']
\ No newline at end of file
@@ -2,18 +2,153 @@
 대화(Conversation) 도메인 모델
 """
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from datetime import datetime
+import os
+import zlib
+
+
+# 목록용 미리보기 최대 길이
+PREVIEW_LENGTH = 100
+
+# 메시지 본문 압축 (저장 시 이 크기(bytes) 이상이면 zlib 바이너리로 기록)
+COMPRESSION_THRESHOLD = int(os.environ.get('MESSAGE_COMPRESSION_THRESHOLD', '4096'))
+COMPRESSION_LEVEL = 6
+CONTENT_ENCODING_ZLIB = 'zlib'
+
+
+def build_preview(messages: List['Message']) -> Optional[str]:
+    """마지막 메시지 내용으로 목록용 미리보기 생성"""
+    if not messages:
+        return None
+    content = messages[-1].content or ''
+    return content[:PREVIEW_LENGTH]
 
 
 @dataclass
 class Message:
-    """메시지 모델"""
+    """메시지 모델
+    
+    content는 지연 로딩을 지원한다. 압축 저장된 본문은 처음 접근할 때 해제된다.
+    """
     role: str  # 'user' or 'assistant'
     content: str
     timestamp: Optional[str] = None
     type: Optional[str] = None  # 'user' or 'assistant' - 프론트엔드 호환성
     metadata: Optional[Dict[str, Any]] = field(default_factory=dict)
+    sequence: Optional[int] = None  # 대화 내 순번 (저장 전에는 None)
+
+    # 지연 로딩 상태 (dataclass 필드 아님 - __init__/repr/eq 에 포함되지 않음)
+    _content_loader = None
+    _compressed = None
+    _content_ref = None
+
+    @property
+    def content(self) -> str:
+        """본문 (지연 로딩이면 첫 접근 시 불러온다)"""
+        if self._content_loader is not None:
+            self._content = self._content_loader()
+            self._content_loader = None
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        if isinstance(value, property):
+            # dataclass 는 같은 이름의 property 를 기본값으로 보므로 인자 누락을 여기서 확인
+            raise TypeError("Message.__init__() missing required argument: 'content'")
+        self._content = value
+        self._content_loader = None
+        self._compressed = None
+        self._content_ref = None
+
+    @classmethod
+    def lazy(cls, loader: Callable[[], str], compressed: Optional[bytes] = None, **kwargs) -> 'Message':
+        """본문을 첫 접근 시 loader로 불러오는 메시지 생성"""
+        message = cls(content=None, **kwargs)
+        message._content_loader = loader
+        message._compressed = compressed
+        return message
+
+    @property
+    def is_loaded(self) -> bool:
+        """본문이 메모리에 풀려 있는지 여부"""
+        return self._content_loader is None
+
+    def to_dict(self, compress: bool = False) -> Dict[str, Any]:
+        """딕셔너리 변환
+        
+        compress=True(저장소 기록)이면 임계값을 넘는 본문을 zlib 바이너리(contentZ)로,
+        오버플로 저장소에 있는 본문은 포인터(contentRef)로 기록한다. 그 외에는 항상 평문 content.
+        """
+        data = {
+            'role': self.role,
+            'type': self.type or self.role,  # type 필드 추가 (role과 동일)
+            'timestamp': self.timestamp,
+            'metadata': self.metadata,
+            'sequence': self.sequence
+        }
+        if not compress:
+            data['content'] = self.content
+            return data
+
+        content_ref = self._content_ref
+        compressed = self._compressed_content() if content_ref is None else None
+        if content_ref is not None:
+            # 오버플로 저장소에 있는 본문은 포인터만 유지
+            data['contentRef'] = content_ref
+        elif compressed is not None:
+            data['contentZ'] = compressed
+            data['contentEncoding'] = CONTENT_ENCODING_ZLIB
+        else:
+            data['content'] = self.content
+        return data
+
+    def _compressed_content(self) -> Optional[bytes]:
+        """압축 이득이 있을 때만 압축 본문 반환 (읽어 온 압축본은 그대로 재사용)"""
+        compressed = self._compressed
+        if compressed is not None:
+            return compressed
+        raw = (self.content or '').encode('utf-8')
+        if len(raw) < COMPRESSION_THRESHOLD:
+            return None
+        compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+        return compressed if len(compressed) < len(raw) else None
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        resolve_ref: Optional[Callable[[Dict[str, Any]], str]] = None
+    ) -> 'Message':
+        """DynamoDB 데이터에서 모델 생성
+        
+        압축 본문은 지연 해제하고, 오버플로 포인터(contentRef)는
+        resolve_ref로 첫 접근 시 불러온다.
+        """
+        sequence = data.get('sequence')
+        fields = dict(
+            role=data['role'],
+            timestamp=data.get('timestamp'),
+            type=data.get('type', data['role']),  # type 필드 추가
+            metadata=data.get('metadata', {}),
+            sequence=int(sequence) if sequence is not None else None
+        )
+        
+        if 'contentRef' in data:
+            content_ref = data['contentRef']
+            if resolve_ref is None:
+                def resolve_ref(ref):
+                    raise RuntimeError(f"No blob store configured for content {ref.get('hash')}")
+            message = cls.lazy(lambda: resolve_ref(content_ref), **fields)
+            message._content_ref = content_ref
+            return message
+        
+        if data.get('contentEncoding') == CONTENT_ENCODING_ZLIB:
+            # boto3는 바이너리 속성을 Binary 래퍼로 반환
+            blob = bytes(getattr(data['contentZ'], 'value', data['contentZ']))
+            return cls.lazy(lambda: zlib.decompress(blob).decode('utf-8'), compressed=blob, **fields)
+        
+        return cls(content=data['content'], **fields)
 
 
 @dataclass
@@ -27,42 +162,78 @@ class Conversation:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = field(default_factory=dict)
+    # 저장된 전체 메시지 수 (메시지를 일부만 불러온 경우에도 전체 기준, None이면 messages 기준)
+    message_count: Optional[int] = None
+    # 저장된 미리보기 (마지막 메시지를 불러오지 않은 경우에 사용)
+    preview: Optional[str] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """DynamoDB 저장용 딕셔너리 변환"""
-        return {
+    def saved_message_count(self) -> int:
+        """저장소에 기록된 메시지 수"""
+        if self.message_count is not None:
+            return self.message_count
+        return sum(1 for msg in self.messages if msg.sequence is not None)
+    
+    def total_message_count(self) -> int:
+        """저장되지 않은 메시지를 포함한 전체 메시지 수"""
+        unsaved = sum(1 for msg in self.messages if msg.sequence is None)
+        return self.saved_message_count() + unsaved
+    
+    def current_preview(self) -> Optional[str]:
+        """미리보기 - 마지막 메시지가 messages에 있으면 새로 만들고, 헤더만/이전 구간만 불러왔으면 저장된 값"""
+        unsaved = any(msg.sequence is None for msg in self.messages)
+        if unsaved or self.message_count is None:
+            return build_preview(self.messages)
+        if self.messages and self.messages[-1].sequence == self.message_count - 1:
+            return build_preview(self.messages)
+        return self.preview
+    
+    def to_dict(self, compress: bool = False, include_messages: bool = True) -> Dict[str, Any]:
+        """딕셔너리 변환
+        
+        API 응답은 기본값(평문)을, 저장소 기록은 compress=True를 사용한다.
+        include_messages=False이면 메시지 본문 없이 헤더 속성만 만든다.
+        """
+        data = {
             'conversationId': self.conversation_id,
             'userId': self.user_id,
             'engineType': self.engine_type,
             'title': self.title,
-            'messages': [
-                {
-                    'role': msg.role,
-                    'type': msg.type or msg.role,  # type 필드 추가 (role과 동일)
-                    'content': msg.content,
-                    'timestamp': msg.timestamp,
-                    'metadata': msg.metadata
-                }
-                for msg in self.messages
-            ],
+            'messageCount': self.total_message_count(),
+            'preview': self.current_preview(),
             'createdAt': self.created_at or datetime.now().isoformat(),
             'updatedAt': self.updated_at or datetime.now().isoformat(),
             'metadata': self.metadata
         }
+        if include_messages:
+            data['messages'] = [msg.to_dict(compress=compress) for msg in self.messages]
+        return data
+    
+    def to_summary(self) -> 'ConversationSummary':
+        """목록 조회용 요약 모델 변환"""
+        return ConversationSummary(
+            conversation_id=self.conversation_id,
+            user_id=self.user_id,
+            engine_type=self.engine_type,
+            title=self.title,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            message_count=self.total_message_count(),
+            preview=self.current_preview()
+        )
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Conversation':
-        """DynamoDB 데이터에서 모델 생성"""
-        messages = [
-            Message(
-                role=msg['role'],
-                content=msg['content'],
-                timestamp=msg.get('timestamp'),
-                type=msg.get('type', msg['role']),  # type 필드 추가
-                metadata=msg.get('metadata', {})
-            )
-            for msg in data.get('messages', [])
-        ]
+        """DynamoDB 데이터에서 모델 생성
+        
+        messages 속성이 있는 기존(인라인) 형식은 메시지를 그대로 사용하고,
+        메시지가 별도 아이템으로 저장된 형식은 messageCount만 반영한다.
+        """
+        if 'messages' in data:
+            messages = [Message.from_dict(msg) for msg in data['messages']]
+            message_count = None
+        else:
+            messages = []
+            message_count = int(data.get('messageCount', 0))
         
         return cls(
             conversation_id=data['conversationId'],
@@ -72,5 +243,63 @@ class Conversation:
             messages=messages,
             created_at=data.get('createdAt'),
             updated_at=data.get('updatedAt'),
-            metadata=data.get('metadata', {})
-        )
\ No newline at end of file
+            metadata=data.get('metadata', {}),
+            message_count=message_count,
+            preview=data.get('preview')
+        )
+
+
+@dataclass
+class ConversationSummary:
+    """대화 요약 모델 (목록 조회용, 메시지 본문 제외)"""
+    conversation_id: str
+    user_id: str
+    engine_type: str
+    title: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    message_count: int = 0
+    preview: Optional[str] = None
+
+    # DynamoDB ProjectionExpression에 사용할 속성 목록
+    ATTRIBUTES = (
+        'conversationId', 'userId', 'engineType', 'title',
+        'createdAt', 'updatedAt', 'messageCount', 'preview'
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API 응답용 딕셔너리 변환"""
+        return {
+            'conversationId': self.conversation_id,
+            'userId': self.user_id,
+            'engineType': self.engine_type,
+            'title': self.title,
+            'messageCount': self.message_count,
+            'preview': self.preview,
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConversationSummary':
+        """DynamoDB 데이터에서 모델 생성
+        
+        messageCount가 없는 기존(인라인) 아이템은 messages 속성에서 메시지 수와 미리보기를 계산한다.
+        """
+        if 'messageCount' in data:
+            message_count = int(data['messageCount'])
+            preview = data.get('preview')
+        else:
+            messages = [Message.from_dict(msg) for msg in data.get('messages') or []]
+            message_count = len(messages)
+            preview = data.get('preview') or build_preview(messages)
+        return cls(
+            conversation_id=data['conversationId'],
+            user_id=data['userId'],
+            engine_type=data['engineType'],
+            title=data.get('title'),
+            created_at=data.get('createdAt'),
+            updated_at=data.get('updatedAt'),
+            message_count=message_count,
+            preview=preview
+        )
@@ -1,3 +1,50 @@
+import os
+import threading
+
+from .base import BaseConversationRepository
 from .conversation_repository import ConversationRepository
+from .memory_repository import InMemoryConversationRepository
+from .sqlite_repository import SQLiteConversationRepository
+
+# 저장소 백엔드 (CONVERSATION_STORE): dynamodb | memory | sqlite
+STORE_BACKENDS = ('dynamodb', 'memory', 'sqlite')
+
+_shared_repositories = {}
+_shared_lock = threading.Lock()
+
+
+def create_conversation_repository(backend: str = None) -> BaseConversationRepository:
+    """설정에 따라 대화 리포지토리 생성
+
+    memory/sqlite 백엔드는 프로세스 내에서 같은 인스턴스를 공유해
+    서비스 객체를 새로 만들어도 데이터와 연결이 유지된다.
+    """
+    backend = (backend or os.environ.get('CONVERSATION_STORE', 'dynamodb')).lower()
+
+    if backend == 'dynamodb':
+        return ConversationRepository()
+
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown conversation store: {backend}")
+
+    with _shared_lock:
+        if backend == 'memory':
+            key = (backend,)
+            factory = InMemoryConversationRepository
+        else:
+            db_path = os.environ.get('CONVERSATION_SQLITE_PATH', 'conversations.db')
+            key = (backend, db_path)
+            factory = lambda: SQLiteConversationRepository(db_path)
+
+        if key not in _shared_repositories:
+            _shared_repositories[key] = factory()
+        return _shared_repositories[key]
+
 
-__all__ = ['ConversationRepository']
\ No newline at end of file
+__all__ = [
+    'BaseConversationRepository',
+    'ConversationRepository',
+    'InMemoryConversationRepository',
+    'SQLiteConversationRepository',
+    'create_conversation_repository'
+]
@@ -0,0 +1,144 @@
+"""
+대화(Conversation) 리포지토리 인터페이스
+저장소 백엔드(DynamoDB, 메모리, SQLite)가 공통으로 구현하는 계약
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional, Dict, Any, Tuple
+from decimal import Decimal
+from datetime import datetime
+import base64
+import json
+import uuid
+
+from ..models import Conversation, ConversationSummary, Message
+
+
+def encode_page_token(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """마지막 조회 키(LastEvaluatedKey 등)를 불투명한 nextToken 문자열로 변환"""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(
+        last_evaluated_key,
+        default=lambda v: int(v) if isinstance(v, Decimal) and v == int(v) else str(v),
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """nextToken 문자열을 마지막 조회 키로 복원"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('Invalid nextToken')
+    if not isinstance(key, dict):
+        raise ValueError('Invalid nextToken')
+    return key
+
+
+class BaseConversationRepository(ABC):
+    """대화 데이터 접근 계층 인터페이스"""
+
+    @abstractmethod
+    def save(self, conversation: Conversation) -> Conversation:
+        """대화 헤더와 저장되지 않은 메시지 저장"""
+
+    @abstractmethod
+    def create(self, conversation: Conversation) -> Tuple[Conversation, bool]:
+        """대화가 없을 때만 생성 - (저장된/기존 대화, 새로 생성 여부) 반환"""
+
+    @abstractmethod
+    def append_message(self, conversation_id: str, message: Message) -> Message:
+        """메시지 1건 추가 (순번 부여)"""
+
+    @abstractmethod
+    def find_by_id(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """ID로 대화 조회 (최근 N개 / 특정 순번 이전 메시지 범위 지정 가능)"""
+
+    def find_by_ids(
+        self,
+        conversation_ids: List[str],
+        message_limit: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> List[Conversation]:
+        """여러 대화 일괄 조회 (요청 순서 유지, 없는 ID와 user_id가 다른 대화는 제외)"""
+        conversations = []
+        for conversation_id in dict.fromkeys(conversation_ids):
+            conversation = self.find_by_id(conversation_id, message_limit)
+            if conversation and (user_id is None or conversation.user_id == user_id):
+                conversations.append(conversation)
+        return conversations
+
+    @abstractmethod
+    def find_by_user(self, user_id: str, limit: int = 1000) -> List[Conversation]:
+        """사용자별 대화 목록 조회 (최신순, 메시지 본문 제외)"""
+
+    @abstractmethod
+    def find_page_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        next_token: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """사용자별 대화 요약 페이지 조회 - (요약 목록, 다음 페이지 토큰) 반환"""
+
+    @abstractmethod
+    def update_title(self, conversation_id: str, title: str) -> bool:
+        """대화 제목 업데이트"""
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> bool:
+        """대화 삭제 (메시지 포함)"""
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """조회 캐시 통계 (캐시가 없는 백엔드는 빈 dict)"""
+        return {}
+
+    @staticmethod
+    def _prepare_save(conversation: Conversation) -> List[Message]:
+        """저장 전 ID/타임스탬프/메시지 순번을 채우고 새 메시지 목록 반환"""
+        # ID가 없으면 생성
+        if not conversation.conversation_id:
+            conversation.conversation_id = str(uuid.uuid4())
+        
+        # 타임스탬프 업데이트
+        now = datetime.now().isoformat()
+        if not conversation.created_at:
+            conversation.created_at = now
+        conversation.updated_at = now
+        
+        # 새 메시지에 순번 부여
+        next_sequence = conversation.saved_message_count()
+        new_messages = []
+        for message in conversation.messages:
+            if message.sequence is None:
+                message.sequence = next_sequence
+                next_sequence += 1
+                new_messages.append(message)
+        conversation.message_count = next_sequence
+        return new_messages
+
+    @staticmethod
+    def _slice_messages(
+        messages: List[Message],
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> List[Message]:
+        """순번 순으로 정렬된 메시지에 범위 조건 적용"""
+        if before_sequence is not None:
+            messages = [
+                msg for index, msg in enumerate(messages)
+                if (msg.sequence if msg.sequence is not None else index) < before_sequence
+            ]
+        if message_limit:
+            messages = messages[-message_limit:]
+        return messages
@@ -0,0 +1,153 @@
+"""
+대용량 메시지 본문용 오버플로 저장소
+DynamoDB 아이템 한도를 넘는 본문을 내용 해시(sha256) 키로 객체 저장소에 보관
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+import hashlib
+import logging
+import os
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 해시 키는 불변이므로 만료는 길게 두고, 본문이 크므로 개수와 합계 바이트로 제한한다
+_blob_cache = TTLCache(
+    maxsize=int(os.environ.get('BLOB_CACHE_SIZE', '64')),
+    ttl=float(os.environ.get('BLOB_CACHE_TTL', '3600')),
+    maxbytes=int(os.environ.get('BLOB_CACHE_MAX_BYTES', str(8 * 1024 * 1024))),
+    sizeof=len
+)
+
+
+def content_hash(data: bytes) -> str:
+    """본문 해시 (저장 키)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """내용 주소 기반 객체 저장소 - 같은 내용은 한 번만 저장"""
+
+    name = 'blob'
+
+    def put(self, data: bytes) -> str:
+        """본문 저장 후 해시 반환 (이미 있으면 쓰기 생략)"""
+        digest = content_hash(data)
+        if not self._exists(digest):
+            self._write(digest, data)
+            logger.info(f"Blob stored: {digest} ({len(data)} bytes)")
+        _blob_cache.set((self.name, digest), data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """해시로 본문 조회 (로컬 캐시 우선)"""
+        cache_key = (self.name, digest)
+        data = _blob_cache.get(cache_key)
+        if data is None:
+            data = self._read(digest)
+            if content_hash(data) != digest:
+                raise ValueError(f"Blob content mismatch: {digest}")
+            _blob_cache.set(cache_key, data)
+        return data
+
+    def get_text(self, digest: str) -> str:
+        """해시로 본문 문자열 조회"""
+        return self.get(digest).decode('utf-8')
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        # 접두 디렉터리로 분산
+        return f"{digest[:2]}/{digest}"
+
+    @abstractmethod
+    def _exists(self, digest: str) -> bool:
+        """저장 여부 확인"""
+
+    @abstractmethod
+    def _write(self, digest: str, data: bytes) -> None:
+        """본문 기록"""
+
+    @abstractmethod
+    def _read(self, digest: str) -> bytes:
+        """본문 읽기"""
+
+
+class S3BlobStore(BlobStore):
+    """S3 백엔드"""
+
+    name = 's3'
+
+    def __init__(self, bucket: str, prefix: str = '', client=None):
+        from ..clients import get_client
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = client or get_client('s3')
+
+    def _object_key(self, digest: str) -> str:
+        key = self._key(digest)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _exists(self, digest: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(digest))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def _write(self, digest: str, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(digest),
+            Body=data,
+            ContentType='text/plain; charset=utf-8'
+        )
+
+    def _read(self, digest: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(digest))
+        return response['Body'].read()
+
+
+class FsspecBlobStore(BlobStore):
+    """fsspec 파일시스템 백엔드 (로컬 디스크 등, S3 대체용)"""
+
+    name = 'fsspec'
+
+    def __init__(self, url: str):
+        from fsspec.core import url_to_fs
+
+        self.fs, self.root = url_to_fs(url)
+        self.fs.makedirs(self.root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return f"{self.root.rstrip('/')}/{self._key(digest)}"
+
+    def _exists(self, digest: str) -> bool:
+        return self.fs.exists(self._path(digest))
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        self.fs.makedirs(path.rsplit('/', 1)[0], exist_ok=True)
+        self.fs.pipe_file(path, data)
+
+    def _read(self, digest: str) -> bytes:
+        return self.fs.cat_file(self._path(digest))
+
+
+def create_blob_store(url: Optional[str] = None) -> Optional[BlobStore]:
+    """MESSAGE_BLOB_STORE 설정으로 저장소 생성 (미설정 시 None - 오버플로 비활성)
+
+    s3://bucket/prefix 는 S3, 그 외 경로/URL(file:///tmp/blobs 등)은 fsspec 사용
+    """
+    url = url or os.environ.get('MESSAGE_BLOB_STORE')
+    if not url:
+        return None
+    if url.startswith('s3://'):
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        return S3BlobStore(bucket, prefix)
+    return FsspecBlobStore(url)
@@ -0,0 +1,107 @@
+"""
+TTL 기반 LRU 캐시
+Lambda 컨테이너(모듈 스코프)에서 재사용되는 프로세스 내 캐시
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+
+class TTLCache:
+    """크기 제한 + 만료 시간이 있는 LRU 캐시
+
+    maxbytes 를 주면 sizeof(value) 합계도 제한한다.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 30.0,
+        maxbytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """값 조회 (없거나 만료되면 default)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """값 저장 (가장 오래 사용되지 않은 항목부터 제거)"""
+        if self.maxsize <= 0:
+            return
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self._bytes > self.maxbytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def invalidate(self, key: Hashable) -> None:
+        """단일 항목 무효화"""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """조건에 맞는 키를 모두 무효화"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """전체 비우기 (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 통계"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'bytes': self._bytes,
+            'maxbytes': self.maxbytes,
+            'ttl': self.ttl
+        }
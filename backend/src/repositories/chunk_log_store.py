@@ -0,0 +1,161 @@
+"""
+생성별 청크 기록 저장소 (resume)
+연결이 끊긴 클라이언트가 다시 연결해 lastChunkIndex 이후 청크를 받을 수 있도록
+생성 ID 별로 전송한 ai_chunk 를 잠시 보관 (로컬: 메모리, Lambda: 재연결 요청이 다른 호출로 들어오므로 DynamoDB + TTL)
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from .cache import TTLCache
+from .store_factory import dynamodb_table, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# 기록 보관 시간(초)
+CHUNK_LOG_TTL = int(os.environ.get('CHUNK_LOG_TTL', '600'))
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+
+
+class ChunkLogStore(ABC):
+    """청크 기록 저장소 인터페이스
+
+    read 결과 형식: {'status', 'entries', 'summary'}
+    entries 는 start 번 이후 (chunk_index, chunk) 순서대로, summary 는 완료 시 usage/stop_reason/stopped
+    """
+
+    @abstractmethod
+    def start(self, generation_id: str) -> None:
+        """기록 시작 (청크가 아직 없어도 재개 요청이 진행 중인 생성으로 인식)"""
+
+    @abstractmethod
+    def append(self, generation_id: str, entries: Sequence[Tuple[int, str]]) -> None:
+        """(chunk_index, chunk) 목록 기록"""
+
+    @abstractmethod
+    def finish(self, generation_id: str, summary: Dict[str, Any]) -> None:
+        """생성 종료 기록"""
+
+    @abstractmethod
+    def read(self, generation_id: str, start: int = 0) -> Optional[Dict[str, Any]]:
+        """start 번 이후 청크와 상태 조회 (기록이 없으면 None)"""
+
+
+class InMemoryChunkLogStore(ChunkLogStore):
+    """프로세스 내 저장소 (로컬/테스트용)"""
+
+    def __init__(self, ttl: float = CHUNK_LOG_TTL):
+        self._logs = TTLCache(maxsize=int(os.environ.get('CHUNK_LOG_CACHE_SIZE', '1024')), ttl=ttl)
+        self._lock = threading.Lock()
+
+    def start(self, generation_id: str) -> None:
+        self._logs.set(generation_id, {'status': STATUS_RUNNING, 'chunks': {}, 'summary': None})
+
+    def append(self, generation_id: str, entries: Sequence[Tuple[int, str]]) -> None:
+        with self._lock:
+            log = self._logs.get(generation_id)
+            if log is not None:
+                log['chunks'].update(entries)
+
+    def finish(self, generation_id: str, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            log = self._logs.get(generation_id)
+            if log is not None:
+                log['status'] = STATUS_DONE
+                log['summary'] = dict(summary)
+
+    def read(self, generation_id: str, start: int = 0) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            log = self._logs.get(generation_id)
+            if log is None:
+                return None
+            indexes = sorted(index for index in log['chunks'] if index >= start)
+            return {
+                'status': log['status'],
+                'entries': [(index, log['chunks'][index]) for index in indexes],
+                'summary': log['summary']
+            }
+
+
+class DynamoChunkLogStore(ChunkLogStore):
+    """DynamoDB 백엔드 - generationId(PK) + seq(SK, Number), expiresAt(TTL)
+
+    seq 0 은 상태/요약 헤더, 청크는 seq = chunk_index + 1.
+    """
+
+    def __init__(self, table_name: str = None, region: str = None, ttl: int = CHUNK_LOG_TTL):
+        self.table = dynamodb_table('CHUNK_LOG_TABLE', 'one-stream-chunks', table_name, region)
+        self.ttl = ttl
+
+    def start(self, generation_id: str) -> None:
+        self.table.put_item(Item={
+            'generationId': generation_id,
+            'seq': 0,
+            'status': STATUS_RUNNING,
+            'expiresAt': int(time.time()) + self.ttl
+        })
+
+    def append(self, generation_id: str, entries: Sequence[Tuple[int, str]]) -> None:
+        expires_at = int(time.time()) + self.ttl
+        with self.table.batch_writer() as batch:
+            for index, chunk in entries:
+                batch.put_item(Item={
+                    'generationId': generation_id,
+                    'seq': index + 1,
+                    'chunk': chunk,
+                    'expiresAt': expires_at
+                })
+
+    def finish(self, generation_id: str, summary: Dict[str, Any]) -> None:
+        self.table.update_item(
+            Key={'generationId': generation_id, 'seq': 0},
+            UpdateExpression='SET #status = :done, summary = :summary',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={
+                ':done': STATUS_DONE,
+                ':summary': json.dumps(summary, ensure_ascii=False, default=str)
+            }
+        )
+
+    def read(self, generation_id: str, start: int = 0) -> Optional[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+
+        # 헤더를 먼저 읽어야 완료 상태일 때 뒤이어 읽은 청크가 빠짐없이 모두 기록된 것
+        header = self.table.get_item(
+            Key={'generationId': generation_id, 'seq': 0}, ConsistentRead=True
+        ).get('Item')
+        if header is None:
+            return None
+
+        items: List[Dict[str, Any]] = []
+        kwargs = {
+            'KeyConditionExpression': Key('generationId').eq(generation_id) & Key('seq').gte(max(start, 0) + 1),
+            'ConsistentRead': True
+        }
+        while True:
+            response = self.table.query(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        items.sort(key=lambda item: int(item['seq']))
+        return {
+            'status': header['status'],
+            'entries': [(int(item['seq']) - 1, item['chunk']) for item in items],
+            'summary': json.loads(header['summary']) if header.get('summary') else None
+        }
+
+
+def get_chunk_log_store(backend: str = None) -> ChunkLogStore:
+    """CHUNK_LOG_STORE 설정 (dynamodb | memory) 에 따른 공용 저장소"""
+    return get_shared_store('chunk log', 'CHUNK_LOG_STORE', {
+        'dynamodb': DynamoChunkLogStore,
+        'memory': InMemoryChunkLogStore
+    }, backend)
@@ -0,0 +1,193 @@
+"""
+분할 전송된 sendMessage 조각 저장소
+클라이언트가 큰 메시지를 chunkInfo 로 나눠 보내면 마지막 조각이 도착할 때까지 보관
+(로컬: 메모리, Lambda: 조각마다 다른 호출로 들어오므로 DynamoDB + TTL)
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+from .store_factory import dynamodb_table, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# 미완성 업로드 보관 시간(초)과 업로드 1건의 메시지 합계 상한(bytes)
+CHUNK_UPLOAD_TIMEOUT = int(os.environ.get('CHUNK_UPLOAD_TIMEOUT', '60'))
+CHUNK_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNK_UPLOAD_MAX_BYTES', str(1024 * 1024)))
+
+
+class ChunkUploadError(ValueError):
+    """조각 업로드 오류 (만료, 크기 초과, 잘못된 chunkInfo)"""
+
+
+class ChunkUploadStore(ABC):
+    """조각 저장소 인터페이스 - upload_key 는 '<connectionId>#<idempotencyKey>'"""
+
+    def __init__(self, timeout: int = CHUNK_UPLOAD_TIMEOUT, max_bytes: int = CHUNK_UPLOAD_MAX_BYTES):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+    @abstractmethod
+    def add_part(
+        self,
+        upload_key: str,
+        index: int,
+        total: int,
+        payload: Dict[str, Any],
+        size: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """조각 1개 저장 - 모든 조각이 모이면 순서대로 정렬된 payload 목록 반환 (이후 업로드는 삭제)
+
+        같은 조각이 다시 오면 무시하고, 크기 상한을 넘거나 만료된 업로드면 ChunkUploadError.
+        """
+
+    @abstractmethod
+    def discard_connection(self, connection_id: str) -> None:
+        """연결의 미완성 업로드 삭제"""
+
+
+class InMemoryChunkUploadStore(ChunkUploadStore):
+    """프로세스 내 저장소 (로컬 서버용)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add_part(self, upload_key, index, total, payload, size):
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            upload = self._uploads.get(upload_key)
+            if upload is None:
+                upload = {'expires': now + self.timeout, 'total': total, 'parts': {}, 'bytes': 0}
+                self._uploads[upload_key] = upload
+            if upload['total'] != total:
+                del self._uploads[upload_key]
+                raise ChunkUploadError('조각 수(chunkInfo.total)가 일치하지 않습니다.')
+            if index in upload['parts']:
+                return None
+            if upload['bytes'] + size > self.max_bytes:
+                del self._uploads[upload_key]
+                raise ChunkUploadError(f'메시지가 최대 크기({self.max_bytes} bytes)를 넘었습니다.')
+
+            upload['parts'][index] = payload
+            upload['bytes'] += size
+            if len(upload['parts']) < total:
+                return None
+            del self._uploads[upload_key]
+        return [upload['parts'][i] for i in sorted(upload['parts'])]
+
+    def discard_connection(self, connection_id: str) -> None:
+        prefix = f"{connection_id}#"
+        with self._lock:
+            for key in [key for key in self._uploads if key.startswith(prefix)]:
+                del self._uploads[key]
+
+    def _sweep(self, now: float) -> None:
+        # 만료된 미완성 업로드 정리
+        for key in [key for key, upload in self._uploads.items() if upload['expires'] <= now]:
+            logger.info(f"Chunk upload expired: {key}")
+            del self._uploads[key]
+
+
+class DynamoChunkUploadStore(ChunkUploadStore):
+    """DynamoDB 백엔드 - uploadKey(PK) + part(SK, Number), expiresAt(TTL)
+
+    part 0 은 수신 조각 수/바이트 합계를 원자적으로 세는 헤더 아이템이라
+    동시에 실행된 호출 중 마지막 조각을 기록한 호출 하나만 완성본을 받는다.
+    """
+
+    def __init__(self, table_name: str = None, region: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.table = dynamodb_table('CHUNK_UPLOADS_TABLE', 'one-message-chunks', table_name, region)
+
+    def add_part(self, upload_key, index, total, payload, size):
+        from botocore.exceptions import ClientError
+
+        if size > self.max_bytes:
+            raise ChunkUploadError(f'메시지가 최대 크기({self.max_bytes} bytes)를 넘었습니다.')
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    'uploadKey': upload_key,
+                    'part': index,
+                    'payload': json.dumps(payload, ensure_ascii=False),
+                    'expiresAt': now + self.timeout
+                },
+                ConditionExpression='attribute_not_exists(uploadKey)'
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return None
+            raise
+
+        try:
+            response = self.table.update_item(
+                Key={'uploadKey': upload_key, 'part': 0},
+                UpdateExpression='ADD received :one, #bytes :size SET #total = :total, '
+                                 'expiresAt = if_not_exists(expiresAt, :expires)',
+                ConditionExpression='(attribute_not_exists(#bytes) OR #bytes <= :remaining) '
+                                    'AND (attribute_not_exists(#total) OR #total = :total) '
+                                    'AND (attribute_not_exists(expiresAt) OR expiresAt > :now)',
+                ExpressionAttributeNames={'#bytes': 'bytes', '#total': 'total'},
+                ExpressionAttributeValues={
+                    ':one': 1,
+                    ':size': size,
+                    ':total': total,
+                    ':remaining': self.max_bytes - size,
+                    ':expires': now + self.timeout,
+                    ':now': now
+                },
+                ReturnValues='UPDATED_NEW'
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                self._delete(upload_key)
+                raise ChunkUploadError('업로드가 만료되었거나 최대 크기를 넘었습니다.')
+            raise
+
+        if int(response['Attributes']['received']) < total:
+            return None
+
+        items = self._query(upload_key)
+        self._delete(upload_key, items)
+        return [json.loads(item['payload']) for item in items if int(item['part']) > 0]
+
+    def discard_connection(self, connection_id: str) -> None:
+        # 연결 ID 로는 키를 찾을 수 없으므로 미완성 업로드는 TTL 로 정리
+        return None
+
+    def _query(self, upload_key: str) -> List[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+
+        items: List[Dict[str, Any]] = []
+        kwargs = {'KeyConditionExpression': Key('uploadKey').eq(upload_key), 'ConsistentRead': True}
+        while True:
+            response = self.table.query(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return sorted(items, key=lambda item: int(item['part']))
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _delete(self, upload_key: str, items: Optional[List[Dict[str, Any]]] = None) -> None:
+        try:
+            items = items if items is not None else self._query(upload_key)
+            with self.table.batch_writer() as batch:
+                for item in items:
+                    batch.delete_item(Key={'uploadKey': upload_key, 'part': item['part']})
+        except Exception as e:
+            logger.warning(f"Chunk upload cleanup failed for {upload_key}: {e}")
+
+
+def get_chunk_upload_store(backend: str = None) -> ChunkUploadStore:
+    """CHUNK_UPLOAD_STORE 설정 (dynamodb | memory) 에 따른 공용 저장소"""
+    return get_shared_store('chunk upload', 'CHUNK_UPLOAD_STORE', {
+        'dynamodb': DynamoChunkUploadStore,
+        'memory': InMemoryChunkUploadStore
+    }, backend)
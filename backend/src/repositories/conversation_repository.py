@@ -1,106 +1,636 @@
 """
-대화(Conversation) 리포지토리
+대화(Conversation) 리포지토리 - DynamoDB 백엔드
 DynamoDB와의 모든 상호작용을 캡슐화
 """
-import boto3
-from typing import List, Optional, Dict, Any
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
-import uuid
+import copy
 import logging
 import os
+import random
+import time
 
-from ..models import Conversation, Message
+from ..clients import get_resource
+from ..models import Conversation, ConversationSummary, Message
+from ..models.conversation import build_preview
+from .base import BaseConversationRepository, decode_page_token, encode_page_token
+from .blob_store import BlobStore, create_blob_store
+from .cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# find_by_id 읽기 캐시 - 모듈 스코프라 웜 컨테이너의 호출 간에 공유됨
+_conversation_cache = TTLCache(
+    maxsize=int(os.environ.get('CONVERSATION_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('CONVERSATION_CACHE_TTL', '30'))
+)
 
-class ConversationRepository:
-    """대화 데이터 접근 계층"""
+# TransactWriteItems 한 번에 기록 가능한 최대 아이템 수
+MAX_TRANSACT_ITEMS = 100
 
-    def __init__(self, table_name: str = None, region: str = None):
+# 이 크기(bytes, 압축 후 기준)를 넘는 본문은 오버플로 저장소로 이동 (아이템 한도 400KB)
+OVERFLOW_THRESHOLD = int(os.environ.get('MESSAGE_OVERFLOW_THRESHOLD', str(256 * 1024)))
+
+# BatchGetItem 요청당 최대 키 수 및 UnprocessedKeys 재시도 설정
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BASE_DELAY = 0.05
+BATCH_GET_MAX_DELAY = 1.0
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _is_missing_index(error: ClientError) -> bool:
+    """GSI 가 없거나 생성 중이라 조회할 수 없는 오류인지"""
+    details = error.response.get('Error', {})
+    return details.get('Code') == 'ValidationException' and 'index' in (details.get('Message') or '').lower()
+
+
+class ConversationRepository(BaseConversationRepository):
+    """대화 데이터 접근 계층 (DynamoDB)"""
+
+    def __init__(
+        self,
+        table_name: str = None,
+        region: str = None,
+        user_index_name: str = None,
+        messages_table_name: str = None,
+        blob_store: Optional[BlobStore] = None
+    ):
         table_name = table_name or os.environ.get('CONVERSATIONS_TABLE', 'one-conversations')
+        # 메시지 아이템 테이블: conversationId(PK) + sequence(SK, Number)
+        messages_table_name = messages_table_name or os.environ.get('MESSAGES_TABLE', 'one-conversation-messages')
+        # GSI: userId(PK) + updatedAt(SK)
+        self.user_index_name = user_index_name or os.environ.get(
+            'CONVERSATIONS_USER_INDEX', 'userId-updatedAt-index'
+        )
         region = region or os.environ.get('AWS_REGION', 'us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
+        self.dynamodb = get_resource('dynamodb', region)
         self.table = self.dynamodb.Table(table_name)
-        logger.info(f"ConversationRepository initialized with table: {table_name}")
+        self.messages_table = self.dynamodb.Table(messages_table_name)
+        # 오버플로 저장소 (MESSAGE_BLOB_STORE 미설정 시 비활성)
+        self.blob_store = blob_store or create_blob_store()
+        logger.info(f"ConversationRepository initialized with table: {table_name}, messages: {messages_table_name}")
     
     def save(self, conversation: Conversation) -> Conversation:
-        """대화 저장"""
+        """대화 저장
+        
+        대화 헤더와 아직 저장되지 않은(sequence가 없는) 메시지만 기록한다.
+        """
         try:
-            # ID가 없으면 생성
-            if not conversation.conversation_id:
-                conversation.conversation_id = str(uuid.uuid4())
+            new_messages = self._prepare_save(conversation)
             
-            # 타임스탬프 업데이트
-            now = datetime.now().isoformat()
-            if not conversation.created_at:
-                conversation.created_at = now
-            conversation.updated_at = now
+            # 메시지 아이템 먼저 기록 후 헤더 저장
+            if new_messages:
+                with self.messages_table.batch_writer() as batch:
+                    for message in new_messages:
+                        batch.put_item(Item=self._message_item(conversation.conversation_id, message))
             
-            # DynamoDB에 저장
-            self.table.put_item(Item=conversation.to_dict())
+            self.table.put_item(Item=self._header_item(conversation))
+            self.invalidate_cache(conversation.conversation_id)
             
-            logger.info(f"Conversation saved: {conversation.conversation_id}")
+            logger.info(f"Conversation saved: {conversation.conversation_id} ({len(new_messages)} new messages)")
             return conversation
             
         except Exception as e:
             logger.error(f"Error saving conversation: {str(e)}")
             raise
     
-    def find_by_id(self, conversation_id: str) -> Optional[Conversation]:
-        """ID로 대화 조회"""
+    def create(self, conversation: Conversation) -> Tuple[Conversation, bool]:
+        """conversationId에 대한 조건부 쓰기로 대화 생성
+        
+        헤더(attribute_not_exists 조건)와 초기 메시지를 한 번의 트랜잭션으로 기록하고,
+        이미 존재하면 실패 응답에 담긴 기존 아이템을 그대로 반환한다.
+        """
+        try:
+            new_messages = self._prepare_save(conversation)
+            header = self._header_item(conversation)
+            condition = {
+                'ConditionExpression': 'attribute_not_exists(conversationId)',
+                'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+            }
+            
+            if new_messages and len(new_messages) < MAX_TRANSACT_ITEMS:
+                self.dynamodb.meta.client.transact_write_items(
+                    TransactItems=[
+                        {'Put': {
+                            'TableName': self.table.name,
+                            'Item': self._serialize(header),
+                            **condition
+                        }}
+                    ] + [
+                        {'Put': {
+                            'TableName': self.messages_table.name,
+                            'Item': self._serialize(self._message_item(conversation.conversation_id, msg))
+                        }}
+                        for msg in new_messages
+                    ]
+                )
+            else:
+                self.table.put_item(Item=header, **condition)
+                if new_messages:
+                    with self.messages_table.batch_writer() as batch:
+                        for message in new_messages:
+                            batch.put_item(Item=self._message_item(conversation.conversation_id, message))
+            
+            self.invalidate_cache(conversation.conversation_id)
+            logger.info(f"Conversation created: {conversation.conversation_id}")
+            return conversation, True
+            
+        except ClientError as e:
+            existing_item = self._conditional_failure_item(e)
+            if existing_item is None:
+                logger.error(f"Error creating conversation: {str(e)}")
+                raise
+            
+            logger.info(f"Conversation {conversation.conversation_id} already exists")
+            if existing_item:
+                return Conversation.from_dict(self._deserialize(existing_item)), False
+            return self.find_by_id(conversation.conversation_id), False
+    
+    @staticmethod
+    def _conditional_failure_item(error: ClientError) -> Optional[Dict[str, Any]]:
+        """조건 검사 실패면 기존 아이템(원시 형식, 없으면 빈 dict), 그 외 오류면 None"""
+        code = error.response.get('Error', {}).get('Code')
+        if code == 'ConditionalCheckFailedException':
+            return error.response.get('Item') or {}
+        if code == 'TransactionCanceledException':
+            reasons = error.response.get('CancellationReasons') or []
+            if reasons and reasons[0].get('Code') == 'ConditionalCheckFailed':
+                return reasons[0].get('Item') or {}
+        return None
+    
+    @staticmethod
+    def _serialize(item: Dict[str, Any]) -> Dict[str, Any]:
+        """저수준 클라이언트용 DynamoDB 속성 형식으로 변환"""
+        return {key: _serializer.serialize(value) for key, value in item.items()}
+    
+    @staticmethod
+    def _deserialize(item: Dict[str, Any]) -> Dict[str, Any]:
+        """DynamoDB 속성 형식을 파이썬 값으로 변환"""
+        return {key: _deserializer.deserialize(value) for key, value in item.items()}
+    
+    def append_message(self, conversation_id: str, message: Message) -> Message:
+        """메시지 1건 추가 - 대화 길이와 무관하게 아이템 하나만 기록
+        
+        기존 인라인 형식 대화는 먼저 메시지 아이템으로 이전한 뒤 이어서 순번을 부여한다.
+        """
+        try:
+            now = datetime.now().isoformat()
+            update = dict(
+                Key={'conversationId': conversation_id},
+                UpdateExpression=(
+                    'SET messageCount = if_not_exists(messageCount, :zero) + :one, '
+                    'preview = :preview, updatedAt = :updatedAt'
+                ),
+                ConditionExpression='attribute_exists(conversationId) AND attribute_not_exists(messages)',
+                ExpressionAttributeValues={
+                    ':zero': 0,
+                    ':one': 1,
+                    ':preview': build_preview([message]),
+                    ':updatedAt': now
+                },
+                ReturnValues='UPDATED_NEW'
+            )
+            
+            # 헤더의 messageCount를 원자적으로 증가시켜 순번 확보
+            try:
+                response = self.table.update_item(**update)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+                item = self.table.get_item(Key={'conversationId': conversation_id}, ConsistentRead=True).get('Item')
+                if item is None or 'messages' not in item:
+                    raise
+                self._migrate_inline(item)
+                response = self.table.update_item(**update)
+            message.sequence = int(response['Attributes']['messageCount']) - 1
+            
+            self.messages_table.put_item(Item=self._message_item(conversation_id, message))
+            self.invalidate_cache(conversation_id)
+            
+            logger.info(f"Message appended: {conversation_id}#{message.sequence}")
+            return message
+            
+        except Exception as e:
+            logger.error(f"Error appending message to {conversation_id}: {str(e)}")
+            raise
+    
+    def find_by_id(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """ID로 대화 조회
+        
+        message_limit를 지정하면 최근 N개 메시지만 불러오고,
+        before_sequence를 지정하면 해당 순번 이전 메시지부터 역방향으로 불러온다.
+        """
+        cache_key = (conversation_id, message_limit, before_sequence)
+        cached = _conversation_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         try:
             response = self.table.get_item(
                 Key={'conversationId': conversation_id}
             )
             
-            if 'Item' in response:
-                return Conversation.from_dict(response['Item'])
+            if 'Item' not in response:
+                return None
+            
+            item = response['Item']
             
-            return None
+            if 'messages' in item:
+                # 기존 인라인 형식 - 전체 목록을 메시지 아이템으로 이전한 뒤 범위 적용
+                conversation = self._migrate_inline(item)
+                conversation.messages = self._slice_messages(
+                    conversation.messages, message_limit, before_sequence
+                )
+            else:
+                conversation = Conversation.from_dict(item)
+                conversation.messages = self._load_messages(
+                    conversation_id, message_limit, before_sequence
+                )
+            
+            _conversation_cache.set(cache_key, copy.deepcopy(conversation))
+            return conversation
             
         except Exception as e:
             logger.error(f"Error finding conversation by id: {str(e)}")
             raise
     
-    def find_by_user(self, user_id: str, limit: int = 1000) -> List[Conversation]:
-        """사용자별 대화 목록 조회"""
+    def find_by_ids(
+        self,
+        conversation_ids: List[str],
+        message_limit: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> List[Conversation]:
+        """여러 대화 일괄 조회 - 헤더와 메시지 모두 BatchGetItem(100개 단위)으로 읽음
+        
+        메시지 순번은 0부터 messageCount-1까지 이어지므로 대화별 Query 없이 키를 만들어 읽는다.
+        요청 순서를 유지하며 존재하지 않는 ID와 user_id가 다른 대화는 결과에서 제외한다.
+        """
         try:
-            conversations = []
-            last_evaluated_key = None
+            ids = list(dict.fromkeys(conversation_ids))
+            found: Dict[str, Conversation] = {}
             
-            while True:
-                scan_params = {
-                    'FilterExpression': 'userId = :userId',
-                    'ExpressionAttributeValues': {
-                        ':userId': user_id
-                    }
-                }
-
-                if limit and limit < 1000:
-                    scan_params['Limit'] = limit * 10
-
-                if last_evaluated_key:
-                    scan_params['ExclusiveStartKey'] = last_evaluated_key
-
-                response = self.table.scan(**scan_params)
-                
-                for item in response.get('Items', []):
-                    conversations.append(Conversation.from_dict(item))
-                
-                if limit and len(conversations) >= limit:
-                    return conversations[:limit]
-                
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            # 캐시에 있는 대화는 네트워크 없이 사용
+            for conversation_id in ids:
+                cached = _conversation_cache.get((conversation_id, message_limit, None))
+                if cached is not None:
+                    found[conversation_id] = copy.deepcopy(cached)
             
-            return conversations
+            pending = [conversation_id for conversation_id in ids if conversation_id not in found]
+            loaded: List[Conversation] = []
+            unloaded: List[Conversation] = []
+            for start in range(0, len(pending), BATCH_GET_MAX_KEYS):
+                chunk = pending[start:start + BATCH_GET_MAX_KEYS]
+                keys = [{'conversationId': conversation_id} for conversation_id in chunk]
+                for item in self._batch_get_items(self.table, keys):
+                    if user_id is not None and item.get('userId') != user_id:
+                        continue
+                    if 'messages' in item:
+                        conversation = self._migrate_inline(item)
+                        conversation.messages = self._slice_messages(conversation.messages, message_limit)
+                    else:
+                        conversation = Conversation.from_dict(item)
+                        unloaded.append(conversation)
+                    loaded.append(conversation)
+            
+            self._batch_load_messages(unloaded, message_limit)
+            for conversation in loaded:
+                _conversation_cache.set(
+                    (conversation.conversation_id, message_limit, None), copy.deepcopy(conversation)
+                )
+                found[conversation.conversation_id] = conversation
+            
+            return [
+                found[conversation_id] for conversation_id in ids
+                if conversation_id in found and (user_id is None or found[conversation_id].user_id == user_id)
+            ]
             
+        except Exception as e:
+            logger.error(f"Error finding conversations by ids: {str(e)}")
+            raise
+    
+    def _batch_load_messages(self, conversations: List[Conversation], message_limit: Optional[int] = None) -> None:
+        """대화별 최근 message_limit개 메시지를 순번 키로 한 번에 조회해 채움"""
+        keys = []
+        for conversation in conversations:
+            count = conversation.message_count or 0
+            first = max(count - message_limit, 0) if message_limit else 0
+            keys.extend(
+                {'conversationId': conversation.conversation_id, 'sequence': sequence}
+                for sequence in range(first, count)
+            )
+        
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+            for item in self._batch_get_items(self.messages_table, keys[start:start + BATCH_GET_MAX_KEYS]):
+                grouped.setdefault(item['conversationId'], []).append(item)
+        
+        for conversation in conversations:
+            items = sorted(grouped.get(conversation.conversation_id, []), key=lambda item: int(item['sequence']))
+            conversation.messages = [self._message_from_item(item) for item in items]
+    
+    def _batch_get_items(self, table, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """BatchGetItem 호출 - UnprocessedKeys는 지수 백오프로 재시도"""
+        if not keys:
+            return []
+        table_name = table.name
+        request_items = {table_name: {'Keys': keys}}
+        items = []
+        attempt = 0
+        
+        while True:
+            response = self.dynamodb.batch_get_item(RequestItems=request_items)
+            received = response.get('Responses', {}).get(table_name, [])
+            items.extend(received)
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return items
+            
+            # 진행이 없는 재시도만 횟수에 포함
+            attempt = 0 if received else attempt + 1
+            if attempt >= BATCH_GET_MAX_ATTEMPTS:
+                unprocessed = len(request_items.get(table_name, {}).get('Keys', []))
+                raise RuntimeError(f"BatchGetItem left {unprocessed} keys unprocessed after retries")
+            
+            delay = min(BATCH_GET_BASE_DELAY * (2 ** attempt), BATCH_GET_MAX_DELAY)
+            time.sleep(random.uniform(0, delay))
+    
+    def _load_messages(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> List[Message]:
+        """메시지 아이템을 최신순으로 조회한 뒤 시간순으로 반환"""
+        key_condition = Key('conversationId').eq(conversation_id)
+        if before_sequence is not None:
+            key_condition = key_condition & Key('sequence').lt(before_sequence)
+        
+        items = []
+        last_evaluated_key = None
+        
+        while True:
+            query_params = {
+                'KeyConditionExpression': key_condition,
+                'ScanIndexForward': False
+            }
+            
+            if message_limit:
+                query_params['Limit'] = message_limit - len(items)
+            
+            if last_evaluated_key:
+                query_params['ExclusiveStartKey'] = last_evaluated_key
+            
+            response = self.messages_table.query(**query_params)
+            items.extend(response.get('Items', []))
+            
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key or (message_limit and len(items) >= message_limit):
+                break
+        
+        items.reverse()
+        return [self._message_from_item(item) for item in items]
+    
+    def _migrate_inline(self, item: Dict[str, Any]) -> Conversation:
+        """기존 인라인 messages 아이템을 메시지 아이템으로 이전 (항상 전체 목록 기준으로 0부터 순번 부여)
+        
+        메시지 아이템은 같은 순번으로 덮어써지므로 동시에 이전해도 결과가 같고,
+        헤더는 messages 속성이 남아 있을 때만 갱신한다.
+        """
+        conversation = Conversation.from_dict(item)
+        for sequence, message in enumerate(conversation.messages):
+            message.sequence = sequence
+        conversation.message_count = len(conversation.messages)
+        
+        with self.messages_table.batch_writer() as batch:
+            for message in conversation.messages:
+                batch.put_item(Item=self._message_item(conversation.conversation_id, message))
+        try:
+            self.table.update_item(
+                Key={'conversationId': conversation.conversation_id},
+                UpdateExpression='SET messageCount = :count, preview = :preview REMOVE messages',
+                ConditionExpression='attribute_exists(messages)',
+                ExpressionAttributeValues={
+                    ':count': conversation.message_count,
+                    ':preview': conversation.current_preview()
+                }
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+        
+        self.invalidate_cache(conversation.conversation_id)
+        logger.info(f"Migrated inline conversation {conversation.conversation_id} ({conversation.message_count} messages)")
+        return conversation
+    
+    @staticmethod
+    def invalidate_cache(conversation_id: str) -> None:
+        """대화의 모든 캐시 항목(메시지 범위별) 무효화"""
+        _conversation_cache.invalidate_where(lambda key: key[0] == conversation_id)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """find_by_id 캐시 적중/실패 통계"""
+        return _conversation_cache.stats()
+    
+    @staticmethod
+    def _header_item(conversation: Conversation) -> Dict[str, Any]:
+        """대화 헤더 아이템 (메시지 본문 제외)"""
+        return conversation.to_dict(include_messages=False)
+    
+    def _message_item(self, conversation_id: str, message: Message) -> Dict[str, Any]:
+        """메시지 아이템 (임계값을 넘는 본문은 오버플로 저장소 포인터로 대체)"""
+        item = message.to_dict(compress=True)
+        item['conversationId'] = conversation_id
+        
+        if self.blob_store is not None and 'contentRef' not in item:
+            stored = item.get('contentZ')
+            size = len(stored) if stored is not None else len((item.get('content') or '').encode('utf-8'))
+            if size > OVERFLOW_THRESHOLD:
+                data = message.content.encode('utf-8')
+                digest = self.blob_store.put(data)
+                for key in ('content', 'contentZ', 'contentEncoding'):
+                    item.pop(key, None)
+                item['contentRef'] = {'hash': digest, 'size': len(data), 'store': self.blob_store.name}
+        
+        return item
+    
+    def _message_from_item(self, item: Dict[str, Any]) -> Message:
+        """메시지 아이템에서 모델 생성 (포인터는 첫 접근 시 오버플로 저장소에서 조회)"""
+        return Message.from_dict(item, resolve_ref=self._resolve_content_ref)
+    
+    def _resolve_content_ref(self, content_ref: Dict[str, Any]) -> str:
+        if self.blob_store is None:
+            raise RuntimeError(f"MESSAGE_BLOB_STORE is not configured for content {content_ref.get('hash')}")
+        return self.blob_store.get_text(content_ref['hash'])
+    
+    def find_by_user(self, user_id: str, limit: int = 1000) -> List[Conversation]:
+        """사용자별 대화 목록 조회 (userId/updatedAt 인덱스, 최신순)"""
+        try:
+            items, _ = self._query_user_index(user_id, limit)
+            return [Conversation.from_dict(item) for item in items]
         except Exception as e:
             logger.error(f"Error finding conversations by user: {str(e)}")
             raise
     
+    def find_page_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        next_token: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """사용자별 대화 요약 페이지 조회 - (요약 목록, 다음 페이지 토큰) 반환
+        
+        메시지 본문은 읽지 않고 요약 속성만 프로젝션한다.
+        """
+        try:
+            items, last_evaluated_key = self._query_user_index(
+                user_id,
+                limit,
+                exclusive_start_key=decode_page_token(next_token),
+                engine_type=engine_type,
+                attributes=ConversationSummary.ATTRIBUTES
+            )
+            summaries = [ConversationSummary.from_dict(item) for item in self._with_legacy_messages(items)]
+            return summaries, encode_page_token(last_evaluated_key)
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error finding conversation summaries by user: {str(e)}")
+            raise
+    
+    def _with_legacy_messages(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """messageCount가 없는 기존 아이템은 전체 아이템(인라인 messages)을 읽어 요약 계산에 사용"""
+        legacy_ids = [item['conversationId'] for item in items if 'messageCount' not in item]
+        if not legacy_ids:
+            return items
+        
+        full: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(legacy_ids), BATCH_GET_MAX_KEYS):
+            chunk = legacy_ids[start:start + BATCH_GET_MAX_KEYS]
+            keys = [{'conversationId': conversation_id} for conversation_id in chunk]
+            for item in self._batch_get_items(self.table, keys):
+                full[item['conversationId']] = item
+        return [full.get(item['conversationId'], item) if 'messageCount' not in item else item for item in items]
+    
+    def _query_user_index(
+        self,
+        user_id: str,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        engine_type: Optional[str] = None,
+        attributes: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """userId 인덱스를 최신순으로 조회 - (아이템 목록, LastEvaluatedKey) 반환
+        
+        인덱스가 없거나 아직 생성 중이면 테이블 스캔으로 대신한다.
+        """
+        try:
+            return self._query_index(user_id, limit, exclusive_start_key, engine_type, attributes)
+        except ClientError as e:
+            if not _is_missing_index(e):
+                raise
+            logger.warning(f"User index {self.user_index_name} unavailable, falling back to scan: {e}")
+            return self._scan_user(user_id, limit, exclusive_start_key, engine_type, attributes)
+    
+    def _query_index(
+        self,
+        user_id: str,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        engine_type: Optional[str] = None,
+        attributes: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        items = []
+        last_evaluated_key = exclusive_start_key
+        
+        while True:
+            query_params = {
+                'IndexName': self.user_index_name,
+                'KeyConditionExpression': Key('userId').eq(user_id),
+                'ScanIndexForward': False,  # updatedAt 내림차순
+                # 남은 개수만큼만 평가해야 LastEvaluatedKey가 페이지 경계와 일치
+                'Limit': limit - len(items)
+            }
+
+            if engine_type:
+                query_params['FilterExpression'] = Attr('engineType').eq(engine_type)
+
+            if attributes:
+                # title 등 예약어 충돌을 피하기 위해 모든 속성을 이름 치환
+                names = {f'#a{i}': name for i, name in enumerate(attributes)}
+                query_params['ProjectionExpression'] = ', '.join(names)
+                query_params['ExpressionAttributeNames'] = names
+
+            if last_evaluated_key:
+                query_params['ExclusiveStartKey'] = last_evaluated_key
+
+            response = self.table.query(**query_params)
+            items.extend(response.get('Items', []))
+            
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key or len(items) >= limit:
+                break
+        
+        return items, last_evaluated_key
+    
+    def _scan_user(
+        self,
+        user_id: str,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        engine_type: Optional[str] = None,
+        attributes: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """인덱스 없이 사용자 대화를 스캔해 최신순 페이지 구성 (커서는 인덱스 조회와 같은 형식)"""
+        filter_expression = Attr('userId').eq(user_id)
+        if engine_type:
+            filter_expression = filter_expression & Attr('engineType').eq(engine_type)
+        scan_params: Dict[str, Any] = {'FilterExpression': filter_expression}
+        if attributes:
+            names = {f'#a{i}': name for i, name in enumerate(attributes)}
+            scan_params['ProjectionExpression'] = ', '.join(names)
+            scan_params['ExpressionAttributeNames'] = names
+        
+        items = []
+        while True:
+            response = self.table.scan(**scan_params)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        def sort_key(item: Dict[str, Any]) -> Tuple[str, str]:
+            return (item.get('updatedAt') or '', item.get('conversationId') or '')
+        
+        items.sort(key=sort_key, reverse=True)
+        if exclusive_start_key:
+            cursor = sort_key(exclusive_start_key)
+            items = [item for item in items if sort_key(item) < cursor]
+        
+        page = items[:limit]
+        last_evaluated_key = None
+        if len(items) > limit:
+            last = page[-1]
+            last_evaluated_key = {
+                'conversationId': last['conversationId'],
+                'userId': user_id,
+                'updatedAt': last.get('updatedAt') or ''
+            }
+        return page, last_evaluated_key
+    
     def update_title(self, conversation_id: str, title: str) -> bool:
         """대화 제목 업데이트"""
         try:
@@ -115,6 +645,7 @@ class ConversationRepository:
                 },
                 ReturnValues='UPDATED_NEW'
             )
+            self.invalidate_cache(conversation_id)
             
             logger.info(f"Title successfully updated for conversation: {conversation_id}")
             return True
@@ -124,15 +655,38 @@ class ConversationRepository:
             raise
     
     def delete(self, conversation_id: str) -> bool:
-        """대화 삭제"""
+        """대화 삭제 (메시지 아이템 포함)"""
         try:
             self.table.delete_item(
                 Key={'conversationId': conversation_id}
             )
+            self.invalidate_cache(conversation_id)
+            
+            last_evaluated_key = None
+            with self.messages_table.batch_writer() as batch:
+                while True:
+                    query_params = {
+                        'KeyConditionExpression': Key('conversationId').eq(conversation_id),
+                        'ProjectionExpression': 'conversationId, #seq',
+                        'ExpressionAttributeNames': {'#seq': 'sequence'}
+                    }
+                    if last_evaluated_key:
+                        query_params['ExclusiveStartKey'] = last_evaluated_key
+                    
+                    response = self.messages_table.query(**query_params)
+                    for item in response.get('Items', []):
+                        batch.delete_item(Key={
+                            'conversationId': item['conversationId'],
+                            'sequence': item['sequence']
+                        })
+                    
+                    last_evaluated_key = response.get('LastEvaluatedKey')
+                    if not last_evaluated_key:
+                        break
             
             logger.info(f"Conversation deleted: {conversation_id}")
             return True
             
         except Exception as e:
             logger.error(f"Error deleting conversation: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,139 @@
+"""
+진행 중인 응답 생성(generation) 상태 저장소
+중단 요청(stopGeneration)이 생성 중인 프로세스와 다른 곳에서 들어와도 전달되도록
+생성 ID 별 상태를 보관 (로컬: 메모리, Lambda: DynamoDB + TTL)
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import logging
+import os
+import threading
+import time
+
+from .cache import TTLCache
+from .store_factory import dynamodb_table, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# 상태 보관 시간 (DynamoDB 는 expiresAt 속성 TTL 로 정리)
+GENERATION_TTL = int(os.environ.get('GENERATION_TTL', '3600'))
+
+STATUS_RUNNING = 'running'
+STATUS_STOPPING = 'stopping'
+STATUS_DONE = 'done'
+
+
+class GenerationStore(ABC):
+    """생성 상태 저장소 인터페이스"""
+
+    @abstractmethod
+    def create(self, generation_id: str, connection_id: Optional[str] = None) -> None:
+        """생성 시작 기록"""
+
+    @abstractmethod
+    def request_stop(self, generation_id: str, connection_id: Optional[str] = None) -> bool:
+        """중단 요청 (connection_id 를 주면 같은 연결이 시작한 생성만) - 진행 중이었으면 True"""
+
+    @abstractmethod
+    def is_stop_requested(self, generation_id: str) -> bool:
+        """중단 요청 여부"""
+
+    @abstractmethod
+    def finish(self, generation_id: str, status: str = STATUS_DONE) -> None:
+        """생성 종료 기록"""
+
+
+class InMemoryGenerationStore(GenerationStore):
+    """프로세스 내 저장소 (로컬 서버/테스트용)"""
+
+    def __init__(self, ttl: float = GENERATION_TTL):
+        self._items = TTLCache(maxsize=int(os.environ.get('GENERATION_CACHE_SIZE', '4096')), ttl=ttl)
+        self._lock = threading.Lock()
+
+    def create(self, generation_id: str, connection_id: Optional[str] = None) -> None:
+        self._items.set(generation_id, {'connectionId': connection_id, 'status': STATUS_RUNNING})
+
+    def request_stop(self, generation_id: str, connection_id: Optional[str] = None) -> bool:
+        with self._lock:
+            item = self._items.get(generation_id)
+            if item is None or item['status'] != STATUS_RUNNING:
+                return False
+            if connection_id and item['connectionId'] != connection_id:
+                return False
+            self._items.set(generation_id, {**item, 'status': STATUS_STOPPING})
+            return True
+
+    def is_stop_requested(self, generation_id: str) -> bool:
+        item = self._items.get(generation_id)
+        return item is not None and item['status'] == STATUS_STOPPING
+
+    def finish(self, generation_id: str, status: str = STATUS_DONE) -> None:
+        with self._lock:
+            item = self._items.get(generation_id)
+            if item is not None:
+                self._items.set(generation_id, {**item, 'status': status})
+
+
+class DynamoGenerationStore(GenerationStore):
+    """DynamoDB 백엔드 - generationId(PK), status, connectionId, expiresAt(TTL)"""
+
+    def __init__(self, table_name: str = None, region: str = None, ttl: int = GENERATION_TTL):
+        self.table = dynamodb_table('GENERATIONS_TABLE', 'one-generations', table_name, region)
+        self.ttl = ttl
+
+    def create(self, generation_id: str, connection_id: Optional[str] = None) -> None:
+        item: Dict[str, Any] = {
+            'generationId': generation_id,
+            'status': STATUS_RUNNING,
+            'expiresAt': int(time.time()) + self.ttl
+        }
+        if connection_id:
+            item['connectionId'] = connection_id
+        self.table.put_item(Item=item)
+
+    def request_stop(self, generation_id: str, connection_id: Optional[str] = None) -> bool:
+        from botocore.exceptions import ClientError
+
+        condition = '#status = :running'
+        values: Dict[str, Any] = {':running': STATUS_RUNNING, ':stopping': STATUS_STOPPING}
+        if connection_id:
+            condition += ' AND connectionId = :connection'
+            values[':connection'] = connection_id
+        try:
+            self.table.update_item(
+                Key={'generationId': generation_id},
+                UpdateExpression='SET #status = :stopping',
+                ConditionExpression=condition,
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def is_stop_requested(self, generation_id: str) -> bool:
+        response = self.table.get_item(
+            Key={'generationId': generation_id},
+            ProjectionExpression='#status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ConsistentRead=True
+        )
+        return response.get('Item', {}).get('status') == STATUS_STOPPING
+
+    def finish(self, generation_id: str, status: str = STATUS_DONE) -> None:
+        self.table.update_item(
+            Key={'generationId': generation_id},
+            UpdateExpression='SET #status = :status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':status': status}
+        )
+
+
+def get_generation_store(backend: str = None) -> GenerationStore:
+    """GENERATION_STORE 설정 (dynamodb | memory) 에 따른 공용 저장소"""
+    return get_shared_store('generation', 'GENERATION_STORE', {
+        'dynamodb': DynamoGenerationStore,
+        'memory': InMemoryGenerationStore
+    }, backend)
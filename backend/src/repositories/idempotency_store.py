@@ -0,0 +1,135 @@
+"""
+sendMessage 중복 요청(idempotencyKey) 저장소
+재연결 후 클라이언트가 같은 요청을 다시 보내도 생성은 한 번만 하도록
+키별로 첫 요청의 생성 ID 와 완료 결과를 보관 (로컬: 메모리, Lambda: DynamoDB 조건부 쓰기 + TTL)
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+from .cache import TTLCache
+from .store_factory import dynamodb_table, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# 키 보관 시간(초) - 이 시간 안에 다시 온 같은 키의 요청은 중복으로 처리
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', '600'))
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+
+
+class IdempotencyStore(ABC):
+    """중복 요청 저장소 인터페이스
+
+    기록 형식: {'generationId', 'status', 'result'(완료 시: chunks, usage, stop_reason, stopped)}
+    """
+
+    @abstractmethod
+    def claim(self, key: str, generation_id: str) -> Optional[Dict[str, Any]]:
+        """키 선점 - 처음 온 요청이면 None, 이미 선점된 키면 기존 기록 반환"""
+
+    @abstractmethod
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        """생성 결과 기록"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """기록 조회"""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """선점 해제 (생성 실패 시 재전송으로 다시 생성할 수 있도록)"""
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """프로세스 내 저장소 (로컬 서버용)"""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL):
+        self._items = TTLCache(maxsize=int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '4096')), ttl=ttl)
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, generation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._items.get(key)
+            if record is not None:
+                return record
+            self._items.set(key, {'generationId': generation_id, 'status': STATUS_RUNNING})
+            return None
+
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            record = self._items.get(key)
+            if record is not None:
+                self._items.set(key, {**record, 'status': STATUS_DONE, 'result': result})
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._items.get(key)
+
+    def release(self, key: str) -> None:
+        self._items.invalidate(key)
+
+
+class DynamoIdempotencyStore(IdempotencyStore):
+    """DynamoDB 백엔드 - idempotencyKey(PK), generationId, status, result(JSON), expiresAt(TTL)"""
+
+    def __init__(self, table_name: str = None, region: str = None, ttl: int = IDEMPOTENCY_TTL):
+        self.table = dynamodb_table('IDEMPOTENCY_TABLE', 'one-idempotency', table_name, region)
+        self.ttl = ttl
+
+    def claim(self, key: str, generation_id: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+
+        now = int(time.time())
+        try:
+            # TTL 삭제는 지연될 수 있으므로 만료된 기록은 덮어쓴다
+            self.table.put_item(
+                Item={
+                    'idempotencyKey': key,
+                    'generationId': generation_id,
+                    'status': STATUS_RUNNING,
+                    'expiresAt': now + self.ttl
+                },
+                ConditionExpression='attribute_not_exists(idempotencyKey) OR expiresAt < :now',
+                ExpressionAttributeValues={':now': now}
+            )
+            return None
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+        return self.get(key)
+
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        self.table.update_item(
+            Key={'idempotencyKey': key},
+            UpdateExpression='SET #status = :done, #result = :result',
+            ExpressionAttributeNames={'#status': 'status', '#result': 'result'},
+            ExpressionAttributeValues={
+                ':done': STATUS_DONE,
+                ':result': json.dumps(result, ensure_ascii=False, default=str)
+            }
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.table.get_item(Key={'idempotencyKey': key}, ConsistentRead=True).get('Item')
+        if item is None or int(item.get('expiresAt', 0)) < int(time.time()):
+            return None
+        record = {'generationId': item['generationId'], 'status': item['status']}
+        if item.get('result'):
+            record['result'] = json.loads(item['result'])
+        return record
+
+    def release(self, key: str) -> None:
+        self.table.delete_item(Key={'idempotencyKey': key})
+
+
+def get_idempotency_store(backend: str = None) -> IdempotencyStore:
+    """IDEMPOTENCY_STORE 설정 (dynamodb | memory) 에 따른 공용 저장소"""
+    return get_shared_store('idempotency', 'IDEMPOTENCY_STORE', {
+        'dynamodb': DynamoIdempotencyStore,
+        'memory': InMemoryIdempotencyStore
+    }, backend)
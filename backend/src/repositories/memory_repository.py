@@ -0,0 +1,156 @@
+"""
+대화(Conversation) 리포지토리 - 인메모리 백엔드
+로컬 개발 서버와 부하 테스트용 (프로세스 내 저장, 재시작 시 초기화)
+"""
+from dataclasses import replace
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import copy
+import logging
+import threading
+
+from ..models import Conversation, ConversationSummary, Message
+from ..models.conversation import build_preview
+from .base import BaseConversationRepository, decode_page_token, encode_page_token
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryConversationRepository(BaseConversationRepository):
+    """대화 데이터 접근 계층 (프로세스 메모리)"""
+
+    def __init__(self):
+        self._conversations: Dict[str, Conversation] = {}
+        self._messages: Dict[str, List[Message]] = {}
+        self._lock = threading.RLock()
+        logger.info("InMemoryConversationRepository initialized")
+
+    def save(self, conversation: Conversation) -> Conversation:
+        """대화 저장"""
+        with self._lock:
+            new_messages = self._prepare_save(conversation)
+            conversation_id = conversation.conversation_id
+
+            header = replace(conversation, messages=[], metadata=copy.deepcopy(conversation.metadata))
+            self._conversations[conversation_id] = header
+            self._messages.setdefault(conversation_id, []).extend(copy.deepcopy(new_messages))
+
+            # 요약 속성은 저장된 전체 메시지 기준으로 유지
+            header.message_count = len(self._messages[conversation_id])
+            header.preview = build_preview(self._messages[conversation_id])
+            logger.info(f"Conversation saved: {conversation_id} ({len(new_messages)} new messages)")
+            return conversation
+
+    def create(self, conversation: Conversation) -> Tuple[Conversation, bool]:
+        """대화가 없을 때만 생성"""
+        with self._lock:
+            if conversation.conversation_id and conversation.conversation_id in self._conversations:
+                return self.find_by_id(conversation.conversation_id), False
+            return self.save(conversation), True
+
+    def append_message(self, conversation_id: str, message: Message) -> Message:
+        """메시지 1건 추가"""
+        with self._lock:
+            header = self._conversations.get(conversation_id)
+            if header is None:
+                raise KeyError(f"Conversation not found: {conversation_id}")
+
+            messages = self._messages.setdefault(conversation_id, [])
+            message.sequence = len(messages)
+            messages.append(copy.deepcopy(message))
+            header.message_count = len(messages)
+            header.preview = build_preview([message])
+            header.updated_at = datetime.now().isoformat()
+            return message
+
+    def find_by_id(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """ID로 대화 조회"""
+        with self._lock:
+            header = self._conversations.get(conversation_id)
+            if header is None:
+                return None
+
+            conversation = copy.deepcopy(header)
+            conversation.messages = copy.deepcopy(self._slice_messages(
+                self._messages.get(conversation_id, []), message_limit, before_sequence
+            ))
+            return conversation
+
+    def find_by_user(self, user_id: str, limit: int = 1000) -> List[Conversation]:
+        """사용자별 대화 목록 조회 (최신순)"""
+        with self._lock:
+            return [copy.deepcopy(header) for header in self._sorted_for_user(user_id)[:limit]]
+
+    def find_page_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        next_token: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """사용자별 대화 요약 페이지 조회"""
+        start_key = decode_page_token(next_token)
+        with self._lock:
+            headers = self._sorted_for_user(user_id)
+
+            if start_key:
+                cursor = (start_key.get('updatedAt') or '', start_key.get('conversationId') or '')
+                headers = [h for h in headers if self._sort_key(h) < cursor]
+            if engine_type:
+                headers = [h for h in headers if h.engine_type == engine_type]
+
+            page = headers[:limit]
+            last_key = None
+            if len(headers) > limit:
+                last = page[-1]
+                last_key = {
+                    'conversationId': last.conversation_id,
+                    'userId': last.user_id,
+                    'updatedAt': last.updated_at
+                }
+            return [self._summary(h) for h in page], encode_page_token(last_key)
+
+    def update_title(self, conversation_id: str, title: str) -> bool:
+        """대화 제목 업데이트"""
+        with self._lock:
+            header = self._conversations.get(conversation_id)
+            if header is None:
+                return False
+            header.title = title
+            header.updated_at = datetime.now().isoformat()
+            return True
+
+    def delete(self, conversation_id: str) -> bool:
+        """대화 삭제"""
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+            self._messages.pop(conversation_id, None)
+            return True
+
+    def _sorted_for_user(self, user_id: str) -> List[Conversation]:
+        """사용자의 대화 헤더를 updatedAt 내림차순으로 정렬"""
+        headers = [h for h in self._conversations.values() if h.user_id == user_id]
+        headers.sort(key=self._sort_key, reverse=True)
+        return headers
+
+    @staticmethod
+    def _sort_key(header: Conversation) -> Tuple[str, str]:
+        return (header.updated_at or '', header.conversation_id)
+
+    def _summary(self, header: Conversation) -> ConversationSummary:
+        messages = self._messages.get(header.conversation_id, [])
+        return ConversationSummary(
+            conversation_id=header.conversation_id,
+            user_id=header.user_id,
+            engine_type=header.engine_type,
+            title=header.title,
+            created_at=header.created_at,
+            updated_at=header.updated_at,
+            message_count=len(messages),
+            preview=build_preview(messages)
+        )
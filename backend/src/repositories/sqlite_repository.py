@@ -0,0 +1,298 @@
+"""
+대화(Conversation) 리포지토리 - SQLite 백엔드
+AWS 없이 로컬 개발/부하 테스트를 위한 파일 기반 저장소 (WAL 모드)
+"""
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from ..models import Conversation, ConversationSummary, Message
+from ..models.conversation import build_preview
+from .base import BaseConversationRepository, decode_page_token, encode_page_token
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    engine_type TEXT NOT NULL,
+    title TEXT,
+    created_at TEXT,
+    updated_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    preview TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+    ON conversations (user_id, updated_at DESC, conversation_id DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    type TEXT,
+    content TEXT,
+    timestamp TEXT,
+    metadata TEXT,
+    PRIMARY KEY (conversation_id, sequence)
+);
+"""
+
+SUMMARY_COLUMNS = (
+    'conversation_id, user_id, engine_type, title, created_at, updated_at, message_count, preview'
+)
+
+
+class SQLiteConversationRepository(BaseConversationRepository):
+    """대화 데이터 접근 계층 (SQLite)"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.environ.get('CONVERSATION_SQLITE_PATH', 'conversations.db')
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        logger.info(f"SQLiteConversationRepository initialized with database: {self.db_path}")
+
+    def save(self, conversation: Conversation) -> Conversation:
+        """대화 저장"""
+        try:
+            with self._lock, self._conn:
+                new_messages = self._prepare_save(conversation)
+                self._write(conversation, new_messages, 'INSERT OR REPLACE')
+
+            logger.info(f"Conversation saved: {conversation.conversation_id} ({len(new_messages)} new messages)")
+            return conversation
+
+        except Exception as e:
+            logger.error(f"Error saving conversation: {str(e)}")
+            raise
+
+    def create(self, conversation: Conversation) -> Tuple[Conversation, bool]:
+        """대화가 없을 때만 생성 (INSERT OR IGNORE)"""
+        try:
+            with self._lock:
+                with self._conn:
+                    new_messages = self._prepare_save(conversation)
+                    created = self._write(conversation, new_messages, 'INSERT OR IGNORE')
+                if not created:
+                    return self.find_by_id(conversation.conversation_id), False
+
+            logger.info(f"Conversation created: {conversation.conversation_id}")
+            return conversation, True
+
+        except Exception as e:
+            logger.error(f"Error creating conversation: {str(e)}")
+            raise
+
+    def _write(self, conversation: Conversation, new_messages: List[Message], verb: str) -> bool:
+        """헤더를 기록하고 성공하면 새 메시지 기록 - 헤더 기록 여부 반환"""
+        cursor = self._conn.execute(
+            f'{verb} INTO conversations '
+            '(conversation_id, user_id, engine_type, title, created_at, updated_at, '
+            'message_count, preview, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                conversation.conversation_id,
+                conversation.user_id,
+                conversation.engine_type,
+                conversation.title,
+                conversation.created_at,
+                conversation.updated_at,
+                conversation.message_count,
+                conversation.current_preview(),
+                json.dumps(conversation.metadata or {}, ensure_ascii=False, default=str)
+            )
+        )
+        if cursor.rowcount == 0:
+            return False
+
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO messages '
+            '(conversation_id, sequence, role, type, content, timestamp, metadata) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [self._message_row(conversation.conversation_id, msg) for msg in new_messages]
+        )
+        return True
+
+    def append_message(self, conversation_id: str, message: Message) -> Message:
+        """메시지 1건 추가"""
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    'SELECT message_count FROM conversations WHERE conversation_id = ?',
+                    (conversation_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"Conversation not found: {conversation_id}")
+
+                message.sequence = row['message_count']
+                self._conn.execute(
+                    'INSERT INTO messages '
+                    '(conversation_id, sequence, role, type, content, timestamp, metadata) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    self._message_row(conversation_id, message)
+                )
+                self._conn.execute(
+                    'UPDATE conversations SET message_count = message_count + 1, '
+                    'preview = ?, updated_at = ? WHERE conversation_id = ?',
+                    (build_preview([message]), datetime.now().isoformat(), conversation_id)
+                )
+            return message
+
+        except Exception as e:
+            logger.error(f"Error appending message to {conversation_id}: {str(e)}")
+            raise
+
+    def find_by_id(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """ID로 대화 조회"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM conversations WHERE conversation_id = ?',
+                (conversation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            sql = 'SELECT * FROM messages WHERE conversation_id = ?'
+            params: List[Any] = [conversation_id]
+            if before_sequence is not None:
+                sql += ' AND sequence < ?'
+                params.append(before_sequence)
+            sql += ' ORDER BY sequence DESC'
+            if message_limit:
+                sql += ' LIMIT ?'
+                params.append(message_limit)
+            message_rows = self._conn.execute(sql, params).fetchall()
+
+        conversation = self._conversation_from_row(row)
+        conversation.messages = [self._message_from_row(r) for r in reversed(message_rows)]
+        return conversation
+
+    def find_by_user(self, user_id: str, limit: int = 1000) -> List[Conversation]:
+        """사용자별 대화 목록 조회 (최신순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM conversations WHERE user_id = ? '
+                'ORDER BY updated_at DESC, conversation_id DESC LIMIT ?',
+                (user_id, limit)
+            ).fetchall()
+        return [self._conversation_from_row(row) for row in rows]
+
+    def find_page_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        next_token: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """사용자별 대화 요약 페이지 조회 (키셋 페이지네이션)"""
+        start_key = decode_page_token(next_token)
+
+        sql = f'SELECT {SUMMARY_COLUMNS} FROM conversations WHERE user_id = ?'
+        params: List[Any] = [user_id]
+        if start_key:
+            sql += ' AND (updated_at, conversation_id) < (?, ?)'
+            params.extend([start_key.get('updatedAt') or '', start_key.get('conversationId') or ''])
+        if engine_type:
+            sql += ' AND engine_type = ?'
+            params.append(engine_type)
+        # 다음 페이지 존재 여부 확인을 위해 1건 더 조회
+        sql += ' ORDER BY updated_at DESC, conversation_id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        page = rows[:limit]
+        last_key = None
+        if len(rows) > limit:
+            last = page[-1]
+            last_key = {
+                'conversationId': last['conversation_id'],
+                'userId': last['user_id'],
+                'updatedAt': last['updated_at']
+            }
+        summaries = [
+            ConversationSummary(
+                conversation_id=row['conversation_id'],
+                user_id=row['user_id'],
+                engine_type=row['engine_type'],
+                title=row['title'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+                message_count=row['message_count'],
+                preview=row['preview']
+            )
+            for row in page
+        ]
+        return summaries, encode_page_token(last_key)
+
+    def update_title(self, conversation_id: str, title: str) -> bool:
+        """대화 제목 업데이트"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'UPDATE conversations SET title = ?, updated_at = ? WHERE conversation_id = ?',
+                (title, datetime.now().isoformat(), conversation_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, conversation_id: str) -> bool:
+        """대화 삭제 (메시지 포함)"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM messages WHERE conversation_id = ?', (conversation_id,))
+            self._conn.execute('DELETE FROM conversations WHERE conversation_id = ?', (conversation_id,))
+        logger.info(f"Conversation deleted: {conversation_id}")
+        return True
+
+    def close(self) -> None:
+        """연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _message_row(conversation_id: str, message: Message) -> Tuple:
+        return (
+            conversation_id,
+            message.sequence,
+            message.role,
+            message.type or message.role,
+            message.content,
+            message.timestamp,
+            json.dumps(message.metadata or {}, ensure_ascii=False, default=str)
+        )
+
+    @staticmethod
+    def _message_from_row(row: sqlite3.Row) -> Message:
+        return Message(
+            role=row['role'],
+            content=row['content'],
+            timestamp=row['timestamp'],
+            type=row['type'] or row['role'],
+            metadata=json.loads(row['metadata'] or '{}'),
+            sequence=row['sequence']
+        )
+
+    @staticmethod
+    def _conversation_from_row(row: sqlite3.Row) -> Conversation:
+        return Conversation(
+            conversation_id=row['conversation_id'],
+            user_id=row['user_id'],
+            engine_type=row['engine_type'],
+            title=row['title'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+            metadata=json.loads(row['metadata'] or '{}'),
+            message_count=row['message_count'],
+            preview=row['preview']
+        )
@@ -0,0 +1,40 @@
+"""
+보조 저장소 백엔드 선택
+생성 상태/조각 업로드/중복 제거/청크 기록 저장소는 <이름>_STORE 설정(dynamodb | memory)으로
+백엔드를 고르고, 프로세스 내에서 같은 인스턴스를 공유한다 (create_conversation_repository 와 같은 방식)
+"""
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+import os
+import threading
+
+T = TypeVar('T')
+
+_shared_stores: Dict[Hashable, object] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_store(
+    name: str,
+    env_var: str,
+    factories: Dict[str, Callable[[], T]],
+    backend: Optional[str] = None
+) -> T:
+    """env_var 설정(기본 dynamodb)에 따른 공용 저장소 - factories 는 백엔드 이름별 생성 함수"""
+    backend = (backend or os.environ.get(env_var, 'dynamodb')).lower()
+    if backend not in factories:
+        raise ValueError(f"Unknown {name} store: {backend}")
+
+    with _shared_lock:
+        key = (name, backend)
+        if key not in _shared_stores:
+            _shared_stores[key] = factories[backend]()
+        return _shared_stores[key]
+
+
+def dynamodb_table(table_env: str, default_table: str, table_name: str = None, region: str = None):
+    """저장소용 DynamoDB 테이블 (이름은 인자 > table_env 설정 > 기본값, 리전은 AWS_REGION)"""
+    from ..clients import get_resource
+
+    table_name = table_name or os.environ.get(table_env, default_table)
+    region = region or os.environ.get('AWS_REGION', 'us-east-1')
+    return get_resource('dynamodb', region).Table(table_name)
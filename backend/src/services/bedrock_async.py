@@ -0,0 +1,125 @@
+"""
+비동기 Bedrock 스트리밍 클라이언트
+botocore 로 SigV4 서명만 하고 전송은 httpx 비동기 클라이언트로 처리해
+스트림 읽기가 이벤트 루프를 막지 않는다 (이벤트 스트림 프레임은 EventStreamBuffer 로 디코딩)
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import quote
+import base64
+import json
+import logging
+import os
+import threading
+
+from ..clients import get_async_http_client, get_session
+
+logger = logging.getLogger(__name__)
+
+BEDROCK_SERVICE = 'bedrock'
+BEDROCK_TIMEOUT = float(os.environ.get('BEDROCK_TIMEOUT', '120'))
+
+
+class BedrockStreamError(Exception):
+    """Bedrock 호출/스트림 오류 (code 는 AWS 오류 코드)"""
+
+    def __init__(self, message: str, code: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+class AsyncBedrockClient:
+    """invoke-with-response-stream 비동기 호출"""
+
+    def __init__(self, region: str, credentials=None, endpoint_url: str = None, timeout: float = BEDROCK_TIMEOUT):
+        self.region = region
+        self.endpoint_url = (endpoint_url or f"https://bedrock-runtime.{region}.amazonaws.com").rstrip('/')
+        self.timeout = timeout
+        self._credentials = credentials
+        self._credentials_lock = threading.Lock()
+
+    def _http_client(self):
+        return get_async_http_client(streaming=True)
+
+    def _frozen_credentials(self):
+        with self._credentials_lock:
+            if self._credentials is None:
+                self._credentials = get_session().get_credentials()
+                if self._credentials is None:
+                    raise BedrockStreamError('AWS 자격 증명을 찾을 수 없습니다.')
+        # 갱신형 자격 증명은 만료 시 여기서 새로 받아온다
+        return self._credentials.get_frozen_credentials()
+
+    def _signed_headers(self, url: str, body: bytes) -> Dict[str, str]:
+        from botocore.auth import SigV4Auth
+        from botocore.awsrequest import AWSRequest
+
+        request = AWSRequest(
+            method='POST',
+            url=url,
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/vnd.amazon.eventstream'
+            }
+        )
+        SigV4Auth(self._frozen_credentials(), BEDROCK_SERVICE, self.region).add_auth(request)
+        return dict(request.headers.items())
+
+    async def invoke_stream(self, model_id: str, body: bytes) -> AsyncIterator[Dict[str, Any]]:
+        """모델 스트림 호출 - chunk 페이로드(JSON)를 도착 순서대로 반환"""
+        import httpx
+        from botocore.eventstream import EventStreamBuffer
+
+        url = f"{self.endpoint_url}/model/{quote(model_id, safe='')}/invoke-with-response-stream"
+        headers = self._signed_headers(url, body)
+
+        try:
+            async with self._http_client().stream(
+                'POST', url, content=body, headers=headers,
+                timeout=httpx.Timeout(self.timeout, connect=10.0)
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise self._http_error(response)
+
+                buffer = EventStreamBuffer()
+                async for data in response.aiter_bytes():
+                    buffer.add_data(data)
+                    for message in buffer:
+                        payload = self._decode_message(message)
+                        if payload is not None:
+                            yield payload
+        except httpx.TransportError as e:
+            raise BedrockStreamError(f"Bedrock 연결 오류: {e}", code='ConnectionError') from e
+
+    @staticmethod
+    def _decode_message(message) -> Optional[Dict[str, Any]]:
+        headers = message.headers
+        message_type = headers.get(':message-type')
+        if message_type == 'event':
+            if headers.get(':event-type') != 'chunk':
+                return None
+            chunk = json.loads(message.payload)
+            return json.loads(base64.b64decode(chunk['bytes']))
+
+        # exception / error 프레임
+        code = headers.get(':exception-type') or headers.get(':error-code')
+        try:
+            detail = json.loads(message.payload).get('message')
+        except (ValueError, AttributeError):
+            detail = message.payload.decode('utf-8', 'replace')
+        raise BedrockStreamError(f"{code}: {detail or headers.get(':error-message')}", code=code)
+
+    @staticmethod
+    def _http_error(response) -> BedrockStreamError:
+        code = (response.headers.get('x-amzn-errortype') or '').split(':')[0] or None
+        try:
+            detail = response.json().get('message')
+        except ValueError:
+            detail = response.text[:500]
+        return BedrockStreamError(
+            f"Bedrock 오류: {response.status_code} {code}: {detail}",
+            code=code,
+            status_code=response.status_code
+        )
@@ -0,0 +1,171 @@
+"""
+모델 스트림 → 클라이언트 ai_chunk 프레임 전송
+모든 WebSocket 서버와 Lambda 핸들러가 공유하는 스트리밍 단계
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import os
+
+from ..repositories.cache import TTLCache
+from .chunk_coalescer import ChunkCoalescer
+from .generation import StopSignal
+from .llm_provider import LLMProvider, aclosing, partial_usage
+from .response_cache import get_cached_response, request_fingerprint, response_cache_key, store_response
+from .single_flight import Flight, flight_stream, join_flight
+
+SendFunc = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# 생성 ID → flight (재전송/재연결한 클라이언트가 진행 중이거나 끝난 생성에 다시 붙을 수 있도록 보관)
+_generation_flights = TTLCache(
+    maxsize=int(os.environ.get('GENERATION_FLIGHT_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('GENERATION_FLIGHT_TTL', '600'))
+)
+
+
+@dataclass
+class StreamResult:
+    """스트리밍 결과"""
+    # 마지막 chunk_index + 1 (재개한 경우 이전 연결로 보낸 청크 포함)
+    total_chunks: int = 0
+    parts: List[str] = field(default_factory=list)
+    usage: Dict[str, Any] = field(default_factory=dict)
+    stop_reason: Optional[str] = None
+    cached: bool = False
+    # 같은 요청의 진행 중 생성에 합류했는지
+    shared: bool = False
+    # 중단 요청으로 끝났는지 (usage 의 출력 토큰은 추정값)
+    stopped: bool = False
+    # 같은 idempotencyKey 로 먼저 온 요청의 응답을 받았는지
+    duplicate: bool = False
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+
+async def stream_to_client(
+    send: SendFunc,
+    provider: LLMProvider,
+    messages: List[Dict[str, Any]],
+    coalescer: Optional[ChunkCoalescer] = None,
+    engine_type: Optional[str] = None,
+    stop: Optional[StopSignal] = None,
+    **kwargs
+) -> StreamResult:
+    """모델 응답을 병합된 ai_chunk 프레임으로 전송 (chat_end 는 호출 측에서 전송)
+
+    engine_type 이 응답 캐시 대상이면 캐시된 응답을 같은 프레임 형식으로 재생한다.
+    같은 요청이 이미 생성 중이면 새로 호출하지 않고 그 생성의 청크를 처음부터 함께 받는다.
+    stop 이 설정되면 전송을 멈추고, 다른 구독자가 없으면 업스트림 스트림도 닫는다.
+    """
+    cache_key = response_cache_key(engine_type, provider, messages, **kwargs)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return await replay_to_client(send, cached.chunks, cached.usage, cached.stop_reason)
+
+    async def produce(flight: Flight):
+        await generate(flight, provider, messages, coalescer or ChunkCoalescer(), **kwargs)
+        store_response(cache_key, flight.chunks, flight.usage, flight.stop_reason)
+
+    flight, started = join_flight(request_fingerprint(engine_type, provider, messages, **kwargs), produce)
+    if stop is not None:
+        _generation_flights.set(stop.generation_id, flight)
+    return await _relay(send, flight, stop, shared=not started)
+
+
+async def attach_to_client(
+    send: SendFunc,
+    generation_id: str,
+    stop: Optional[StopSignal] = None,
+    start: int = 0
+) -> Optional[StreamResult]:
+    """이 프로세스에서 진행 중이거나 최근 끝난 생성의 청크를 start 번부터 전송 (알 수 없는 생성이면 None)"""
+    flight = _generation_flights.get(generation_id)
+    if flight is None or flight.error is not None or flight.task.get_loop() is not asyncio.get_running_loop():
+        return None
+    return await _relay(send, flight, stop, shared=True, start=start)
+
+
+async def _relay(
+    send: SendFunc,
+    flight: Flight,
+    stop: Optional[StopSignal],
+    shared: bool,
+    start: int = 0
+) -> StreamResult:
+    """flight 구독 - 청크를 ai_chunk 프레임으로 전송하고 결과 집계"""
+    result = StreamResult(total_chunks=start, shared=shared)
+    watcher = asyncio.create_task(stop.watch()) if stop is not None else None
+
+    try:
+        async with aclosing(flight_stream(flight, stop, start)) as chunks:
+            async for chunk in chunks:
+                await send({
+                    'type': 'ai_chunk',
+                    'chunk': chunk,
+                    'chunk_index': result.total_chunks
+                })
+                result.parts.append(chunk)
+                result.total_chunks += 1
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+
+    if flight.done and flight.error is None and result.total_chunks == len(flight.chunks):
+        result.usage = dict(flight.usage)
+        result.stop_reason = flight.stop_reason
+    else:
+        result.stopped = True
+        result.usage = partial_usage(flight.usage, ''.join(flight.chunks[:result.total_chunks]))
+    return result
+
+
+async def generate(
+    flight: Flight,
+    provider: LLMProvider,
+    messages: List[Dict[str, Any]],
+    coalescer: ChunkCoalescer,
+    **kwargs
+) -> None:
+    """모델 스트림을 병합해 flight 에 게시 (구독자 전송 속도와 무관하게 읽는다)"""
+    usage: Dict[str, Any] = {}
+    stop_reason = None
+
+    async def deltas():
+        nonlocal usage, stop_reason
+        async with aclosing(provider.stream(messages, **kwargs)) as events:
+            async for event in events:
+                if event.type == 'text':
+                    yield event.text
+                elif event.type == 'start':
+                    # 중단 시 사용량 보고용 입력 토큰
+                    flight.usage = dict(event.usage)
+                elif event.type == 'end':
+                    usage = event.usage
+                    stop_reason = event.stop_reason
+
+    async with aclosing(coalescer.coalesce(deltas())) as chunks:
+        async for chunk in chunks:
+            flight.publish(chunk)
+
+    flight.finish(usage, stop_reason)
+
+
+async def replay_to_client(
+    send: SendFunc,
+    chunks: Sequence[str],
+    usage: Optional[Dict[str, Any]] = None,
+    stop_reason: Optional[str] = None
+) -> StreamResult:
+    """저장된 청크를 ai_chunk 프레임으로 재전송"""
+    result = StreamResult(usage=dict(usage or {}), stop_reason=stop_reason, cached=True)
+    for chunk in chunks:
+        await send({
+            'type': 'ai_chunk',
+            'chunk': chunk,
+            'chunk_index': result.total_chunks
+        })
+        result.parts.append(chunk)
+        result.total_chunks += 1
+    return result
@@ -0,0 +1,213 @@
+"""
+ai_chunk 프레임 병합기
+모델의 작은 텍스트 델타를 시간 창/바이트 예산 단위로 모아 전송 프레임 수를 줄인다
+(분할은 문자소 경계에서만 - 결합 문자, ZWJ, 이체 선택자, 한글 자모 보호)
+"""
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
+import os
+import time
+
+# API Gateway WebSocket 프레임 한도 32KB - 봉투(type/chunk_index 등) 여유분 제외
+FRAME_LIMIT_BYTES = 32 * 1024
+ENVELOPE_RESERVE_BYTES = 512
+
+CHUNK_COALESCE_WINDOW_MS = float(os.environ.get('CHUNK_COALESCE_WINDOW_MS', '50'))
+CHUNK_COALESCE_MAX_BYTES = int(os.environ.get('CHUNK_COALESCE_MAX_BYTES', '2048'))
+
+ZWJ = '\u200d'
+
+
+def encoded_size(text: str) -> int:
+    """JSON 문자열로 직렬화했을 때 크기 (ensure_ascii 기준 - 최악의 경우)"""
+    return len(json.dumps(text)) - 2
+
+
+def _is_extender(char: str) -> bool:
+    """앞 문자에 붙어 하나의 문자소를 이루는 문자인지"""
+    code = ord(char)
+    return (
+        0x0300 <= code <= 0x036F          # 결합 발음 구별 기호
+        or 0x1AB0 <= code <= 0x1AFF
+        or 0x1DC0 <= code <= 0x1DFF
+        or 0x20D0 <= code <= 0x20FF
+        or 0xFE20 <= code <= 0xFE2F
+        or 0xFE00 <= code <= 0xFE0F       # 이체 선택자
+        or 0xE0100 <= code <= 0xE01EF
+        or 0x1F3FB <= code <= 0x1F3FF     # 이모지 피부색
+        or 0xE0020 <= code <= 0xE007F     # 태그 문자
+        or 0x1160 <= code <= 0x11FF       # 한글 중성/종성 자모
+        or 0xD7B0 <= code <= 0xD7FF
+        or char == ZWJ
+    )
+
+
+def _joins_next(char: str) -> bool:
+    """뒤 문자와 이어져야 하는 문자인지 (ZWJ, 한글 초성)"""
+    code = ord(char)
+    return char == ZWJ or 0x1100 <= code <= 0x115F or 0xA960 <= code <= 0xA97F
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def is_safe_boundary(text: str, index: int) -> bool:
+    """text[:index] / text[index:] 로 나눠도 문자소가 깨지지 않는지"""
+    if index <= 0 or index >= len(text):
+        return True
+    before, after = text[index - 1], text[index]
+    if _is_extender(after) or _joins_next(before):
+        return False
+    if _is_regional_indicator(before) and _is_regional_indicator(after):
+        # 국기 이모지는 지역 표시 문자 2개가 한 쌍
+        run = 0
+        i = index - 1
+        while i >= 0 and _is_regional_indicator(text[i]):
+            run += 1
+            i -= 1
+        return run % 2 == 0
+    return True
+
+
+def safe_split_index(text: str, limit_bytes: int) -> int:
+    """limit_bytes 이내에서 가장 긴 안전한 분할 위치 (없으면 0)"""
+    size = 0
+    index = 0
+    for i, char in enumerate(text):
+        size += encoded_size(char)
+        if size > limit_bytes:
+            break
+        index = i + 1
+    while index > 0 and not is_safe_boundary(text, index):
+        index -= 1
+    return index
+
+
+def pending_tail_start(text: str) -> int:
+    """다음 델타와 이어질 수 있는 끝부분 시작 위치 (불완전한 문자소는 다음 전송으로 미룸)"""
+    index = len(text)
+    if index and _is_regional_indicator(text[-1]):
+        run = 0
+        while run < index and _is_regional_indicator(text[index - 1 - run]):
+            run += 1
+        return index - 1 if run % 2 else index
+    while index > 0 and _joins_next(text[index - 1]):
+        index -= 1
+    while index > 0 and not is_safe_boundary(text, index):
+        index -= 1
+    return index
+
+
+def last_cluster_start(text: str) -> int:
+    """마지막 문자소 시작 위치 (다음 델타의 결합 문자/피부색/ZWJ 가 붙을 수 있는 부분)"""
+    index = pending_tail_start(text)
+    if index < len(text):
+        return index
+    index -= 1
+    while index > 0 and not is_safe_boundary(text, index):
+        index -= 1
+    return max(index, 0)
+
+
+class ChunkCoalescer:
+    """텍스트 델타 스트림을 전송 단위 청크 스트림으로 변환
+
+    - 첫 델타는 즉시 전송 (첫 토큰 지연 유지)
+    - 이후에는 window_ms 가 지나거나 max_bytes 를 넘으면 전송
+    - 한 청크는 프레임 한도를 넘지 않도록 문자소 경계에서 분할
+    - 크기로 전송할 때는 마지막 문자소를 남겨 다음 델타의 결합 문자와 합친다
+      (첫 델타/시간 창 전송은 지연을 피하려고 남기지 않는다)
+    """
+
+    def __init__(
+        self,
+        window_ms: float = CHUNK_COALESCE_WINDOW_MS,
+        max_bytes: int = CHUNK_COALESCE_MAX_BYTES,
+        frame_limit: int = FRAME_LIMIT_BYTES - ENVELOPE_RESERVE_BYTES
+    ):
+        self.window = max(window_ms, 0) / 1000
+        self.frame_limit = frame_limit
+        self.max_bytes = max(1, min(max_bytes, frame_limit))
+
+    def _split(self, text: str, final: bool, hold_last: bool = False) -> List[str]:
+        """버퍼를 전송할 청크들과 남길 부분으로 분할 - 마지막 원소가 남는 부분"""
+        chunks = []
+        while encoded_size(text) > self.max_bytes:
+            index = safe_split_index(text, self.max_bytes)
+            if index == 0:
+                # 경계 없이 한도를 넘는 문자소 - 프레임 한도 안에서 강제로 자른다
+                index = safe_split_index(text, self.frame_limit) or self._hard_split_index(text)
+            chunks.append(text[:index])
+            text = text[index:]
+        if final:
+            if text:
+                chunks.append(text)
+            return chunks + ['']
+        tail = last_cluster_start(text) if hold_last else pending_tail_start(text)
+        if tail:
+            chunks.append(text[:tail])
+        return chunks + [text[tail:]]
+
+    def _hard_split_index(self, text: str) -> int:
+        """프레임 한도보다 긴 문자소용 - 경계와 무관하게 한도 안에서 자른다"""
+        size = 0
+        for i, char in enumerate(text):
+            size += encoded_size(char)
+            if size > self.frame_limit:
+                return max(1, i)
+        return len(text)
+
+    async def coalesce(self, deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+        """델타를 모아 청크 단위로 반환"""
+        iterator = deltas.__aiter__()
+        buffer = ''
+        first = True
+        deadline: Optional[float] = None
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+                if not done:
+                    # 시간 창 만료 - 모인 내용 전송 (읽기는 계속 진행 중)
+                    *chunks, buffer = self._split(buffer, final=False)
+                    for chunk in chunks:
+                        yield chunk
+                    deadline = None if not buffer else time.monotonic() + self.window
+                    continue
+
+                task, pending = pending, None
+                try:
+                    delta = task.result()
+                except StopAsyncIteration:
+                    break
+
+                buffer += delta
+                if first or encoded_size(buffer) >= self.max_bytes:
+                    *chunks, buffer = self._split(buffer, final=False, hold_last=not first)
+                    for chunk in chunks:
+                        first = False
+                        yield chunk
+                if buffer and deadline is None:
+                    deadline = time.monotonic() + self.window
+                elif not buffer:
+                    deadline = None
+
+            *chunks, _ = self._split(buffer, final=True)
+            for chunk in chunks:
+                yield chunk
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                try:
+                    await pending
+                except (asyncio.CancelledError, StopAsyncIteration):
+                    pass
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose()
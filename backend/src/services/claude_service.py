@@ -1,48 +1,47 @@
-import anthropic
-import os
+from .chat_stream import stream_to_client
+from .context_builder import build_messages
+from .generation import finish_generation
+from .llm_provider import get_provider
+from .prompt_service import build_system_prompt
 
-async def generate_claude_response(websocket, message, engine):
-    """Claude API를 사용한 AI 응답 생성 및 스트리밍"""
+async def generate_claude_response(websocket, message, engine, history=None, stop=None):
+    """Claude API를 사용한 AI 응답 생성 및 스트리밍 (stop 이 설정되면 중단하고 stopped 로 종료 알림)
+
+    스트리밍 결과를 반환하고, 생성 오류로 끝나면 None.
+    """
     
     try:
-        client = anthropic.Anthropic(
-            api_key=os.environ.get('CLAUDE_API_KEY')
-        )
-        
-        # Claude 3.5 Sonnet 사용 (실제 존재하는 모델)
-        model = "claude-3-5-sonnet-20241022"
-        
         # 스트리밍 응답 생성
-        with client.messages.stream(
-            model=model,
-            max_tokens=4000,
-            messages=[{
-                "role": "user",
-                "content": message
-            }]
-        ) as stream:
-            chunk_index = 0
-            
-            for event in stream:
-                if event.type == "content_block_delta":
-                    if hasattr(event.delta, 'text') and event.delta.text:
-                        await websocket.send_json({
-                            "type": "ai_chunk",
-                            "chunk": event.delta.text,
-                            "chunk_index": chunk_index
-                        })
-                        chunk_index += 1
+        system = build_system_prompt(engine)
+        result = await stream_to_client(
+            websocket.send_json,
+            get_provider(default='anthropic'),
+            build_messages(message, history, engine_type=engine, system=system),
+            engine_type=engine,
+            stop=stop,
+            system=system
+        )
         
         # 스트리밍 완료
         await websocket.send_json({
             "type": "chat_end",
-            "total_chunks": chunk_index,
-            "engine": engine
+            "total_chunks": result.total_chunks,
+            "engine": engine,
+            "usage": result.usage,
+            "cached": result.cached,
+            "stopped": result.stopped,
+            "generationId": stop.generation_id if stop else None
         })
+        return result
         
     except Exception as e:
         print(f"Claude API 오류: {e}")
         await websocket.send_json({
             "type": "error",
             "message": f"AI 응답 생성 중 오류: {str(e)}"
-        })
\ No newline at end of file
+        })
+        return None
+    
+    finally:
+        if stop is not None:
+            finish_generation(stop)
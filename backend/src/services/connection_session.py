@@ -0,0 +1,268 @@
+"""
+WebSocket 연결 세션 (로컬 서버 공용)
+수신 루프는 메시지를 읽어 요청별 태스크로 넘기기만 하고, 모든 송신 프레임은
+연결당 하나의 writer 태스크가 큐 순서대로 보낸다 (생성 중에도 ping/stopGeneration 등을 바로 처리)
+
+송신 큐는 바이트 기준으로 제한한다 - 낮은 수위를 넘으면 뒤따르는 ai_chunk 를 큐 끝 프레임에 합치고,
+높은 수위를 넘으면 낮은 수위까지 빠질 때까지 전송을 기다리며, 그 상태가 오래가면 연결을 끊는다.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from ..repositories.chunk_upload_store import ChunkUploadError, get_chunk_upload_store
+from .chunk_coalescer import ENVELOPE_RESERVE_BYTES, FRAME_LIMIT_BYTES, encoded_size
+from .generation import STOP_DISCONNECTED, stop_generation
+from .message_assembler import reassemble_message
+from .stream_resume import serve_resume
+
+logger = logging.getLogger(__name__)
+
+# 연결당 송신 큐 수위(bytes)와 느린 클라이언트 차단 시간(초)
+SEND_QUEUE_HIGH_WATERMARK = int(os.environ.get('SEND_QUEUE_HIGH_WATERMARK', str(64 * 1024)))
+SEND_QUEUE_LOW_WATERMARK = int(os.environ.get('SEND_QUEUE_LOW_WATERMARK', str(16 * 1024)))
+SLOW_CONSUMER_TIMEOUT = float(os.environ.get('SLOW_CONSUMER_TIMEOUT', '15'))
+
+# ai_chunk 의 chunk 외 필드(type, chunk_index, generationId) 크기 추정치
+CHUNK_FRAME_OVERHEAD = 96
+# 느린 클라이언트 종료 코드 (1013: Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+_CLOSE = object()
+
+
+def frame_size(frame: Dict[str, Any]) -> int:
+    """큐 계량용 프레임 크기"""
+    if frame.get('type') == 'ai_chunk':
+        return encoded_size(frame.get('chunk') or '') + CHUNK_FRAME_OVERHEAD
+    return len(json.dumps(frame, default=str))
+
+
+class ConnectionClosedError(ConnectionError):
+    """닫힌 세션으로 전송 시도"""
+
+
+async def _resume(session: 'ConnectionSession', data: Dict[str, Any]) -> None:
+    # 재연결한 클라이언트 - 이 프로세스의 생성이면 lastChunkIndex 다음 청크부터 이어서 전송
+    generation_id = data.get('generationId')
+    await serve_resume(session.sender(generationId=generation_id), generation_id, data.get('lastChunkIndex', -1))
+
+
+class ConnectionSession:
+    """WebSocket 연결 1개의 요청 처리
+
+    사용 예:
+        session = ConnectionSession(websocket)
+        await session.serve(dispatch)   # dispatch(session, data) 가 요청 1건 처리
+    """
+
+    def __init__(
+        self,
+        websocket,
+        connection_id: Optional[str] = None,
+        high_watermark: int = SEND_QUEUE_HIGH_WATERMARK,
+        low_watermark: int = SEND_QUEUE_LOW_WATERMARK,
+        slow_consumer_timeout: float = SLOW_CONSUMER_TIMEOUT
+    ):
+        self.websocket = websocket
+        self.connection_id = connection_id or uuid.uuid4().hex
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.closed = False
+        self.coalesced = 0
+        self._frames: Deque[Tuple[Any, int]] = deque()
+        self._queued_bytes = 0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._writer: Optional[asyncio.Task] = None
+        # 분할 전송 메시지 조각 (연결이 닫히면 미완성분 삭제)
+        self.uploads = get_chunk_upload_store('memory')
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """프레임 전송 예약 (같은 태스크에서 보낸 프레임은 보낸 순서대로 나간다)
+
+        큐가 높은 수위를 넘으면 낮은 수위까지 빠질 때까지 기다린다 (느린 클라이언트는 제한 시간 후 종료).
+        """
+        if not self._writable.is_set():
+            await self._wait_writable()
+        if self.closed:
+            raise ConnectionClosedError(f"Connection {self.connection_id} is closed")
+
+        size = frame_size(frame)
+        if self._queued_bytes >= self.low_watermark and self._merge(frame, size):
+            return
+        self._frames.append((frame, size))
+        self._queued_bytes += size
+        self._readable.set()
+        if self._queued_bytes >= self.high_watermark:
+            self._writable.clear()
+
+    # claude_service 등 send_json 인터페이스를 쓰는 코드용
+    send_json = send
+
+    def _merge(self, frame: Dict[str, Any], size: int) -> bool:
+        """밀려 있는 동안 같은 생성의 연속된 ai_chunk 를 큐 끝 프레임에 합침
+
+        합친 프레임은 first_chunk_index ~ chunk_index 범위를 담는다 (chunk_index 는 포함된 마지막 청크 번호라
+        재개 시 lastChunkIndex 기준과 같고, 클라이언트는 다음 프레임을 chunk_index + 1 부터 기대한다).
+        """
+        if frame.get('type') != 'ai_chunk' or not self._frames:
+            return False
+        tail, tail_size = self._frames[-1]
+        if not isinstance(tail, dict) or tail.get('type') != 'ai_chunk':
+            return False
+        if tail.get('generationId') != frame.get('generationId') or frame.get('chunk_index') != tail.get('chunk_index', -1) + 1:
+            return False
+        chunk = tail['chunk'] + frame['chunk']
+        if encoded_size(chunk) > FRAME_LIMIT_BYTES - ENVELOPE_RESERVE_BYTES:
+            return False
+
+        merged_size = tail_size + size - CHUNK_FRAME_OVERHEAD
+        merged = {
+            **tail,
+            'chunk': chunk,
+            'first_chunk_index': tail.get('first_chunk_index', tail['chunk_index']),
+            'chunk_index': frame['chunk_index']
+        }
+        self._frames[-1] = (merged, merged_size)
+        self._queued_bytes += merged_size - tail_size
+        self.coalesced += 1
+        if self._queued_bytes >= self.high_watermark:
+            self._writable.clear()
+        return True
+
+    async def _wait_writable(self) -> None:
+        try:
+            await asyncio.wait_for(self._writable.wait(), self.slow_consumer_timeout)
+        except asyncio.TimeoutError:
+            await self._evict()
+
+    def sender(self, **fields) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+        """프레임마다 필드(generationId 등)를 붙여 보내는 send 함수"""
+        async def send(frame: Dict[str, Any]) -> None:
+            await self.send({**frame, **fields})
+        return send
+
+    def spawn(self, coro: Awaitable[None]) -> asyncio.Task:
+        """요청 처리 태스크 실행 (연결이 닫히면 정리 대상)"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def serve(self, dispatch: Callable[['ConnectionSession', Dict[str, Any]], Awaitable[None]]) -> None:
+        """수신 루프 - 공통 액션(ping, stopGeneration, resume)은 세션에서 처리하고 나머지는 태스크로 dispatch
+
+        chunkInfo 로 나뉜 sendMessage 는 마지막 조각이 도착했을 때 합쳐서 한 번만 dispatch 한다.
+        """
+        self._writer = asyncio.ensure_future(self._write())
+        try:
+            async for message in self.websocket:
+                try:
+                    data = json.loads(message)
+                except (TypeError, ValueError):
+                    await self.send({'type': 'error', 'message': 'Invalid JSON format'})
+                    continue
+
+                action = data.get('action', 'sendMessage')
+                if action == 'ping':
+                    await self.send({'type': 'pong', 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+                elif action == 'stopGeneration':
+                    stop_generation(data.get('generationId'), self.connection_id)
+                elif action == 'resume':
+                    self.spawn(self._handle(_resume, data))
+                else:
+                    if action == 'sendMessage':
+                        try:
+                            data = reassemble_message(self.uploads, self.connection_id, data)
+                        except ChunkUploadError as e:
+                            await self.send({'type': 'error', 'message': str(e)})
+                            continue
+                        if data is None:
+                            continue
+                    self.spawn(self._handle(dispatch, data))
+        finally:
+            self.uploads.discard_connection(self.connection_id)
+            await self.close()
+
+    async def _handle(self, dispatch, data: Dict[str, Any]) -> None:
+        try:
+            await dispatch(self, data)
+        except ConnectionClosedError:
+            logger.info(f"Connection {self.connection_id} closed during {data.get('action', 'sendMessage')}")
+        except Exception as e:
+            logger.error(f"Error processing message: {e}", exc_info=True)
+            try:
+                await self.send({'type': 'error', 'message': f'처리 중 오류가 발생했습니다: {str(e)}'})
+            except ConnectionClosedError:
+                pass
+
+    async def _write(self) -> None:
+        """writer 태스크 - 큐의 프레임을 순서대로 소켓에 기록"""
+        while True:
+            if not self._frames:
+                self._readable.clear()
+                await self._readable.wait()
+                continue
+            frame, size = self._frames.popleft()
+            if frame is _CLOSE:
+                return
+            self._queued_bytes -= size
+            if self._queued_bytes <= self.low_watermark:
+                self._writable.set()
+            try:
+                await self.websocket.send(json.dumps(frame, ensure_ascii=False, default=str))
+            except Exception as e:
+                logger.info(f"Connection {self.connection_id} send failed: {e}")
+                self._abort()
+                return
+
+    async def _evict(self) -> None:
+        """높은 수위에서 제한 시간 동안 빠지지 않는 연결 종료"""
+        logger.warning(
+            f"Evicting slow consumer {self.connection_id}: "
+            f"{self._queued_bytes} bytes queued for {self.slow_consumer_timeout}s"
+        )
+        self._abort()
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason='slow consumer')
+        except Exception as e:
+            logger.debug(f"Close failed for {self.connection_id}: {e}")
+
+    def _abort(self) -> None:
+        # 더 이상 보낼 수 없으면 이 연결의 생성도 중단하고 큐를 비운다
+        if not self.closed:
+            self.closed = True
+            stop_generation(connection_id=self.connection_id, reason=STOP_DISCONNECTED)
+        self._frames.clear()
+        self._queued_bytes = 0
+        self._writable.set()
+        self._frames.append((_CLOSE, 0))
+        self._readable.set()
+
+    async def close(self) -> None:
+        """연결 종료 - 진행 중인 생성 중단, 요청 태스크 종료 대기 후 남은 프레임 전송"""
+        stop_generation(connection_id=self.connection_id, reason=STOP_DISCONNECTED)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.closed = True
+        if self._writer is not None and not self._writer.done():
+            self._frames.append((_CLOSE, 0))
+            self._readable.set()
+            try:
+                # 전송이 멈춘 소켓이면 남은 프레임을 포기하고 writer 를 취소
+                await asyncio.wait_for(self._writer, self.slow_consumer_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Connection {self.connection_id} writer did not drain, dropping queued frames")
@@ -0,0 +1,190 @@
+"""
+모델 입력 컨텍스트 구성
+클라이언트가 보낸 conversationHistory 와 새 메시지를 messages 배열로 합치고
+엔진별 토큰 예산을 넘지 않도록 오래된 턴부터 생략
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import importlib.util
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# 엔진별 입력 토큰 예산 (CONTEXT_TOKEN_BUDGET_<엔진> 으로 개별 지정)
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.environ.get('CONTEXT_TOKEN_BUDGET', '32000'))
+# 메시지 1개당 역할/구분자 오버헤드 (대략값)
+MESSAGE_OVERHEAD_TOKENS = 4
+# 생략된 턴 요약에 넣을 이전 질문 수/길이
+OMITTED_EXCERPTS = 5
+OMITTED_EXCERPT_CHARS = 80
+OMITTED_NOTE_RESERVE_TOKENS = 512
+# 생략 위치를 이 메시지 수 단위로 맞춰 여러 턴 동안 같은 접두부 유지 (프롬프트 캐시 적중, 짝수)
+CONTEXT_TRIM_STEP = int(os.environ.get('CONTEXT_TRIM_STEP', '8')) // 2 * 2 or 2
+
+ROLES = ('user', 'assistant')
+
+_tokenizer = None
+_tokenizer_loaded = False
+
+
+def context_budget(engine_type: Optional[str]) -> int:
+    """엔진별 입력 토큰 예산"""
+    if engine_type:
+        value = os.environ.get(f'CONTEXT_TOKEN_BUDGET_{engine_type}')
+        if value:
+            return int(value)
+    return DEFAULT_CONTEXT_TOKEN_BUDGET
+
+
+def _load_tokenizer():
+    """anthropic 패키지에 포함된 tokenizer.json 로드 (패키지 자체는 import 하지 않음)"""
+    global _tokenizer, _tokenizer_loaded
+    if _tokenizer_loaded:
+        return _tokenizer
+    _tokenizer_loaded = True
+    try:
+        from tokenizers import Tokenizer
+
+        spec = importlib.util.find_spec('anthropic')
+        locations = spec.submodule_search_locations if spec else None
+        if locations:
+            path = Path(list(locations)[0]) / 'tokenizer.json'
+            _tokenizer = Tokenizer.from_file(str(path))
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, using estimate: {e}")
+        _tokenizer = None
+    return _tokenizer
+
+
+def _estimate_tokens(text: str) -> int:
+    """토크나이저가 없을 때 추정 - ASCII 4자당 1토큰, 그 외(한글 등) 1자당 1토큰"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+@lru_cache(maxsize=2048)
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    tokenizer = _load_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text).ids)
+    return _estimate_tokens(text)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    content = message.get('content')
+    if isinstance(content, list):
+        content = ''.join(block.get('text', '') for block in content if isinstance(block, dict))
+    return count_tokens(content or '') + MESSAGE_OVERHEAD_TOKENS
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, dict):
+        return content.get('text') or ''
+    if isinstance(content, list):
+        return ''.join(_content_text(block) for block in content)
+    return content if isinstance(content, str) else ''
+
+
+def normalize_history(history: Optional[List[Dict[str, Any]]]) -> List[Dict[str, str]]:
+    """클라이언트 히스토리를 {role, content} 목록으로 정리 (빈 메시지/알 수 없는 역할 제외)"""
+    messages = []
+    for item in history or []:
+        if not isinstance(item, dict):
+            continue
+        role = item.get('role') or item.get('type')
+        if role == 'ai':
+            role = 'assistant'
+        content = _content_text(item.get('content')).strip()
+        if role in ROLES and content:
+            messages.append({'role': role, 'content': content})
+    return messages
+
+
+def enforce_alternation(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """user 로 시작하고 user/assistant 가 번갈아 나오도록 정리 (연속된 같은 역할은 병합)"""
+    result: List[Dict[str, str]] = []
+    for message in messages:
+        if not result and message['role'] != 'user':
+            continue
+        if result and result[-1]['role'] == message['role']:
+            result[-1] = {
+                'role': message['role'],
+                'content': f"{result[-1]['content']}\n\n{message['content']}"
+            }
+        else:
+            result.append(dict(message))
+    return result
+
+
+def _omitted_note(omitted: List[Dict[str, str]]) -> str:
+    """생략된 턴 요약 (앞선 질문 일부 발췌)"""
+    questions = [m['content'] for m in omitted if m['role'] == 'user'][-OMITTED_EXCERPTS:]
+    lines = [f"[이전 대화 {len(omitted)}개 메시지는 길이 제한으로 생략되었습니다.]"]
+    if questions:
+        lines.append('생략된 대화의 최근 질문:')
+        for question in questions:
+            excerpt = ' '.join(question.split())
+            if len(excerpt) > OMITTED_EXCERPT_CHARS:
+                excerpt = excerpt[:OMITTED_EXCERPT_CHARS] + '...'
+            lines.append(f"- {excerpt}")
+    return '\n'.join(lines)
+
+
+def build_messages(
+    message: str,
+    history: Optional[List[Dict[str, Any]]] = None,
+    engine_type: Optional[str] = None,
+    system: Optional[str] = None,
+    budget: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """히스토리 + 새 메시지로 모델 messages 배열 구성
+
+    최신 user 턴은 항상 포함하고, 예산을 넘으면 가장 오래된 턴부터 생략한 뒤
+    생략 사실과 앞선 질문 일부를 첫 user 메시지 앞에 덧붙인다.
+    """
+    budget = budget or context_budget(engine_type)
+    if system:
+        budget -= count_tokens(system)
+
+    messages = normalize_history(history)
+    # 클라이언트가 현재 메시지를 히스토리에 이미 넣어 보낸 경우 중복 제거
+    if messages and messages[-1]['role'] == 'user' and messages[-1]['content'] == message.strip():
+        messages.pop()
+    messages.append({'role': 'user', 'content': message})
+    messages = enforce_alternation(messages)
+
+    if sum(message_tokens(m) for m in messages) <= budget:
+        return messages
+
+    # 생략 안내 몫을 남기고 최신 턴부터 예산 안에 들어가는 만큼 유지
+    available = budget - OMITTED_NOTE_RESERVE_TOKENS
+    used = 0
+    start = len(messages) - 1
+    for i in range(len(messages) - 1, -1, -1):
+        tokens = message_tokens(messages[i])
+        if used + tokens > available and i < len(messages) - 1:
+            break
+        used += tokens
+        start = i
+
+    # 히스토리는 뒤로만 늘어나므로 시작 위치를 단계 단위로 올림하면 다음 턴에도 같은 위치가 된다
+    # (예산이 작아 유지분의 절반 이상을 잃게 되면 단계 정렬은 생략)
+    stepped = -(-start // CONTEXT_TRIM_STEP) * CONTEXT_TRIM_STEP
+    if stepped - start <= (len(messages) - start) // 2:
+        start = stepped
+
+    omitted, kept = messages[:start], messages[start:]
+    note = _omitted_note(omitted)
+    if kept[0]['role'] == 'user':
+        kept[0] = {'role': 'user', 'content': f"{note}\n\n{kept[0]['content']}"}
+    else:
+        kept.insert(0, {'role': 'user', 'content': note})
+
+    logger.info(f"Context trimmed: {len(omitted)} messages omitted, ~{used} tokens kept (budget {budget})")
+    return kept
@@ -1,21 +1,26 @@
 """
 대화(Conversation) 비즈니스 로직
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import logging
+import uuid
 from datetime import datetime
 
-from ..models import Conversation, Message
-from ..repositories import ConversationRepository
+from ..models import Conversation, ConversationSummary, Message
+from ..repositories import BaseConversationRepository, create_conversation_repository
 
 logger = logging.getLogger(__name__)
 
+# idempotency key -> conversationId 변환용 네임스페이스 (uuid5)
+IDEMPOTENCY_NAMESPACE = uuid.UUID('6f1c2a4e-3b8d-5e07-9a41-0c7d2e8f1b35')
+
 
 class ConversationService:
     """대화 관련 비즈니스 로직"""
     
-    def __init__(self, repository: Optional[ConversationRepository] = None):
-        self.repository = repository or ConversationRepository()
+    def __init__(self, repository: Optional[BaseConversationRepository] = None):
+        # 저장소 백엔드는 CONVERSATION_STORE 설정으로 선택 (기본: dynamodb)
+        self.repository = repository or create_conversation_repository()
     
     def create_conversation(
         self,
@@ -26,22 +31,7 @@ class ConversationService:
     ) -> Conversation:
         """새 대화 생성"""
         try:
-            # 대화 모델 생성
-            conversation = Conversation(
-                conversation_id='',  # 자동 생성
-                user_id=user_id,
-                engine_type=engine_type,
-                title=title or f"새 대화 - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            )
-            
-            # 초기 메시지 추가
-            if initial_message:
-                message = Message(
-                    role='user',
-                    content=initial_message,
-                    timestamp=datetime.now().isoformat()
-                )
-                conversation.messages.append(message)
+            conversation = self._new_conversation(user_id, engine_type, title, initial_message)
             
             # 저장
             saved = self.repository.save(conversation)
@@ -53,14 +43,117 @@ class ConversationService:
             logger.error(f"Error creating conversation: {str(e)}")
             raise
     
-    def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
-        """대화 조회"""
+    def get_or_create_conversation(
+        self,
+        user_id: str,
+        engine_type: str,
+        title: Optional[str] = None,
+        initial_message: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Conversation, bool]:
+        """조건부 쓰기 1회로 대화 생성 - (대화, 새로 생성 여부) 반환
+        
+        conversationId가 없으면 idempotency key로 결정적 ID를 만들어
+        재시도나 동시 요청이 같은 대화로 수렴하도록 한다.
+        """
+        try:
+            conversation = self._new_conversation(user_id, engine_type, title, initial_message)
+            if conversation_id:
+                conversation.conversation_id = conversation_id
+            elif idempotency_key:
+                conversation.conversation_id = str(
+                    uuid.uuid5(IDEMPOTENCY_NAMESPACE, f"{user_id}:{idempotency_key}")
+                )
+            
+            saved, created = self.repository.create(conversation)
+            if created:
+                logger.info(f"Conversation created: {saved.conversation_id}")
+            else:
+                logger.info(f"Conversation {saved.conversation_id} already exists, returning existing")
+            
+            return saved, created
+            
+        except Exception as e:
+            logger.error(f"Error creating conversation: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _new_conversation(
+        user_id: str,
+        engine_type: str,
+        title: Optional[str] = None,
+        initial_message: Optional[str] = None
+    ) -> Conversation:
+        """대화 모델 생성 (초기 메시지 포함)"""
+        conversation = Conversation(
+            conversation_id='',  # 자동 생성
+            user_id=user_id,
+            engine_type=engine_type,
+            title=title or f"새 대화 - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        )
+        
+        # 초기 메시지 추가
+        if initial_message:
+            message = Message(
+                role='user',
+                content=initial_message,
+                timestamp=datetime.now().isoformat()
+            )
+            conversation.messages.append(message)
+        
+        return conversation
+    
+    def get_conversation(
+        self,
+        conversation_id: str,
+        message_limit: Optional[int] = None,
+        before_sequence: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """대화 조회 (message_limit/before_sequence로 메시지 범위 지정)"""
         try:
-            return self.repository.find_by_id(conversation_id)
+            return self.repository.find_by_id(conversation_id, message_limit, before_sequence)
         except Exception as e:
             logger.error(f"Error getting conversation: {str(e)}")
             raise
     
+    def get_conversations(
+        self,
+        conversation_ids: List[str],
+        message_limit: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> List[Conversation]:
+        """여러 대화 일괄 조회 (user_id를 주면 해당 사용자의 대화만)"""
+        try:
+            return self.repository.find_by_ids(conversation_ids, message_limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error getting conversations: {str(e)}")
+            raise
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """현재 저장소 백엔드의 조회 캐시 통계"""
+        return self.repository.cache_stats()
+    
+    def add_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Message:
+        """대화에 메시지 추가"""
+        try:
+            message = Message(
+                role=role,
+                content=content,
+                timestamp=datetime.now().isoformat(),
+                metadata=metadata or {}
+            )
+            return self.repository.append_message(conversation_id, message)
+        except Exception as e:
+            logger.error(f"Error adding message: {str(e)}")
+            raise
+    
     def get_user_conversations(
         self,
         user_id: str,
@@ -73,6 +166,20 @@ class ConversationService:
             logger.error(f"Error getting user conversations: {str(e)}")
             raise
     
+    def get_user_conversations_page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        next_token: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """사용자의 대화 요약 목록 페이지 조회 - (요약 목록, nextToken) 반환"""
+        try:
+            return self.repository.find_page_by_user(user_id, limit, next_token, engine_type)
+        except Exception as e:
+            logger.error(f"Error getting user conversations page: {str(e)}")
+            raise
+    
     def update_title(self, conversation_id: str, title: str) -> bool:
         """대화 제목 업데이트"""
         try:
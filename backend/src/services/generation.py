@@ -0,0 +1,144 @@
+"""
+응답 생성 제어 (stopGeneration)
+생성마다 ID 와 중단 신호를 두고, 같은 프로세스에서 들어온 중단 요청은 즉시 전달하고
+다른 프로세스(Lambda)에서 들어온 요청은 저장소 플래그를 주기적으로 확인해 전달
+"""
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+import threading
+import uuid
+
+from ..repositories.generation_store import STATUS_DONE, GenerationStore
+
+logger = logging.getLogger(__name__)
+
+# 저장소 중단 플래그 확인 간격(초)
+STOP_POLL_INTERVAL = float(os.environ.get('STOP_POLL_INTERVAL', '1.0'))
+
+# 중단 사유 - requested: stopGeneration, disconnected: 연결 종료 (재연결/재전송 대비 생성은 잠시 유지)
+STOP_REQUESTED = 'requested'
+STOP_DISCONNECTED = 'disconnected'
+
+
+class StopSignal:
+    """생성 1건의 중단 신호"""
+
+    def __init__(
+        self,
+        generation_id: str,
+        connection_id: Optional[str] = None,
+        store: Optional[GenerationStore] = None,
+        poll_interval: float = STOP_POLL_INTERVAL
+    ):
+        self.generation_id = generation_id
+        self.connection_id = connection_id
+        self.store = store
+        self.poll_interval = poll_interval
+        self._stopped = False
+        self.reason: Optional[str] = None
+        # 이벤트는 실제로 기다리는 루프에서 생성 (Lambda 는 핸들러에서 만든 뒤 run_sync 루프에서 사용)
+        self._event: Optional[asyncio.Event] = None
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def requested(self) -> bool:
+        """사용자가 명시적으로 중단했는지"""
+        return self.reason == STOP_REQUESTED
+
+    def stop(self, reason: str = STOP_REQUESTED) -> None:
+        if not self._stopped:
+            self.reason = reason
+        self._stopped = True
+        if self._event is not None:
+            self._event.set()
+
+    async def wait(self) -> None:
+        if self._event is None:
+            self._event = asyncio.Event()
+            if self._stopped:
+                self._event.set()
+        await self._event.wait()
+
+    async def watch(self) -> None:
+        """저장소의 중단 플래그를 주기적으로 확인 (저장소가 없으면 바로 반환)"""
+        if self.store is None:
+            return
+        while not self.stopped:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if await asyncio.to_thread(self.store.is_stop_requested, self.generation_id):
+                    logger.info(f"Stop requested for generation {self.generation_id}")
+                    self.stop()
+            except Exception as e:
+                logger.warning(f"Stop flag check failed for {self.generation_id}: {e}")
+
+
+_active: Dict[str, StopSignal] = {}
+_active_lock = threading.Lock()
+
+
+def new_generation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def start_generation(
+    connection_id: Optional[str] = None,
+    store: Optional[GenerationStore] = None,
+    generation_id: Optional[str] = None
+) -> StopSignal:
+    """생성 등록 (generation_id 가 없으면 새로 발급)"""
+    signal = StopSignal(generation_id or new_generation_id(), connection_id, store)
+    if store is not None:
+        store.create(signal.generation_id, connection_id)
+    with _active_lock:
+        _active[signal.generation_id] = signal
+    return signal
+
+
+def stop_generation(
+    generation_id: Optional[str] = None,
+    connection_id: Optional[str] = None,
+    store: Optional[GenerationStore] = None,
+    reason: str = STOP_REQUESTED
+) -> List[str]:
+    """생성 중단 요청 - generation_id 가 없으면 해당 연결의 모든 생성 (중단한 ID 목록 반환)
+
+    둘 중 하나는 있어야 한다 (둘 다 없으면 아무것도 중단하지 않음).
+    연결 단위 중단은 이 프로세스의 생성에만 적용되고, 저장소로는 generation_id 가 있을 때만 전달된다.
+    """
+    if generation_id is None and connection_id is None:
+        logger.warning("Stop request without generation_id or connection_id ignored")
+        return []
+    with _active_lock:
+        targets = [
+            signal for signal in _active.values()
+            if (generation_id is None or signal.generation_id == generation_id)
+            and (connection_id is None or signal.connection_id == connection_id)
+        ]
+    for signal in targets:
+        signal.stop(reason)
+    stopped = [signal.generation_id for signal in targets]
+
+    # 다른 프로세스에서 진행 중인 생성은 저장소 플래그로 전달
+    if not stopped and generation_id and store is not None:
+        if store.request_stop(generation_id, connection_id):
+            stopped.append(generation_id)
+    if stopped:
+        logger.info(f"Stop requested: {stopped}")
+    return stopped
+
+
+def finish_generation(signal: StopSignal) -> None:
+    """생성 종료 처리 (등록 해제, 저장소 상태 갱신)"""
+    with _active_lock:
+        _active.pop(signal.generation_id, None)
+    if signal.store is not None:
+        try:
+            signal.store.finish(signal.generation_id, STATUS_DONE)
+        except Exception as e:
+            logger.warning(f"Generation state update failed for {signal.generation_id}: {e}")
@@ -0,0 +1,125 @@
+"""
+sendMessage 중복 제거 (idempotencyKey)
+재연결 후 다시 보낸 요청은 새로 생성하지 않고 첫 요청의 생성에 붙는다
+(같은 프로세스에서 진행 중이면 그 생성을 구독, 아니면 저장소에 기록될 결과를 재생)
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+
+from ..repositories.idempotency_store import IdempotencyStore
+from .chat_stream import SendFunc, StreamResult, attach_to_client, replay_to_client
+
+logger = logging.getLogger(__name__)
+
+# 다른 프로세스(Lambda)에서 진행 중인 첫 요청의 결과를 기다리는 시간/확인 간격(초)
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.environ.get('IDEMPOTENCY_WAIT_TIMEOUT', '120'))
+IDEMPOTENCY_POLL_INTERVAL = float(os.environ.get('IDEMPOTENCY_POLL_INTERVAL', '1.0'))
+
+
+def scoped_key(key: Optional[str], owner: Optional[str]) -> Optional[str]:
+    """클라이언트가 보낸 idempotencyKey 를 요청 주체(사용자 또는 연결)별로 구분한 저장소 키
+
+    다른 사용자가 같은 키를 보내도 서로의 생성에 붙지 않도록 선점 전에 적용한다.
+    """
+    if not key:
+        return None
+    return f"{owner or 'anonymous'}#{key}"
+
+
+def claim_request(store: IdempotencyStore, key: Optional[str], generation_id: str) -> Optional[Dict[str, Any]]:
+    """요청 선점 - 새 요청이면 None, 중복이면 첫 요청의 기록 (키가 없거나 저장소 오류면 새 요청으로 처리)"""
+    if not key:
+        return None
+    try:
+        record = store.claim(key, generation_id)
+    except Exception as e:
+        logger.warning(f"Idempotency claim failed for {key}: {e}")
+        return None
+    if record is not None:
+        logger.info(f"Duplicate sendMessage {key} -> generation {record['generationId']}")
+    return record
+
+
+def complete_request(store: IdempotencyStore, key: Optional[str], result: Optional[StreamResult]) -> None:
+    """생성 결과 기록 (result 가 없으면 실패로 보고 선점 해제)"""
+    if not key:
+        return
+    try:
+        if result is None:
+            store.release(key)
+            return
+        store.complete(key, {
+            'chunks': result.parts,
+            'usage': result.usage,
+            'stop_reason': result.stop_reason,
+            'stopped': result.stopped
+        })
+    except Exception as e:
+        # 결과를 남기지 못하면 재전송이 기다리지 않고 다시 생성하도록 해제
+        logger.warning(f"Idempotency result update failed for {key}: {e}")
+        try:
+            store.release(key)
+        except Exception:
+            pass
+
+
+async def follow_duplicate(
+    send: SendFunc,
+    store: IdempotencyStore,
+    key: str,
+    record: Dict[str, Any]
+) -> Optional[StreamResult]:
+    """중복 요청에 첫 요청의 응답을 ai_chunk 프레임으로 전송 (chat_end 는 호출 측에서 전송)
+
+    첫 요청이 실패했거나 IDEMPOTENCY_WAIT_TIMEOUT 안에 끝나지 않으면 None.
+    """
+    result = await attach_to_client(send, record['generationId'])
+    if result is None:
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while record is not None and 'result' not in record and time.monotonic() < deadline:
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+            record = await asyncio.to_thread(store.get, key)
+        if record is None or 'result' not in record:
+            return None
+        stored = record['result']
+        result = await replay_to_client(send, stored['chunks'], stored.get('usage'), stored.get('stop_reason'))
+        result.cached = False
+        result.stopped = bool(stored.get('stopped'))
+    result.duplicate = True
+    return result
+
+
+async def serve_duplicate(send: SendFunc, store: IdempotencyStore, key: str, record: Dict[str, Any], **fields) -> None:
+    """중복 요청 처리 - ai_start, 첫 요청의 ai_chunk, chat_end 를 duplicate 표시와 함께 전송
+
+    send 는 프레임에 첫 요청의 generationId 를 붙여 보내야 한다. fields 는 chat_end 에 추가할 값 (engine 등).
+    """
+    await send({
+        'type': 'ai_start',
+        'duplicate': True,
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+    result = await follow_duplicate(send, store, key, record)
+    if result is None:
+        await send({
+            'type': 'error',
+            'message': '이전 요청의 응답을 가져오지 못했습니다. 다시 시도해 주세요.'
+        })
+        return
+
+    await send({
+        'type': 'chat_end',
+        **fields,
+        'total_chunks': result.total_chunks,
+        'usage': result.usage,
+        'cached': result.cached,
+        'stopped': result.stopped,
+        'duplicate': True,
+        'message': '응답 생성이 중단되었습니다.' if result.stopped else '응답 생성이 완료되었습니다.',
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
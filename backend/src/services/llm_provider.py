@@ -0,0 +1,414 @@
+"""
+스트리밍 LLM 프로바이더
+Bedrock / Anthropic API 를 하나의 비동기 이터레이터 인터페이스로 제공
+(클라이언트 재사용, 재시도, 사용량 집계, 취소 시 스트림 정리를 한 곳에서 처리)
+"""
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+
+from ..clients import get_async_http_client
+from .bedrock_async import AsyncBedrockClient, BedrockStreamError
+from .context_builder import count_tokens, message_tokens
+
+logger = logging.getLogger(__name__)
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+BEDROCK_MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'us.anthropic.claude-opus-4-5-20251101-v1:0')
+BEDROCK_ANTHROPIC_VERSION = os.environ.get('ANTHROPIC_VERSION', 'bedrock-2023-05-31')
+ANTHROPIC_API_URL = 'https://api.anthropic.com/v1/messages'
+ANTHROPIC_API_VERSION = '2023-06-01'
+CLAUDE_MODEL = os.environ.get('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022')
+
+DEFAULT_PROVIDER = 'bedrock'
+DEFAULT_MAX_TOKENS = int(os.environ.get('LLM_MAX_TOKENS', os.environ.get('BEDROCK_MAX_TOKENS', '4000')))
+DEFAULT_PARAMS = {
+    'temperature': float(os.environ.get('BEDROCK_TEMPERATURE', '0.7')),
+    'top_p': float(os.environ.get('BEDROCK_TOP_P', '0.9')),
+    'top_k': int(os.environ.get('BEDROCK_TOP_K', '50'))
+}
+
+# 재시도는 첫 텍스트를 보내기 전 오류에만 적용 (중간 재시도는 중복 출력이 됨)
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '3'))
+LLM_RETRY_BASE_DELAY = float(os.environ.get('LLM_RETRY_BASE_DELAY', '0.5'))
+LLM_RETRY_MAX_DELAY = float(os.environ.get('LLM_RETRY_MAX_DELAY', '8.0'))
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '120'))
+
+# 프롬프트 캐시 - 시스템 프롬프트와 히스토리 접두부에 cache_control 표시
+PROMPT_CACHE_ENABLED = os.environ.get('PROMPT_CACHE_ENABLED', 'true').lower() == 'true'
+# 이보다 짧은 접두부는 캐시되지 않으므로 표시하지 않음 (모델 최소 캐시 길이)
+PROMPT_CACHE_MIN_TOKENS = int(os.environ.get('PROMPT_CACHE_MIN_TOKENS', '1024'))
+EPHEMERAL_CACHE = {'type': 'ephemeral'}
+USAGE_KEYS = (
+    'input_tokens',
+    'output_tokens',
+    'cache_creation_input_tokens',
+    'cache_read_input_tokens'
+)
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504, 529)
+RETRYABLE_ERROR_CODES = (
+    'ThrottlingException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'InternalServerException',
+    'ModelStreamErrorException'
+)
+
+
+class LLMProviderError(Exception):
+    """프로바이더 호출 오류"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def _with_cache_control(content: Any) -> List[Dict[str, Any]]:
+    """content 의 마지막 블록에 캐시 지점 표시"""
+    if isinstance(content, str):
+        return [{'type': 'text', 'text': content, 'cache_control': EPHEMERAL_CACHE}]
+    blocks = [dict(block) for block in content]
+    if blocks:
+        blocks[-1]['cache_control'] = EPHEMERAL_CACHE
+    return blocks
+
+
+def _system_tokens(system: Optional[Any]) -> int:
+    if not system:
+        return 0
+    if isinstance(system, str):
+        return count_tokens(system)
+    return count_tokens(''.join(block.get('text', '') for block in system if isinstance(block, dict)))
+
+
+def apply_prompt_cache(
+    system: Optional[Any],
+    messages: List[Dict[str, Any]],
+    min_tokens: int = PROMPT_CACHE_MIN_TOKENS
+) -> Tuple[Optional[Any], List[Dict[str, Any]]]:
+    """시스템 프롬프트와 안정된 히스토리 접두부(마지막 user 턴 직전까지)를 캐시 대상으로 표시
+
+    다음 턴에서는 이번 턴의 접두부가 그대로 앞에 오므로 캐시에서 읽힌다.
+    접두부가 min_tokens 보다 짧으면 캐시되지 않으므로 표시하지 않는다.
+    """
+    prefix_tokens = _system_tokens(system)
+    if system and prefix_tokens >= min_tokens:
+        system = _with_cache_control(system)
+    if len(messages) >= 2:
+        prefix_tokens += sum(message_tokens(message) for message in messages[:-1])
+        if prefix_tokens >= min_tokens:
+            messages = list(messages)
+            messages[-2] = {**messages[-2], 'content': _with_cache_control(messages[-2]['content'])}
+    return system, messages
+
+
+def normalize_usage(usage: Dict[str, Any]) -> Dict[str, int]:
+    """사용량 메타데이터를 공통 키로 정리 (없는 항목은 0)"""
+    return {key: int(usage.get(key) or 0) for key in USAGE_KEYS}
+
+
+def partial_usage(usage: Dict[str, Any], text: str) -> Dict[str, int]:
+    """중단된 스트림 사용량 - 입력은 message_start 값, 출력은 받은 텍스트로 추정"""
+    usage = normalize_usage(usage)
+    usage['output_tokens'] = max(usage['output_tokens'], count_tokens(text))
+    return usage
+
+
+@asynccontextmanager
+async def aclosing(agen):
+    """contextlib.aclosing 대체 (3.10 부터 제공, Lambda 런타임은 3.9) - 블록을 벗어나면 비동기 제너레이터를 닫는다"""
+    try:
+        yield agen
+    finally:
+        await agen.aclose()
+
+
+@dataclass
+class StreamEvent:
+    """스트림 이벤트 - start: 시작 (입력 사용량), text: 텍스트 델타, end: 종료 (사용량/종료 사유 포함)"""
+    type: str
+    text: str = ''
+    usage: Dict[str, Any] = field(default_factory=dict)
+    stop_reason: Optional[str] = None
+
+
+class LLMProvider(ABC):
+    """스트리밍 LLM 공통 인터페이스
+
+    사용 예:
+        async with aclosing(provider.stream(messages)) as events:
+            async for event in events:
+                ...
+    소비자가 중단(break/태스크 취소)하면 aclose 시 업스트림 스트림도 닫히고
+    그때까지의 사용량(출력은 추정)을 집계한다.
+    """
+
+    name = 'llm'
+
+    def __init__(self, max_retries: int = LLM_MAX_RETRIES, cache_prompt: bool = PROMPT_CACHE_ENABLED):
+        self.max_retries = max_retries
+        self.cache_prompt = cache_prompt
+        self._usage_totals = {key: 0 for key in USAGE_KEYS}
+        self._usage_requests = 0
+        self._usage_lock = threading.Lock()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[Any] = None,
+        max_tokens: Optional[int] = None,
+        **params
+    ) -> AsyncIterator[StreamEvent]:
+        """응답을 텍스트 델타 단위로 스트리밍하고 마지막에 end 이벤트 전달"""
+        if self.cache_prompt:
+            system, messages = apply_prompt_cache(system, messages)
+        request = {
+            'messages': messages,
+            'max_tokens': max_tokens or DEFAULT_MAX_TOKENS,
+            **params
+        }
+        if system:
+            request['system'] = system
+
+        attempt = 0
+        while True:
+            emitted: List[str] = []
+            usage: Dict[str, Any] = {}
+            stop_reason = None
+            completed = False
+            events = self._open(request)
+            try:
+                async for event in events:
+                    event_type = event.get('type')
+                    if event_type == 'content_block_delta':
+                        delta = event.get('delta', {})
+                        if delta.get('type') == 'text_delta' and delta.get('text'):
+                            emitted.append(delta['text'])
+                            yield StreamEvent('text', text=delta['text'])
+                    elif event_type == 'message_start':
+                        usage.update(event.get('message', {}).get('usage') or {})
+                        yield StreamEvent('start', usage=normalize_usage(usage))
+                    elif event_type == 'message_delta':
+                        usage.update(event.get('usage') or {})
+                        stop_reason = event.get('delta', {}).get('stop_reason') or stop_reason
+                    elif event_type == 'message_stop':
+                        break
+                    elif event_type == 'error':
+                        error = event.get('error', {})
+                        raise LLMProviderError(
+                            f"{error.get('type')}: {error.get('message')}",
+                            retryable=error.get('type') in ('overloaded_error', 'api_error')
+                        )
+                completed = True
+            except Exception as e:
+                if emitted or attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                delay = min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"{self.name} stream failed ({e}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                await events.aclose()
+                if not completed and (usage or emitted):
+                    # 중단/오류로 끝난 스트림도 과금된 만큼 집계
+                    stopped_usage = partial_usage(usage, ''.join(emitted))
+                    self._record_usage(stopped_usage)
+                    logger.info(f"{self.name} stream closed early: usage~{stopped_usage}")
+
+            usage = normalize_usage(usage)
+            self._record_usage(usage)
+            logger.info(f"{self.name} stream completed: stop_reason={stop_reason}, usage={usage}")
+            yield StreamEvent('end', usage=usage, stop_reason=stop_reason)
+            return
+
+    async def stream_text(self, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[str]:
+        """텍스트 델타만 스트리밍"""
+        events = self.stream(messages, **kwargs)
+        try:
+            async for event in events:
+                if event.type == 'text':
+                    yield event.text
+        finally:
+            await events.aclose()
+
+    async def complete(self, messages: List[Dict[str, Any]], **kwargs) -> Tuple[str, Dict[str, Any]]:
+        """전체 응답 텍스트와 사용량 반환"""
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        async for event in self.stream(messages, **kwargs):
+            if event.type == 'text':
+                parts.append(event.text)
+            elif event.type == 'end':
+                usage = event.usage
+        return ''.join(parts), usage
+
+    def identity(self) -> Dict[str, Any]:
+        """응답에 영향을 주는 프로바이더 설정 (응답 캐시 키에 사용)"""
+        return {'provider': self.name}
+
+    def _record_usage(self, usage: Dict[str, int]) -> None:
+        with self._usage_lock:
+            self._usage_requests += 1
+            for key in USAGE_KEYS:
+                self._usage_totals[key] += usage.get(key, 0)
+
+    def usage_stats(self) -> Dict[str, Any]:
+        """누적 사용량 (프롬프트 캐시 적중률 포함)"""
+        with self._usage_lock:
+            totals = dict(self._usage_totals)
+            requests = self._usage_requests
+        prompt_tokens = (
+            totals['input_tokens']
+            + totals['cache_creation_input_tokens']
+            + totals['cache_read_input_tokens']
+        )
+        return {
+            'requests': requests,
+            **totals,
+            'cache_read_ratio': totals['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+        }
+
+    @abstractmethod
+    def _open(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """업스트림 스트림을 열어 Messages API 이벤트(dict)를 순서대로 반환"""
+
+    def _is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, LLMProviderError) and error.retryable
+
+
+class BedrockProvider(LLMProvider):
+    """AWS Bedrock (invoke-with-response-stream, 비동기 클라이언트)"""
+
+    name = 'bedrock'
+
+    def __init__(self, model_id: str = None, region: str = None, client: AsyncBedrockClient = None, **kwargs):
+        super().__init__(**kwargs)
+        self.model_id = model_id or BEDROCK_MODEL_ID
+        self.region = region or AWS_REGION
+        self.client = client or AsyncBedrockClient(self.region)
+
+    def identity(self) -> Dict[str, Any]:
+        return {'provider': self.name, 'model': self.model_id, 'params': DEFAULT_PARAMS}
+
+    def _body(self, request: Dict[str, Any]) -> bytes:
+        body = {'anthropic_version': BEDROCK_ANTHROPIC_VERSION, **DEFAULT_PARAMS, **request}
+        return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    def _open(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        return self.client.invoke_stream(self.model_id, self._body(request))
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, BedrockStreamError):
+            return (
+                error.code in RETRYABLE_ERROR_CODES
+                or error.code == 'ConnectionError'
+                or error.status_code in RETRYABLE_STATUS
+            )
+        return super()._is_retryable(error)
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API (httpx SSE 스트리밍)"""
+
+    name = 'anthropic'
+
+    def __init__(self, model: str = None, api_key: str = None, timeout: float = LLM_TIMEOUT, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model or CLAUDE_MODEL
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def identity(self) -> Dict[str, Any]:
+        return {'provider': self.name, 'model': self.model}
+
+    def _client(self):
+        return get_async_http_client(streaming=True)
+
+    async def _open(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        import httpx
+
+        api_key = self.api_key or os.environ.get('CLAUDE_API_KEY')
+        if not api_key:
+            raise ValueError('Claude API 키가 설정되지 않았습니다.')
+
+        body = {'model': self.model, **request, 'stream': True}
+        try:
+            async with self._client().stream(
+                'POST',
+                ANTHROPIC_API_URL,
+                headers={
+                    'content-type': 'application/json',
+                    'x-api-key': api_key,
+                    'anthropic-version': ANTHROPIC_API_VERSION
+                },
+                json=body,
+                timeout=httpx.Timeout(self.timeout, connect=10.0)
+            ) as response:
+                if response.status_code >= 400:
+                    detail = (await response.aread()).decode('utf-8', 'replace')[:500]
+                    raise LLMProviderError(
+                        f"Claude API 오류: {response.status_code} {detail}",
+                        status_code=response.status_code,
+                        retryable=response.status_code in RETRYABLE_STATUS
+                    )
+
+                data_lines: List[str] = []
+                async for line in response.aiter_lines():
+                    if line:
+                        if line.startswith('data:'):
+                            data_lines.append(line[5:].lstrip())
+                        continue
+                    # 빈 줄이 SSE 이벤트 경계
+                    if data_lines:
+                        yield json.loads('\n'.join(data_lines))
+                        data_lines = []
+                if data_lines:
+                    yield json.loads('\n'.join(data_lines))
+        except httpx.TransportError as e:
+            raise LLMProviderError(f"Claude API 연결 오류: {e}", retryable=True) from e
+
+
+PROVIDERS = {
+    'bedrock': BedrockProvider,
+    'anthropic': AnthropicProvider
+}
+
+_providers: Dict[str, LLMProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str = None, default: str = DEFAULT_PROVIDER) -> LLMProvider:
+    """프로바이더 조회 (LLM_PROVIDER 설정 우선, 프로세스 내 공유)"""
+    name = (name or os.environ.get('LLM_PROVIDER') or default).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = PROVIDERS[name]()
+        return _providers[name]
+
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_sync(coro):
+    """동기 코드(Lambda 핸들러)에서 코루틴 실행
+
+    asyncio.run 과 달리 루프를 닫지 않아 웜 호출 간 HTTP 연결이 재사용된다.
+    """
+    global _sync_loop
+    if _sync_loop is None or _sync_loop.is_closed():
+        _sync_loop = asyncio.new_event_loop()
+    return _sync_loop.run_until_complete(coro)
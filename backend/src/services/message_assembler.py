@@ -0,0 +1,49 @@
+"""
+분할 전송 메시지 재조립
+websocketService.js 는 큰 메시지를 같은 idempotencyKey 의 sendMessage 여러 개로 나눠 보낸다
+(chunkInfo {total, current, isFirst, isLast}, 히스토리는 첫 조각에만) - 모두 모이면 요청 1건으로 합친다
+"""
+from typing import Any, Dict, Optional
+import logging
+import os
+
+from ..repositories.chunk_upload_store import ChunkUploadError, ChunkUploadStore
+
+logger = logging.getLogger(__name__)
+
+# 업로드 1건의 최대 조각 수
+CHUNK_UPLOAD_MAX_PARTS = int(os.environ.get('CHUNK_UPLOAD_MAX_PARTS', '64'))
+
+
+def reassemble_message(store: ChunkUploadStore, connection_id: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """조각이면 저장하고 완성되면 합친 요청을, 아직이면 None 반환 (분할되지 않은 요청은 그대로)"""
+    info = body.get('chunkInfo')
+    if not isinstance(info, dict):
+        return body
+
+    try:
+        total = int(info.get('total'))
+        current = int(info.get('current'))
+    except (TypeError, ValueError):
+        raise ChunkUploadError('chunkInfo 형식이 올바르지 않습니다.')
+    if not 1 <= current <= total or total > CHUNK_UPLOAD_MAX_PARTS:
+        raise ChunkUploadError(f'chunkInfo 범위가 올바르지 않습니다: {current}/{total}')
+
+    body = {key: value for key, value in body.items() if key != 'chunkInfo'}
+    if total == 1:
+        return body
+    if not body.get('idempotencyKey'):
+        raise ChunkUploadError('분할 메시지에는 idempotencyKey 가 필요합니다.')
+
+    upload_key = f"{connection_id}#{body['idempotencyKey']}"
+    message = body.get('message') or ''
+    parts = store.add_part(upload_key, current, total, body, len(message.encode('utf-8')))
+    if parts is None:
+        logger.info(f"Chunk {current}/{total} stored for {upload_key}")
+        return None
+
+    # 엔진/대화/히스토리 등은 첫 조각 기준
+    assembled = dict(parts[0])
+    assembled['message'] = ''.join(part.get('message') or '' for part in parts)
+    logger.info(f"Message reassembled from {total} chunks ({len(assembled['message'])} chars)")
+    return assembled
@@ -0,0 +1,38 @@
+"""
+엔진별 프롬프트 서비스
+프롬프트 API 응답과 모델 호출 시스템 프롬프트가 같은 데이터를 사용
+"""
+from typing import Any, Dict, List, Optional
+
+
+def get_prompt_data(engine_type: str) -> Dict[str, Any]:
+    """엔진 프롬프트 정보"""
+    return {
+        'engineType': engine_type,
+        'description': f'{engine_type} 엔진 전용 AI 어시스턴트',
+        'instructions': f'{engine_type} 엔진에 맞는 전문적인 답변을 제공해주세요.',
+        'files': []
+    }
+
+
+def get_prompt_files(engine_type: str) -> List[Dict[str, Any]]:
+    """엔진 참고 파일 목록"""
+    return get_prompt_data(engine_type)['files']
+
+
+def build_system_prompt(engine_type: Optional[str]) -> Optional[str]:
+    """모델 호출용 시스템 프롬프트 (엔진별로 항상 같은 문자열 - 프롬프트 캐시 대상)
+
+    description/instructions 기본값은 프롬프트 API 표시용이므로 모델에는 보내지 않고,
+    엔진 참고 파일 내용이 있을 때만 만든다 (없으면 None - 기존처럼 시스템 프롬프트 없이 호출).
+    """
+    if not engine_type:
+        return None
+
+    sections = []
+    for file in get_prompt_files(engine_type):
+        name = file.get('name') or file.get('fileName') or 'file'
+        content = file.get('content') or ''
+        if content:
+            sections.append(f"--- 파일: {name} ---\n{content}")
+    return '\n\n'.join(sections) or None
@@ -0,0 +1,123 @@
+"""
+응답 캐시
+같은 엔진에 같은 질문(시스템 프롬프트/히스토리 포함)이 반복되면 생성 없이 이전 응답을 재생
+엔진별 선택 적용 (RESPONSE_CACHE_ENGINES), 웹 검색이 필요한 질문은 캐시하지 않음
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+
+from ..repositories.cache import TTLCache
+from .llm_provider import LLMProvider
+from .web_search import requires_web_search
+
+logger = logging.getLogger(__name__)
+
+# 캐시를 사용할 엔진 목록 (쉼표 구분, 비어 있으면 비활성)
+RESPONSE_CACHE_ENGINES = frozenset(
+    engine.strip() for engine in os.environ.get('RESPONSE_CACHE_ENGINES', '').split(',') if engine.strip()
+)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '512'))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '600'))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# 정상 종료된 응답만 저장 (max_tokens 로 잘린 응답 등은 제외)
+CACHEABLE_STOP_REASONS = ('end_turn', 'stop_sequence')
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """저장된 응답 (전송했던 청크 순서 그대로)"""
+    chunks: Tuple[str, ...]
+    usage: Dict[str, Any] = field(default_factory=dict)
+    stop_reason: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return sum(len(chunk.encode('utf-8')) for chunk in self.chunks)
+
+
+_response_cache = TTLCache(
+    maxsize=RESPONSE_CACHE_SIZE,
+    ttl=RESPONSE_CACHE_TTL,
+    maxbytes=RESPONSE_CACHE_MAX_BYTES,
+    sizeof=lambda response: response.size
+)
+
+
+def _normalize_text(text: Any) -> Any:
+    if isinstance(text, str):
+        return ' '.join(text.split())
+    return text
+
+
+def _normalize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    content = message.get('content')
+    if isinstance(content, list):
+        # cache_control 같은 전송 옵션은 응답에 영향을 주지 않으므로 키에서 제외
+        content = [_normalize_text(block.get('text')) for block in content if isinstance(block, dict)]
+    return {'role': message.get('role'), 'content': _normalize_text(content)}
+
+
+def _latest_user_text(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get('role') == 'user':
+            content = message.get('content')
+            if isinstance(content, list):
+                return ''.join(block.get('text', '') for block in content if isinstance(block, dict))
+            return content or ''
+    return ''
+
+
+def request_fingerprint(
+    engine_type: Optional[str],
+    provider: LLMProvider,
+    messages: List[Dict[str, Any]],
+    **params
+) -> str:
+    """같은 응답을 낼 요청이면 같은 값 (응답 캐시/동시 요청 합치기 키)"""
+    payload = {
+        'engine': engine_type,
+        **provider.identity(),
+        'system': _normalize_text(params.pop('system', None)),
+        'request': params,
+        'messages': [_normalize_message(message) for message in messages]
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def response_cache_key(
+    engine_type: Optional[str],
+    provider: LLMProvider,
+    messages: List[Dict[str, Any]],
+    **params
+) -> Optional[str]:
+    """캐시 키 (사용하지 않는 요청이면 None)"""
+    if not engine_type or engine_type not in RESPONSE_CACHE_ENGINES:
+        return None
+    if requires_web_search(_latest_user_text(messages)):
+        return None
+    return request_fingerprint(engine_type, provider, messages, **params)
+
+
+def get_cached_response(key: Optional[str]) -> Optional[CachedResponse]:
+    """캐시된 응답 조회"""
+    if key is None:
+        return None
+    return _response_cache.get(key)
+
+
+def store_response(key: Optional[str], chunks: List[str], usage: Dict[str, Any], stop_reason: Optional[str]) -> None:
+    """정상 종료된 응답 저장"""
+    if key is None or not chunks or stop_reason not in CACHEABLE_STOP_REASONS:
+        return
+    _response_cache.set(key, CachedResponse(tuple(chunks), dict(usage), stop_reason))
+
+
+def response_cache_stats() -> Dict[str, Any]:
+    """캐시 통계"""
+    return {'engines': sorted(RESPONSE_CACHE_ENGINES), **_response_cache.stats()}
@@ -0,0 +1,170 @@
+"""
+동시 요청 합치기 (single-flight)
+같은 키의 생성이 진행 중이면 새로 호출하지 않고 그 생성의 청크를 함께 받는다
+늦게 합류한 구독자는 이미 나간 청크부터 재생받으므로 모두 같은 청크 순서를 받는다
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+# 구독자가 모두 끊긴(중단 요청이 아닌) 생성을 재연결/재전송 대비로 유지하는 시간(초)
+GENERATION_DETACH_GRACE = float(os.environ.get('GENERATION_DETACH_GRACE', '30'))
+
+
+class Flight:
+    """진행 중인 생성 1건 (청크 기록 + 구독자 알림)"""
+
+    def __init__(self, key: Optional[str]):
+        self.key = key
+        self.chunks: List[str] = []
+        self.usage: Dict[str, Any] = {}
+        self.stop_reason: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.slot: Optional[Tuple[int, str]] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # 대기 중인 구독자를 깨우고 다음 변경용 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, usage: Optional[Dict[str, Any]] = None, stop_reason: Optional[str] = None) -> None:
+        self.usage = dict(usage or {})
+        self.stop_reason = stop_reason
+        self.done = True
+        self._notify()
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+        self.done = True
+        self._notify()
+
+    async def subscribe(self, stop=None, start: int = 0) -> AsyncIterator[str]:
+        """start 번 청크부터 재생 후 새 청크를 도착 순서대로 반환 (생성 오류는 그대로 전파)
+
+        stop(StopSignal)이 설정되면 다음 청크를 기다리지 않고 바로 끝낸다.
+        """
+        index = start
+        while stop is None or not stop.stopped:
+            if index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            elif self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            elif stop is None:
+                await self._changed.wait()
+            else:
+                await _wait_first(self._changed.wait(), stop.wait())
+
+
+async def _wait_first(*aws) -> None:
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class SingleFlight:
+    """키별 진행 중 생성 목록 (이벤트 루프 단위)"""
+
+    def __init__(self):
+        self._flights: Dict[Tuple[int, str], Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    def join(self, key: Optional[str], produce: Callable[[Flight], Awaitable[None]]) -> Tuple[Flight, bool]:
+        """같은 키의 생성에 합류, 없으면 produce 로 새 생성 시작 (반환: flight, 새로 시작했는지)"""
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        if key is not None and SINGLE_FLIGHT_ENABLED:
+            flight = self._flights.get(slot)
+            if flight is not None and not flight.done:
+                self.joined += 1
+                logger.info(f"Joined in-flight generation {key[:12]} ({len(flight.chunks)} chunks so far)")
+                return flight, False
+
+        flight = Flight(key)
+        self.started += 1
+        if key is not None and SINGLE_FLIGHT_ENABLED:
+            flight.slot = slot
+            self._flights[slot] = flight
+
+        async def run():
+            try:
+                await produce(flight)
+            except asyncio.CancelledError as e:
+                flight.fail(e)
+                raise
+            except Exception as e:
+                flight.fail(e)
+            finally:
+                self._discard(flight)
+
+        # 요청한 클라이언트가 끊겨도 다른 구독자가 있으면 생성은 계속된다
+        flight.task = loop.create_task(run())
+        return flight, True
+
+    async def stream(self, flight: Flight, stop=None, start: int = 0) -> AsyncIterator[str]:
+        """구독 - 마지막 구독자가 중단 요청으로 떠나면 생성을 바로 취소
+
+        연결이 끊겨 떠난 경우에는 GENERATION_DETACH_GRACE 동안 다시 붙는 구독자가 없을 때 취소한다.
+        """
+        flight.subscribers += 1
+        try:
+            async for chunk in flight.subscribe(stop, start):
+                yield chunk
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                if stop is not None and stop.requested:
+                    self._cancel(flight)
+                else:
+                    asyncio.get_running_loop().call_later(GENERATION_DETACH_GRACE, self._cancel_detached, flight)
+
+    def _cancel(self, flight: Flight) -> None:
+        # 취소 중인 생성에 새 요청이 합류하지 않도록 먼저 목록에서 제거
+        self._discard(flight)
+        flight.task.cancel()
+
+    def _cancel_detached(self, flight: Flight) -> None:
+        if flight.subscribers == 0 and not flight.done:
+            logger.info(f"Cancelling detached generation ({len(flight.chunks)} chunks produced)")
+            self._cancel(flight)
+
+    def _discard(self, flight: Flight) -> None:
+        if flight.slot is not None and self._flights.get(flight.slot) is flight:
+            del self._flights[flight.slot]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'in_flight': len(self._flights), 'started': self.started, 'joined': self.joined}
+
+
+_single_flight = SingleFlight()
+
+
+def join_flight(key: Optional[str], produce: Callable[[Flight], Awaitable[None]]) -> Tuple[Flight, bool]:
+    """프로세스 공용 single-flight 에 합류"""
+    return _single_flight.join(key, produce)
+
+
+def flight_stream(flight: Flight, stop=None, start: int = 0) -> AsyncIterator[str]:
+    return _single_flight.stream(flight, stop, start)
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    return _single_flight.stats()
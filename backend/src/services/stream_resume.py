@@ -0,0 +1,177 @@
+"""
+끊긴 스트림 재개 (resume)
+재연결한 클라이언트가 resume {generationId, lastChunkIndex} 를 보내면 놓친 ai_chunk 와 이후 청크를 전송
+(같은 프로세스의 생성이면 flight 를 구독, 아니면 청크 기록 저장소를 읽으며 생성이 끝날 때까지 따라간다)
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+
+from ..repositories.chunk_log_store import STATUS_DONE, ChunkLogStore
+from .chat_stream import SendFunc, StreamResult, attach_to_client
+
+logger = logging.getLogger(__name__)
+
+# 청크 기록 저장 간격(초) - 전송 경로에서 저장소 쓰기를 모아서 한 번에
+CHUNK_LOG_FLUSH_INTERVAL = float(os.environ.get('CHUNK_LOG_FLUSH_INTERVAL', '0.5'))
+# 다른 프로세스(Lambda)에서 진행 중인 생성을 따라가는 최대 시간/확인 간격(초)
+RESUME_WAIT_TIMEOUT = float(os.environ.get('RESUME_WAIT_TIMEOUT', '120'))
+RESUME_POLL_INTERVAL = float(os.environ.get('RESUME_POLL_INTERVAL', '1.0'))
+
+
+class ChunkLogger:
+    """생성 1건의 ai_chunk 를 청크 기록 저장소에 기록 (저장소 오류는 전송에 영향을 주지 않는다)
+
+    사용 예:
+        chunk_log = ChunkLogger(get_chunk_log_store(), generation_id)
+        chunk_log.start()
+        result = await stream_to_client(chunk_log.wrap(send), ...)
+        await chunk_log.close(result)
+    """
+
+    def __init__(self, store: ChunkLogStore, generation_id: str, flush_interval: float = CHUNK_LOG_FLUSH_INTERVAL):
+        self.store = store
+        self.generation_id = generation_id
+        self.flush_interval = flush_interval
+        self.enabled = True
+        self._pending: List[Tuple[int, str]] = []
+        self._flushed_at = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        try:
+            self.store.start(self.generation_id)
+        except Exception as e:
+            self._disable(e)
+
+    def wrap(self, send: SendFunc) -> SendFunc:
+        """ai_chunk 를 기록 대기열에 넣은 뒤 전송하는 send 함수
+
+        저장소 쓰기는 백그라운드 태스크로 넘겨 전송을 기다리게 하지 않는다 (진행 중인 쓰기는 하나만, close 에서 대기).
+        """
+        async def logged(frame: Dict[str, Any]) -> None:
+            if frame.get('type') == 'ai_chunk' and self.enabled:
+                self._pending.append((frame['chunk_index'], frame['chunk']))
+                if time.monotonic() - self._flushed_at >= self.flush_interval and not self._flushing():
+                    self._flush_task = asyncio.create_task(self.flush())
+            await send(frame)
+        return logged
+
+    def _flushing(self) -> bool:
+        return self._flush_task is not None and not self._flush_task.done()
+
+    async def flush(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._pending or not self.enabled:
+            return
+        entries, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self.store.append, self.generation_id, entries)
+        except Exception as e:
+            self._disable(e)
+
+    async def close(self, result: Optional[StreamResult]) -> None:
+        """진행 중인 쓰기와 남은 청크 기록 후 종료 표시 (result 가 없으면 생성 오류로 끝난 것)"""
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+        if not self.enabled:
+            # 빠진 청크가 있을 수 있으므로 완료로 표시하지 않는다 (재개 요청은 대기 시간 후 종료)
+            return
+        if result is None:
+            summary = {'usage': {}, 'stop_reason': None, 'stopped': True}
+        else:
+            summary = {'usage': result.usage, 'stop_reason': result.stop_reason, 'stopped': result.stopped}
+        try:
+            await asyncio.to_thread(self.store.finish, self.generation_id, summary)
+        except Exception as e:
+            self._disable(e)
+
+    def _disable(self, error: Exception) -> None:
+        logger.warning(f"Chunk log disabled for {self.generation_id}: {error}")
+        self.enabled = False
+        self._pending = []
+
+
+async def resume_from_log(send: SendFunc, store: ChunkLogStore, generation_id: str, start: int = 0) -> Optional[StreamResult]:
+    """청크 기록을 start 번부터 전송하고 생성이 끝날 때까지 새 청크를 따라감 (기록이 없으면 None)"""
+    log = await asyncio.to_thread(store.read, generation_id, start)
+    if log is None:
+        return None
+
+    result = StreamResult(total_chunks=start)
+    deadline = time.monotonic() + RESUME_WAIT_TIMEOUT
+    while True:
+        # 일괄 쓰기 도중에 읽으면 중간이 빌 수 있으므로 이어지는 번호까지만 전송
+        for index, chunk in log['entries']:
+            if index != result.total_chunks:
+                break
+            await send({
+                'type': 'ai_chunk',
+                'chunk': chunk,
+                'chunk_index': index
+            })
+            result.parts.append(chunk)
+            result.total_chunks += 1
+        else:
+            if log['status'] == STATUS_DONE:
+                break
+        if time.monotonic() >= deadline:
+            log = None
+            break
+        await asyncio.sleep(RESUME_POLL_INTERVAL)
+        log = await asyncio.to_thread(store.read, generation_id, result.total_chunks)
+        if log is None:
+            break
+
+    summary = log.get('summary') if log is not None else None
+    if summary:
+        result.usage = dict(summary.get('usage') or {})
+        result.stop_reason = summary.get('stop_reason')
+        result.stopped = bool(summary.get('stopped'))
+    else:
+        result.stopped = True
+    return result
+
+
+async def serve_resume(
+    send: SendFunc,
+    generation_id: Optional[str],
+    last_chunk_index: Any = -1,
+    store: Optional[ChunkLogStore] = None,
+    **fields
+) -> None:
+    """resume 요청 처리 - lastChunkIndex 다음 청크부터 ai_chunk 를 보내고 chat_end 에 resumed 표시
+
+    send 는 프레임에 generationId 를 붙여 보내야 한다. fields 는 chat_end 에 추가할 값.
+    """
+    try:
+        start = int(last_chunk_index) + 1
+    except (TypeError, ValueError):
+        start = None
+    if not generation_id or start is None or start < 0:
+        await send({'type': 'error', 'message': 'resume 에는 generationId 와 lastChunkIndex 가 필요합니다.'})
+        return
+
+    result = await attach_to_client(send, generation_id, start=start)
+    if result is None and store is not None:
+        result = await resume_from_log(send, store, generation_id, start)
+    if result is None:
+        await send({'type': 'error', 'message': '재개할 수 있는 응답이 없습니다. 다시 요청해 주세요.'})
+        return
+
+    logger.info(f"Resumed generation {generation_id} from chunk {start} ({result.total_chunks - start} chunks sent)")
+    await send({
+        'type': 'chat_end',
+        **fields,
+        'total_chunks': result.total_chunks,
+        'usage': result.usage,
+        'stopped': result.stopped,
+        'resumed': True,
+        'message': '응답 생성이 중단되었습니다.' if result.stopped else '응답 생성이 완료되었습니다.',
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
@@ -1,9 +1,10 @@
-import requests
 from urllib.parse import urlparse
 import json
 import os
 from datetime import datetime
 
+from ..clients import get_http_session
+
 def extract_domain(url):
     """URL에서 도메인 추출"""
     return urlparse(url).netloc
@@ -29,7 +30,7 @@ async def perform_web_search_with_content(query):
             'dateRestrict': 'd3'  # 최근 3일
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_session().get(url, params=params, timeout=10)
         data = response.json()
         
         sources = []
@@ -0,0 +1,259 @@
+"""테스트용 DynamoDB 대역 (boto3 Table/resource 의 쓰이는 부분만)"""
+import re
+
+from botocore.exceptions import ClientError
+
+from src.repositories.conversation_repository import ConversationRepository
+
+
+class FakeTable:
+    """테스트용 DynamoDB 테이블 - keys 는 (파티션 키, 정렬 키), indexes 는 GSI 이름별 (파티션 키, 정렬 키)"""
+
+    def __init__(self, name, *keys, indexes=None):
+        self.name = name
+        self.keys = keys
+        self.indexes = indexes or {}
+        self.items = {}
+        self.queries = 0
+
+    def _key(self, item):
+        return tuple(item[key] for key in self.keys)
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, **kwargs):
+        _check_condition(
+            ConditionExpression, self.items.get(self._key(Item)), ExpressionAttributeNames, ExpressionAttributeValues,
+            'PutItem'
+        )
+        self.items[self._key(Item)] = dict(Item)
+
+    def delete_item(self, Key, **kwargs):
+        self.items.pop(self._key(Key), None)
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get(self._key(Key))
+        return {'Item': dict(item)} if item is not None else {}
+
+    def query(self, KeyConditionExpression, IndexName=None, Limit=None, ExclusiveStartKey=None, **kwargs):
+        self.queries += 1
+        hash_key, range_key = self.indexes[IndexName] if IndexName else self.keys
+        items = [item for item in self.items.values() if _matches(KeyConditionExpression, item)]
+        items.sort(
+            key=lambda item: (item.get(range_key), self._key(item)),
+            reverse=not kwargs.get('ScanIndexForward', True)
+        )
+        if ExclusiveStartKey:
+            position = (ExclusiveStartKey.get(range_key), self._key(ExclusiveStartKey))
+            keys = [(item.get(range_key), self._key(item)) for item in items]
+            items = items[keys.index(position) + 1:] if position in keys else []
+
+        evaluated = items[:Limit] if Limit else items
+        response = {
+            'Items': [
+                _project(item, kwargs) for item in evaluated if _matches(kwargs.get('FilterExpression'), item)
+            ]
+        }
+        if Limit and len(items) > Limit:
+            last = evaluated[-1]
+            response['LastEvaluatedKey'] = {key: last[key] for key in {*self.keys, hash_key, range_key}}
+        return response
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression=None, ExpressionAttributeValues=None,
+                    ExpressionAttributeNames=None, ReturnValues=None, **kwargs):
+        """SET a = :v | if_not_exists(a, :v) [+ :v], ADD a :v, REMOVE a 지원"""
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        current = self.items.get(self._key(Key))
+        _check_condition(ConditionExpression, current, names, values, 'UpdateItem')
+        item = dict(current) if current is not None else dict(Key)
+
+        updated = {}
+        for action, body in _update_clauses(UpdateExpression):
+            for assignment in _split_top(body):
+                if action == 'SET':
+                    name, _, expression = assignment.partition('=')
+                    name = names.get(name.strip(), name.strip())
+                    total = None
+                    for operand in expression.split('+'):
+                        operand = operand.strip()
+                        if operand.startswith('if_not_exists('):
+                            attribute = operand[len('if_not_exists('):].split(',')[0].strip()
+                            default = operand.rstrip(')').split(',')[1].strip()
+                            value = item.get(names.get(attribute, attribute), values[default])
+                        else:
+                            value = _operand(operand, item, names, values)
+                        total = value if total is None else total + value
+                    item[name] = updated[name] = total
+                elif action == 'ADD':
+                    name, operand = assignment.split()
+                    name = names.get(name, name)
+                    item[name] = updated[name] = item.get(name, 0) + values[operand]
+                else:
+                    item.pop(names.get(assignment, assignment), None)
+
+        self.items[self._key(item)] = item
+        return {'Attributes': updated} if ReturnValues else {}
+
+    def scan(self, **kwargs):
+        return {
+            'Items': [
+                _project(item, kwargs) for item in self.items.values() if _matches(kwargs.get('FilterExpression'), item)
+            ]
+        }
+
+    def batch_writer(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeDynamoDB:
+    def __init__(self, *tables):
+        self.tables = {table.name: table for table in tables}
+        self.batch_calls = 0
+
+    def batch_get_item(self, RequestItems):
+        self.batch_calls += 1
+        responses = {}
+        for name, request in RequestItems.items():
+            table = self.tables[name]
+            responses[name] = [
+                dict(table.items[table._key(key)]) for key in request['Keys'] if table._key(key) in table.items
+            ]
+        return {'Responses': responses}
+
+
+def _split_top(text):
+    """괄호 밖의 쉼표로 나눔"""
+    parts, depth, current = [], 0, ''
+    for char in text:
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    parts.append(current.strip())
+    return [part for part in parts if part]
+
+
+def _split_words(text, word):
+    """괄호 밖의 AND/OR 로 나눔"""
+    parts, depth, start = [], 0, 0
+    token = f' {word} '
+    index = 0
+    while index < len(text):
+        depth += {'(': 1, ')': -1}.get(text[index], 0)
+        if depth == 0 and text.startswith(token, index):
+            parts.append(text[start:index])
+            index += len(token)
+            start = index
+            continue
+        index += 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+
+def _strip_parens(text):
+    text = text.strip()
+    while text.startswith('(') and text.endswith(')'):
+        depth = 0
+        for index, char in enumerate(text):
+            depth += {'(': 1, ')': -1}.get(char, 0)
+            if depth == 0 and index < len(text) - 1:
+                return text
+        text = text[1:-1].strip()
+    return text
+
+
+def _operand(operand, item, names, values):
+    operand = operand.strip()
+    if operand.startswith(':'):
+        return values[operand]
+    return item.get(names.get(operand, operand))
+
+
+def _evaluate(condition, item, names, values):
+    """문자열 조건식 평가 - attribute_(not_)exists, 비교, AND/OR, 괄호"""
+    condition = _strip_parens(condition)
+    parts = _split_words(condition, 'OR')
+    if len(parts) > 1:
+        return any(_evaluate(part, item, names, values) for part in parts)
+    parts = _split_words(condition, 'AND')
+    if len(parts) > 1:
+        return all(_evaluate(part, item, names, values) for part in parts)
+    function = re.fullmatch(r'(attribute_exists|attribute_not_exists)\((.+)\)', condition)
+    if function:
+        name = function.group(2).strip()
+        return (names.get(name, name) in item) == (function.group(1) == 'attribute_exists')
+    left, operator, right = re.fullmatch(r'(\S+)\s*(<=|>=|<>|=|<|>)\s*(\S+)', condition).groups()
+    if operator == '<>':
+        return _operand(left, item, names, values) != _operand(right, item, names, values)
+    return _COMPARISONS[operator](_operand(left, item, names, values), _operand(right, item, names, values))
+
+
+def _check_condition(condition, current, names, values, operation):
+    if condition and not _evaluate(condition, current or {}, names or {}, values or {}):
+        raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': condition}}, operation)
+
+
+def _update_clauses(expression):
+    """UpdateExpression 을 (SET|ADD|REMOVE, 본문) 목록으로"""
+    tokens = re.split(r'\b(SET|ADD|REMOVE)\b', expression)
+    return [(tokens[index], tokens[index + 1]) for index in range(1, len(tokens), 2)]
+
+
+_COMPARISONS = {
+    '=': lambda a, b: a == b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+}
+
+
+def _matches(condition, item):
+    if condition is None:
+        return True
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        return all(_matches(part, item) for part in expression['values'])
+    key, value = expression['values']
+    return _COMPARISONS[expression['operator']](item.get(key.name), value)
+
+
+def _project(item, params):
+    if 'ProjectionExpression' not in params:
+        return dict(item)
+    names = params['ExpressionAttributeNames']
+    attributes = [names.get(name.strip(), name.strip()) for name in params['ProjectionExpression'].split(',')]
+    return {name: item[name] for name in attributes if name in item}
+
+
+class MissingIndexTable(FakeTable):
+    """GSI 가 없는 테이블 - 인덱스 조회는 ValidationException"""
+
+    def query(self, **kwargs):
+        if 'IndexName' in kwargs:
+            raise ClientError(
+                {'Error': {'Code': 'ValidationException', 'Message': 'The table does not have the specified index'}},
+                'Query'
+            )
+        return super().query(**kwargs)
+
+
+USER_INDEX = {'userId-updatedAt-index': ('userId', 'updatedAt')}
+
+
+def make_repository(blob_store=None, table=None):
+    repo = ConversationRepository.__new__(ConversationRepository)
+    repo.user_index_name = 'userId-updatedAt-index'
+    repo.table = table or FakeTable('conversations', 'conversationId', indexes=USER_INDEX)
+    repo.messages_table = FakeTable('messages', 'conversationId', 'sequence')
+    repo.dynamodb = FakeDynamoDB(repo.table, repo.messages_table)
+    repo.blob_store = blob_store
+    return repo
@@ -0,0 +1,120 @@
+"""ChunkCoalescer - 문자소 경계 분할, 크기/시간 플러시, 종료 시 플러시, 청크 번호 범위"""
+import asyncio
+
+from src.services.chunk_coalescer import ChunkCoalescer, encoded_size, is_safe_boundary, safe_split_index
+from src.services.connection_session import ConnectionSession
+
+FAMILY = '\U0001F468\u200d\U0001F469\u200d\U0001F467'  # ZWJ 로 이은 가족 이모지
+FLAG = '\U0001F1F0\U0001F1F7'  # 지역 표시 문자 2개 (국기)
+THUMBS = '\U0001F44D\U0001F3FD'  # 피부색 수식
+ACCENT = 'e\u0301'  # 결합 발음 구별 기호
+HANGUL = '\u1112\u1161\u11ab'  # 한글 자모 (초성/중성/종성)
+CLUSTERS = [FAMILY, FLAG, THUMBS, ACCENT, HANGUL]
+
+
+async def _deltas(parts, gaps=None):
+    for index, part in enumerate(parts):
+        if gaps and gaps[index]:
+            await asyncio.sleep(gaps[index])
+        yield part
+
+
+def _coalesce(coalescer, parts, gaps=None):
+    async def run():
+        return [chunk async for chunk in coalescer.coalesce(_deltas(parts, gaps))]
+    return asyncio.run(run())
+
+
+def _assert_clusters_intact(chunks):
+    """어느 청크 경계도 문자소 안에 있지 않아야 한다"""
+    text = ''.join(chunks)
+    position = 0
+    for chunk in chunks[:-1]:
+        position += len(chunk)
+        assert is_safe_boundary(text, position), repr(text[position - 2:position + 2])
+
+
+def test_safe_boundary_protects_clusters():
+    for cluster in CLUSTERS:
+        text = f'a{cluster}b'
+        for index in range(2, len(cluster) + 1):
+            assert not is_safe_boundary(text, index), (cluster, index)
+        assert is_safe_boundary(text, 1) and is_safe_boundary(text, 1 + len(cluster))
+
+
+def test_flags_split_only_between_pairs():
+    text = FLAG * 3
+    assert [index for index in range(1, len(text)) if is_safe_boundary(text, index)] == [2, 4]
+
+
+def test_split_index_backs_off_to_cluster_start():
+    text = 'ab' + FAMILY
+    assert safe_split_index(text, encoded_size('ab' + FAMILY[:3])) == 2
+    assert safe_split_index(text, encoded_size(text)) == len(text)
+
+
+def test_size_threshold_splits_on_cluster_boundaries():
+    coalescer = ChunkCoalescer(window_ms=10_000, max_bytes=64)
+    parts = [cluster for _ in range(20) for cluster in CLUSTERS]
+    # 문자소가 델타 사이에서 끊겨 들어와도 경계는 유지된다 (첫 델타는 즉시 전송)
+    deltas = ['start '] + [char for part in parts for char in part]
+    chunks = _coalesce(coalescer, deltas)
+
+    assert chunks[0] == 'start '
+    assert ''.join(chunks) == 'start ' + ''.join(parts)
+    assert len(chunks) > 1
+    assert all(encoded_size(chunk) <= 64 for chunk in chunks)
+    _assert_clusters_intact(chunks)
+
+
+def test_cluster_larger_than_budget_stays_within_frame_limit():
+    coalescer = ChunkCoalescer(window_ms=0, max_bytes=8, frame_limit=64)
+    text = 'a' + '\u0301' * 40
+    chunks = _coalesce(coalescer, [text])
+
+    assert ''.join(chunks) == text
+    assert all(encoded_size(chunk) <= 64 for chunk in chunks)
+
+
+def test_first_delta_is_sent_immediately_then_time_window_flushes():
+    coalescer = ChunkCoalescer(window_ms=30, max_bytes=2048)
+    chunks = _coalesce(coalescer, ['a', 'b', 'c', 'd', 'e'], gaps=[0, 0, 0, 0.15, 0])
+
+    assert chunks == ['a', 'bc', 'de']
+
+
+def test_pending_tail_is_flushed_on_close():
+    coalescer = ChunkCoalescer(window_ms=10_000, max_bytes=2048)
+    # 마지막 델타가 ZWJ 로 끝나도 스트림이 끝나면 남은 내용을 모두 보낸다
+    chunks = _coalesce(coalescer, ['hi ', FAMILY[:2]])
+
+    assert chunks == ['hi ', FAMILY[:2]]
+
+
+def test_joining_tail_waits_for_next_delta():
+    coalescer = ChunkCoalescer(window_ms=0, max_bytes=2048)
+    chunks = _coalesce(coalescer, ['x' + FAMILY[:2], FAMILY[2:]], gaps=[0, 0.05])
+
+    assert chunks == ['x', FAMILY]
+
+
+def test_merged_frames_cover_first_to_last_chunk_index():
+    class IdleWebSocket:
+        async def send(self, data):
+            pass
+
+    async def run():
+        session = ConnectionSession(IdleWebSocket(), high_watermark=1 << 20, low_watermark=0)
+        send = session.sender(generationId='g')
+        for index in range(3):
+            await send({'type': 'ai_chunk', 'chunk': str(index), 'chunk_index': index})
+        await send({'type': 'ai_chunk', 'chunk': 'x', 'chunk_index': 5})
+        await session.sender(generationId='other')({'type': 'ai_chunk', 'chunk': 'y', 'chunk_index': 6})
+        return [frame for frame, _ in session._frames]
+
+    frames = asyncio.run(run())
+    assert frames[0]['chunk'] == '012'
+    assert (frames[0]['first_chunk_index'], frames[0]['chunk_index']) == (0, 2)
+    # 번호가 끊기거나 다른 생성이면 합치지 않는다
+    assert [frame['chunk_index'] for frame in frames[1:]] == [5, 6]
+    assert all('first_chunk_index' not in frame for frame in frames[1:])
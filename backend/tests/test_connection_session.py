@@ -0,0 +1,59 @@
+"""ConnectionSession 송신 큐 - 느린 클라이언트에서 합쳐진 ai_chunk 의 번호 연속성"""
+import asyncio
+import json
+
+from src.services.connection_session import ConnectionSession
+
+
+class SlowWebSocket:
+    """전송마다 지연되는 클라이언트 (수신 메시지 없음)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.frames = []
+
+    def __aiter__(self):
+        return self._messages()
+
+    async def _messages(self):
+        await asyncio.sleep(3600)
+        yield  # pragma: no cover
+
+    async def send(self, data):
+        await asyncio.sleep(self.delay)
+        self.frames.append(json.loads(data))
+
+    async def close(self, code=None, reason=None):
+        pass
+
+
+async def _stream_to_slow_consumer(count, size):
+    websocket = SlowWebSocket(0.002)
+    session = ConnectionSession(websocket, high_watermark=8192, low_watermark=2048, slow_consumer_timeout=5)
+    serving = asyncio.ensure_future(session.serve(lambda session, data: None))
+    send = session.sender(generationId='g')
+    for index in range(count):
+        await send({'type': 'ai_chunk', 'chunk': str(index % 10) * size, 'chunk_index': index})
+    await send({'type': 'chat_end'})
+    while not websocket.frames or websocket.frames[-1]['type'] != 'chat_end':
+        await asyncio.sleep(0.01)
+    serving.cancel()
+    return session, websocket.frames
+
+
+def test_merged_chunks_keep_indices_dense():
+    count, size = 2000, 100
+    session, frames = asyncio.run(_stream_to_slow_consumer(count, size))
+    chunks = [frame for frame in frames if frame['type'] == 'ai_chunk']
+
+    assert session.coalesced > 0
+    assert len(chunks) < count
+
+    # 클라이언트(processChunkBuffer)와 같은 방식으로 이어 붙인다: 각 프레임은 기대 번호에서 시작해야 한다
+    expected = 0
+    for frame in chunks:
+        assert frame.get('first_chunk_index', frame['chunk_index']) == expected
+        assert frame['chunk_index'] >= expected
+        expected = frame['chunk_index'] + 1
+    assert expected == count
+    assert ''.join(frame['chunk'] for frame in chunks) == ''.join(str(i % 10) * size for i in range(count))
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from handlers.api import conversation as conversation_api
+from src.models import Conversation, Message
+from src.repositories import InMemoryConversationRepository, conversation_repository
+from src.repositories.blob_store import FsspecBlobStore
+from src.services.conversation_service import ConversationService
+
+from .dynamo_fakes import make_repository
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.setattr(conversation_repository, 'OVERFLOW_THRESHOLD', 1024)
+    return make_repository(FsspecBlobStore(f"file://{tmp_path / 'blobs'}"))
+
+
+def test_overflowed_message_is_returned_as_plain_content(repository, monkeypatch):
+    body = ''.join(f"{i:08x}" for i in range(4096))
+    conversation = Conversation(
+        conversation_id='conv-overflow',
+        user_id='user-1',
+        engine_type='11',
+        messages=[Message(role='user', content='질문'), Message(role='assistant', content=body)]
+    )
+    repository.save(conversation)
+    stored = repository.messages_table.items[('conv-overflow', 1)]
+    assert 'contentRef' in stored and 'content' not in stored
+
+    monkeypatch.setattr(conversation_api, 'ConversationService', lambda: ConversationService(repository))
+    response = conversation_api.handler({
+        'httpMethod': 'GET',
+        'pathParameters': {'conversationId': 'conv-overflow'},
+        'queryStringParameters': None
+    }, None)
+
+    assert response['statusCode'] == 200
+    messages = json.loads(response['body'])['messages']
+    assert [m['content'] for m in messages] == ['질문', body]
+    assert all('contentRef' not in m and 'contentZ' not in m for m in messages)
+
+
+def test_batch_get_filters_by_owner_without_per_conversation_queries(repository, monkeypatch):
+    for index in range(5):
+        repository.save(Conversation(
+            conversation_id=f'conv-batch-{index}',
+            user_id='user-1' if index % 2 == 0 else 'user-2',
+            engine_type='11',
+            messages=[Message(role='user', content=f'질문 {index}-{n}') for n in range(4)]
+        ))
+
+    monkeypatch.setattr(conversation_api, 'ConversationService', lambda: ConversationService(repository))
+    ids = ','.join(f'conv-batch-{index}' for index in range(5))
+    query = {'ids': ids, 'messageLimit': '2'}
+
+    response = conversation_api.handler({'httpMethod': 'GET', 'queryStringParameters': query}, None)
+    assert response['statusCode'] == 400
+
+    response = conversation_api.handler({
+        'httpMethod': 'GET', 'queryStringParameters': {**query, 'userId': 'user-1'}
+    }, None)
+    body = json.loads(response['body'])
+    assert [c['conversationId'] for c in body['conversations']] == ['conv-batch-0', 'conv-batch-2', 'conv-batch-4']
+    assert body['missing'] == ['conv-batch-1', 'conv-batch-3']
+    assert [m['content'] for m in body['conversations'][1]['messages']] == ['질문 2-2', '질문 2-3']
+    assert repository.messages_table.queries == 0
+    assert repository.dynamodb.batch_calls == 2
+
+
+def test_post_with_another_users_conversation_id_is_a_conflict(monkeypatch):
+    repository = InMemoryConversationRepository()
+    monkeypatch.setattr(conversation_api, 'ConversationService', lambda: ConversationService(repository))
+
+    def post(user_id):
+        return conversation_api.handler({'httpMethod': 'POST', 'body': json.dumps({
+            'userId': user_id,
+            'conversationId': 'conv-shared',
+            'title': f'{user_id} 의 대화',
+            'messages': [{'role': 'user', 'content': f'{user_id} 비밀'}]
+        })}, None)
+
+    assert post('user-1')['statusCode'] == 201
+    assert post('user-1')['statusCode'] == 200
+
+    response = post('user-2')
+    assert response['statusCode'] == 409
+    assert 'user-1' not in response['body'] and '비밀' not in response['body']
+    assert repository.find_by_id('conv-shared').user_id == 'user-1'
@@ -0,0 +1,49 @@
+from src.models import Conversation, Message
+from src.repositories import InMemoryConversationRepository
+
+
+def _conversation():
+    return Conversation(
+        conversation_id='conv-preview',
+        user_id='user-1',
+        engine_type='11',
+        messages=[Message(role='user', content=f'메시지 {n}') for n in range(4)]
+    )
+
+
+def test_preview_kept_for_partial_loads():
+    repository = InMemoryConversationRepository()
+    repository.save(_conversation())
+
+    header = repository.find_by_user('user-1')[0]
+    assert header.to_dict()['preview'] == '메시지 3'
+
+    older = repository.find_by_id('conv-preview', before_sequence=2)
+    assert [m.content for m in older.messages] == ['메시지 0', '메시지 1']
+    assert older.to_dict()['preview'] == '메시지 3'
+    assert older.to_summary().preview == '메시지 3'
+
+    recent = repository.find_by_id('conv-preview', message_limit=1)
+    recent.messages.append(Message(role='assistant', content='새 메시지'))
+    assert recent.to_dict()['preview'] == '새 메시지'
+
+
+def test_preview_read_from_header_item():
+    item = _conversation().to_dict(include_messages=False)
+    header = Conversation.from_dict(item)
+    assert header.messages == []
+    assert header.to_dict(include_messages=False)['preview'] == '메시지 3'
+
+
+def test_lazy_content_loads_once_and_setter_drops_stored_forms():
+    calls = []
+    message = Message.lazy(lambda: calls.append(1) or '본문', compressed=b'stored', role='assistant')
+    assert not message.is_loaded
+
+    assert message == Message(role='assistant', content='본문')
+    assert message.content == '본문' and message.is_loaded and calls == [1]
+    assert message.to_dict(compress=True)['contentZ'] == b'stored'
+
+    message.content = '수정됨'
+    assert message.to_dict(compress=True)['content'] == '수정됨'
+    assert 'contentZ' not in message.to_dict(compress=True)
@@ -0,0 +1,93 @@
+from src.models import Conversation, Message
+
+from .dynamo_fakes import MissingIndexTable, make_repository
+
+
+def _save(repository, conversation_id, user_id, updated_at):
+    conversation = Conversation(
+        conversation_id=conversation_id,
+        user_id=user_id,
+        engine_type='11',
+        messages=[Message(role='user', content=f'{conversation_id} 질문')]
+    )
+    repository.save(conversation)
+    repository.table.items[(conversation_id,)]['updatedAt'] = updated_at
+
+
+def test_list_falls_back_to_scan_without_user_index():
+    repository = make_repository(table=MissingIndexTable('conversations', 'conversationId'))
+    for index in range(5):
+        _save(repository, f'conv-{index}', 'user-1', f'2026-01-0{index + 1}T00:00:00')
+    _save(repository, 'conv-other', 'user-2', '2026-01-09T00:00:00')
+
+    pages, token = [], None
+    while True:
+        summaries, token = repository.find_page_by_user('user-1', limit=2, next_token=token)
+        pages.append([s.conversation_id for s in summaries])
+        if not token:
+            break
+
+    assert pages == [['conv-4', 'conv-3'], ['conv-2', 'conv-1'], ['conv-0']]
+
+
+def _legacy_item(conversation_id, user_id, contents, updated_at='2026-01-01T00:00:00'):
+    """이 변경 이전 형식 - messages 인라인, messageCount/preview 없음"""
+    return {
+        'conversationId': conversation_id,
+        'userId': user_id,
+        'engineType': '11',
+        'title': '기존 대화',
+        'createdAt': '2026-01-01T00:00:00',
+        'updatedAt': updated_at,
+        'metadata': {},
+        'messages': [
+            {'role': 'user' if n % 2 == 0 else 'assistant', 'content': content, 'timestamp': None, 'metadata': {}}
+            for n, content in enumerate(contents)
+        ]
+    }
+
+
+def test_summary_of_legacy_item_counts_inline_messages():
+    repository = make_repository()
+    repository.table.put_item(Item=_legacy_item('conv-legacy', 'user-1', ['질문', '답변', '마지막']))
+    _save(repository, 'conv-new', 'user-1', '2026-01-02T00:00:00')
+
+    summaries, _ = repository.find_page_by_user('user-1', limit=10)
+    by_id = {s.conversation_id: s for s in summaries}
+    assert by_id['conv-legacy'].message_count == 3
+    assert by_id['conv-legacy'].preview == '마지막'
+    assert by_id['conv-new'].message_count == 1
+
+
+def test_legacy_inline_conversation_is_migrated_in_full_on_partial_read():
+    repository = make_repository()
+    contents = [f'메시지 {n}' for n in range(6)]
+    repository.table.put_item(Item=_legacy_item('conv-legacy', 'user-1', contents))
+
+    recent = repository.find_by_id('conv-legacy', message_limit=2)
+    assert [m.content for m in recent.messages] == ['메시지 4', '메시지 5']
+    assert [m.sequence for m in recent.messages] == [4, 5]
+    assert recent.message_count == 6
+
+    header = repository.table.items[('conv-legacy',)]
+    assert 'messages' not in header and header['messageCount'] == 6
+    assert sorted(key[1] for key in repository.messages_table.items) == list(range(6))
+
+    # 일부만 불러온 대화를 저장해도 이전 기록은 유지
+    recent.title = '새 제목'
+    recent.messages.append(Message(role='user', content='새 질문'))
+    repository.save(recent)
+    repository.invalidate_cache('conv-legacy')
+    full = repository.find_by_id('conv-legacy')
+    assert [m.content for m in full.messages] == contents + ['새 질문']
+    assert full.title == '새 제목'
+
+
+def test_append_to_legacy_inline_conversation_keeps_history():
+    repository = make_repository()
+    repository.table.put_item(Item=_legacy_item('conv-legacy', 'user-1', ['질문', '답변']))
+
+    appended = repository.append_message('conv-legacy', Message(role='user', content='추가 질문'))
+    assert appended.sequence == 2
+    full = repository.find_by_id('conv-legacy')
+    assert [m.content for m in full.messages] == ['질문', '답변', '추가 질문']
@@ -0,0 +1,15 @@
+from src.services.generation import finish_generation, start_generation, stop_generation
+
+
+def test_stop_requires_generation_or_connection():
+    first = start_generation('conn-a')
+    second = start_generation('conn-b')
+    try:
+        assert stop_generation() == []
+        assert not first.stopped and not second.stopped
+
+        assert stop_generation(connection_id='conn-a') == [first.generation_id]
+        assert first.stopped and not second.stopped
+    finally:
+        finish_generation(first)
+        finish_generation(second)
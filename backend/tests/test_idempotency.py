@@ -0,0 +1,25 @@
+from handlers.websocket import message as message_handler
+from src.repositories.idempotency_store import InMemoryIdempotencyStore
+from src.services.idempotency import claim_request, scoped_key
+
+
+def test_same_key_from_different_users_is_isolated():
+    store = InMemoryIdempotencyStore()
+    alice = scoped_key('retry-1', 'user-a')
+    bob = scoped_key('retry-1', 'user-b')
+
+    assert claim_request(store, alice, 'gen-a') is None
+    assert claim_request(store, bob, 'gen-b') is None
+    assert claim_request(store, alice, 'gen-a2')['generationId'] == 'gen-a'
+    assert claim_request(store, bob, 'gen-b2')['generationId'] == 'gen-b'
+
+
+def test_missing_key_is_not_claimed():
+    assert scoped_key(None, 'user-a') is None
+    assert claim_request(InMemoryIdempotencyStore(), scoped_key('', 'user-a'), 'gen-1') is None
+
+
+def test_authorizer_identity_takes_precedence_over_body_user():
+    event = {'requestContext': {'connectionId': 'conn-1', 'authorizer': {'principalId': 'user-a'}}}
+    assert message_handler._request_owner(event, 'user-b') == 'user-a'
+    assert message_handler._request_owner({'requestContext': {'connectionId': 'conn-1'}}, 'conn-1') == 'conn-1'
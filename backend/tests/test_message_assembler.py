@@ -0,0 +1,112 @@
+"""분할 전송 메시지 재조립 - 순서 뒤바뀜, 중복, 누락, 1부터 시작하는 chunkInfo.current"""
+import pytest
+
+from src.repositories.chunk_upload_store import (
+    ChunkUploadError,
+    ChunkUploadStore,
+    DynamoChunkUploadStore,
+    InMemoryChunkUploadStore
+)
+from src.services.message_assembler import reassemble_message
+
+from .dynamo_fakes import FakeTable
+
+
+def _dynamo_store(**kwargs):
+    store = DynamoChunkUploadStore.__new__(DynamoChunkUploadStore)
+    ChunkUploadStore.__init__(store, **kwargs)
+    store.table = FakeTable('chunks', 'uploadKey', 'part')
+    return store
+
+
+STORES = {'memory': InMemoryChunkUploadStore, 'dynamodb': _dynamo_store}
+
+
+@pytest.fixture(params=sorted(STORES))
+def make_store(request):
+    return STORES[request.param]
+
+
+def _chunk(current, total, text, key='retry-1'):
+    """websocketService.js 와 같은 형식 (current 는 1부터, 히스토리는 첫 조각에만)"""
+    return {
+        'action': 'sendMessage',
+        'message': text,
+        'engineType': '11',
+        'idempotencyKey': key,
+        'conversationHistory': [{'role': 'user', 'content': '이전 질문'}] if current == 1 else [],
+        'chunkInfo': {'total': total, 'current': current, 'isFirst': current == 1, 'isLast': current == total}
+    }
+
+
+def test_out_of_order_chunks_are_joined_in_order(make_store):
+    store = make_store()
+    texts = {1: '가나', 2: '다라', 3: '마바'}
+
+    assert reassemble_message(store, 'conn-1', _chunk(3, 3, texts[3])) is None
+    assert reassemble_message(store, 'conn-1', _chunk(1, 3, texts[1])) is None
+    assembled = reassemble_message(store, 'conn-1', _chunk(2, 3, texts[2]))
+
+    assert assembled['message'] == '가나다라마바'
+    assert assembled['conversationHistory'] == [{'role': 'user', 'content': '이전 질문'}]
+    assert 'chunkInfo' not in assembled
+
+
+def test_duplicate_chunk_is_ignored(make_store):
+    store = make_store()
+
+    assert reassemble_message(store, 'conn-1', _chunk(1, 2, 'A')) is None
+    assert reassemble_message(store, 'conn-1', _chunk(1, 2, 'A')) is None
+    assert reassemble_message(store, 'conn-1', _chunk(2, 2, 'B'))['message'] == 'AB'
+
+
+def test_missing_chunk_keeps_upload_open(make_store):
+    store = make_store()
+
+    assert reassemble_message(store, 'conn-1', _chunk(1, 3, 'A')) is None
+    assert reassemble_message(store, 'conn-1', _chunk(3, 3, 'C')) is None
+    # 다른 연결의 같은 키는 별도 업로드
+    assert reassemble_message(store, 'conn-2', _chunk(2, 3, 'X')) is None
+    assert reassemble_message(store, 'conn-1', _chunk(2, 3, 'B'))['message'] == 'ABC'
+
+
+def test_expired_upload_does_not_complete(make_store):
+    store = make_store(timeout=-1)
+
+    assert reassemble_message(store, 'conn-1', _chunk(1, 2, 'A')) is None
+    if isinstance(store, DynamoChunkUploadStore):
+        # 헤더의 만료 조건으로 거부 (남은 조각은 TTL 로 정리)
+        with pytest.raises(ChunkUploadError):
+            reassemble_message(store, 'conn-1', _chunk(2, 2, 'B'))
+    else:
+        # 만료된 업로드는 버리고 이 조각부터 새 업로드로 시작
+        assert reassemble_message(store, 'conn-1', _chunk(2, 2, 'B')) is None
+
+
+def test_current_is_one_based(make_store):
+    store = make_store()
+
+    with pytest.raises(ChunkUploadError):
+        reassemble_message(store, 'conn-1', _chunk(0, 2, 'A'))
+    with pytest.raises(ChunkUploadError):
+        reassemble_message(store, 'conn-1', _chunk(3, 2, 'A'))
+    assert reassemble_message(store, 'conn-1', _chunk(1, 2, 'A')) is None
+    assert reassemble_message(store, 'conn-1', _chunk(2, 2, 'B'))['message'] == 'AB'
+
+
+def test_unsplit_and_single_chunk_messages_pass_through(make_store):
+    store = make_store()
+    body = {'action': 'sendMessage', 'message': '짧은 메시지'}
+
+    assert reassemble_message(store, 'conn-1', body) is body
+    assert reassemble_message(store, 'conn-1', _chunk(1, 1, '한 조각'))['message'] == '한 조각'
+
+
+def test_size_limit_and_total_mismatch_are_rejected(make_store):
+    store = make_store(max_bytes=4)
+
+    with pytest.raises(ChunkUploadError):
+        reassemble_message(store, 'conn-1', _chunk(1, 2, '12345'))
+    reassemble_message(store, 'conn-2', _chunk(1, 2, 'ab'))
+    with pytest.raises(ChunkUploadError):
+        reassemble_message(store, 'conn-2', _chunk(2, 3, 'cd'))
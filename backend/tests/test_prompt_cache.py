@@ -0,0 +1,23 @@
+from src.services.llm_provider import apply_prompt_cache
+from src.services.prompt_service import build_system_prompt
+
+
+def test_placeholder_prompt_is_not_sent():
+    assert build_system_prompt('11') is None
+
+
+def test_cache_control_only_for_cacheable_prefix():
+    messages = [
+        {'role': 'user', 'content': '안녕'},
+        {'role': 'assistant', 'content': '안녕하세요'},
+        {'role': 'user', 'content': '질문'}
+    ]
+    system, marked = apply_prompt_cache('짧은 프롬프트', messages, min_tokens=1024)
+    assert system == '짧은 프롬프트'
+    assert marked == messages
+
+    long_system = '가' * 2048
+    system, marked = apply_prompt_cache(long_system, messages, min_tokens=1024)
+    assert system[-1]['cache_control'] == {'type': 'ephemeral'}
+    assert marked[-2]['content'][-1]['cache_control'] == {'type': 'ephemeral'}
+    assert marked[-1] == messages[-1]
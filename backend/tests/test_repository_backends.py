@@ -0,0 +1,159 @@
+"""저장소 백엔드 공통 동작 - memory, sqlite, dynamodb(테스트 대역)에서 같은 결과"""
+import pytest
+
+from src import repositories
+from src.models import Conversation, Message
+from src.models.conversation import COMPRESSION_THRESHOLD
+from src.repositories import (
+    ConversationRepository,
+    InMemoryConversationRepository,
+    SQLiteConversationRepository,
+    create_conversation_repository
+)
+
+from .dynamo_fakes import make_repository
+
+BACKENDS = ('memory', 'sqlite', 'dynamodb')
+
+
+@pytest.fixture(params=BACKENDS)
+def repository(request, tmp_path):
+    if request.param == 'memory':
+        return InMemoryConversationRepository()
+    if request.param == 'sqlite':
+        return SQLiteConversationRepository(str(tmp_path / 'conversations.db'))
+    return make_repository()
+
+
+def _conversation(conversation_id, user_id='user-1', engine_type='11', count=1):
+    return Conversation(
+        conversation_id=conversation_id,
+        user_id=user_id,
+        engine_type=engine_type,
+        messages=[
+            Message(role='user' if index % 2 == 0 else 'assistant', content=f'{conversation_id} #{index}')
+            for index in range(count)
+        ]
+    )
+
+
+def test_list_is_newest_first_and_scoped_to_user(repository):
+    for index in range(4):
+        repository.save(_conversation(f'conv-{index}', engine_type='11' if index % 2 == 0 else '22'))
+    repository.save(_conversation('conv-other', user_id='user-2'))
+
+    summaries, token = repository.find_page_by_user('user-1', limit=10)
+    assert [s.conversation_id for s in summaries] == ['conv-3', 'conv-2', 'conv-1', 'conv-0']
+    assert token is None
+    assert summaries[0].message_count == 1 and summaries[0].preview == 'conv-3 #0'
+
+    summaries, _ = repository.find_page_by_user('user-1', limit=10, engine_type='22')
+    assert [s.conversation_id for s in summaries] == ['conv-3', 'conv-1']
+
+
+def test_pages_follow_next_token(repository):
+    for index in range(5):
+        repository.save(_conversation(f'conv-{index}'))
+    repository.save(_conversation('conv-other', user_id='user-2'))
+
+    pages, token = [], None
+    while True:
+        summaries, token = repository.find_page_by_user('user-1', limit=2, next_token=token)
+        pages.append([s.conversation_id for s in summaries])
+        if token is None:
+            break
+        assert isinstance(token, str)
+
+    assert pages == [['conv-4', 'conv-3'], ['conv-2', 'conv-1'], ['conv-0']]
+
+
+def test_before_sequence_slices_older_messages(repository):
+    repository.save(_conversation('conv-long', count=6))
+
+    def sequences(**kwargs):
+        conversation = repository.find_by_id('conv-long', **kwargs)
+        return [message.sequence for message in conversation.messages]
+
+    assert sequences() == [0, 1, 2, 3, 4, 5]
+    assert sequences(message_limit=2) == [4, 5]
+    assert sequences(message_limit=2, before_sequence=4) == [2, 3]
+    assert sequences(before_sequence=1) == [0]
+    assert sequences(before_sequence=0) == []
+    assert repository.find_by_id('conv-long', message_limit=2).message_count == 6
+
+
+def test_saving_a_sliced_read_appends_after_existing_messages(repository):
+    repository.save(_conversation('conv-long', count=6))
+
+    recent = repository.find_by_id('conv-long', message_limit=2)
+    recent.messages.append(Message(role='user', content='새 질문'))
+    repository.save(recent)
+
+    conversation = repository.find_by_id('conv-long')
+    assert [message.sequence for message in conversation.messages] == list(range(7))
+    assert conversation.messages[0].content == 'conv-long #0'
+    assert conversation.messages[-1].content == '새 질문'
+
+
+def test_conversation_store_selects_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(repositories, '_shared_repositories', {})
+    monkeypatch.setenv('CONVERSATION_SQLITE_PATH', str(tmp_path / 'selected.db'))
+
+    monkeypatch.setenv('CONVERSATION_STORE', 'memory')
+    memory = create_conversation_repository()
+    assert isinstance(memory, InMemoryConversationRepository)
+    # memory/sqlite 는 프로세스 내에서 같은 인스턴스를 공유
+    assert create_conversation_repository() is memory
+
+    monkeypatch.setenv('CONVERSATION_STORE', 'SQLite')
+    sqlite = create_conversation_repository()
+    assert isinstance(sqlite, SQLiteConversationRepository)
+    assert sqlite.db_path == str(tmp_path / 'selected.db')
+
+    # 인자가 설정보다 우선
+    assert create_conversation_repository('memory') is memory
+
+    monkeypatch.setenv('CONVERSATION_STORE', 'dynamodb')
+    monkeypatch.setattr(repositories, 'ConversationRepository', make_repository)
+    assert isinstance(create_conversation_repository(), ConversationRepository)
+
+    monkeypatch.setenv('CONVERSATION_STORE', 'postgres')
+    with pytest.raises(ValueError):
+        create_conversation_repository()
+
+
+def test_compressed_content_round_trips(repository):
+    body = '긴 답변 ' * COMPRESSION_THRESHOLD
+    conversation = _conversation('conv-big')
+    conversation.messages.append(Message(role='assistant', content=body))
+    repository.save(conversation)
+
+    if isinstance(repository, ConversationRepository):
+        stored = repository.messages_table.items[('conv-big', 1)]
+        assert 'contentZ' in stored and 'content' not in stored
+
+    loaded = repository.find_by_id('conv-big')
+    assert [message.content for message in loaded.messages] == ['conv-big #0', body]
+    assert loaded.messages[1].to_dict()['content'] == body
+
+    # 압축 상태로 읽은 메시지를 다른 대화에 저장해도 본문이 그대로 옮겨진다
+    copy = _conversation('conv-copy', count=0)
+    copy.messages.append(Message.from_dict({**loaded.messages[1].to_dict(compress=True), 'sequence': None}))
+    repository.save(copy)
+    assert repository.find_by_id('conv-copy').messages[0].content == body
+
+
+def test_legacy_uncompressed_message_items_are_read_as_is():
+    repository = make_repository()
+    repository.save(_conversation('conv-legacy', count=0))
+    body = '압축 전 저장된 긴 본문 ' * COMPRESSION_THRESHOLD
+    # 압축 도입 전 형식 - 큰 본문도 평문 content, contentEncoding 없음
+    repository.messages_table.put_item(Item={
+        'conversationId': 'conv-legacy', 'sequence': 0, 'role': 'assistant', 'content': body
+    })
+    repository.table.items[('conv-legacy',)]['messageCount'] = 1
+
+    message = repository.find_by_id('conv-legacy').messages[0]
+    assert message.content == body and message.type == 'assistant'
+    # 다시 저장할 때는 압축 형식으로 기록
+    assert 'contentZ' in message.to_dict(compress=True)
@@ -0,0 +1,176 @@
+"""single-flight - 같은 요청 합치기, 리더 중단 시 팔로워, 오류 전파, 생성 ID 로 다시 붙기"""
+import asyncio
+
+import pytest
+
+from src.services.chat_stream import attach_to_client, stream_to_client
+from src.services.chunk_coalescer import ChunkCoalescer
+from src.services.generation import StopSignal
+from src.services.llm_provider import LLMProvider, LLMProviderError
+
+
+class FakeProvider(LLMProvider):
+    """테스트가 넣어 주는 델타를 스트리밍 (None 이면 종료, 예외면 그대로 발생)"""
+
+    name = 'fake'
+
+    def __init__(self):
+        super().__init__(max_retries=0, cache_prompt=False)
+        self.calls = 0
+        self.closed = False
+        self.deltas = asyncio.Queue()
+
+    def identity(self):
+        return {'provider': self.name}
+
+    async def _open(self, request):
+        self.calls += 1
+        try:
+            yield {'type': 'message_start', 'message': {'usage': {'input_tokens': 10}}}
+            while True:
+                item = await self.deltas.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield {'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': item}}
+            yield {'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'}, 'usage': {'output_tokens': 3}}
+            yield {'type': 'message_stop'}
+        finally:
+            self.closed = True
+
+
+class Client:
+    """send 함수 - 받은 청크 기록"""
+
+    def __init__(self):
+        self.chunks = []
+        self.received = asyncio.Event()
+
+    async def send(self, frame):
+        self.chunks.append(frame['chunk'])
+        self.received.set()
+
+
+MESSAGES = [{'role': 'user', 'content': 'single-flight'}]
+
+
+@pytest.fixture(autouse=True)
+def _no_response_cache(monkeypatch):
+    from src.services import chat_stream
+
+    monkeypatch.setattr(chat_stream, 'get_cached_response', lambda key: None)
+    monkeypatch.setattr(chat_stream, 'store_response', lambda *args, **kwargs: None)
+
+
+def _start(provider, client, stop=None):
+    return asyncio.ensure_future(stream_to_client(
+        client.send, provider, MESSAGES, coalescer=ChunkCoalescer(window_ms=0), stop=stop
+    ))
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_identical_requests_share_one_upstream_call():
+    async def run():
+        provider = FakeProvider()
+        leader, follower = Client(), Client()
+        first = _start(provider, leader)
+        await _settle()
+        second = _start(provider, follower)
+        await _settle()
+        for delta in ['안녕', '하세요', None]:
+            await provider.deltas.put(delta)
+        return provider, leader, follower, await first, await second
+
+    provider, leader, follower, first, second = asyncio.run(run())
+    assert provider.calls == 1
+    assert follower.chunks == leader.chunks and ''.join(leader.chunks) == '안녕하세요'
+    assert not first.shared and second.shared
+    assert first.usage == second.usage and second.stop_reason == 'end_turn'
+
+
+def test_follower_keeps_streaming_when_leader_stops():
+    async def run():
+        provider = FakeProvider()
+        leader, follower = Client(), Client()
+        stop = StopSignal('gen-leader')
+        first = _start(provider, leader, stop)
+        await _settle()
+        second = _start(provider, follower)
+        await provider.deltas.put('하나 ')
+        await leader.received.wait()
+        await follower.received.wait()
+
+        stop.stop()
+        stopped = await first
+        for delta in ['둘 ', '셋', None]:
+            await provider.deltas.put(delta)
+        return provider, leader, follower, stopped, await second
+
+    provider, leader, follower, stopped, completed = asyncio.run(run())
+    assert provider.calls == 1
+    assert stopped.stopped and leader.chunks == ['하나 ']
+    assert not completed.stopped and ''.join(follower.chunks) == '하나 둘 셋'
+
+
+def test_last_subscriber_stop_cancels_upstream():
+    async def run():
+        provider = FakeProvider()
+        client = Client()
+        stop = StopSignal('gen-only')
+        task = _start(provider, client, stop)
+        await provider.deltas.put('시작')
+        await client.received.wait()
+        stop.stop()
+        result = await task
+        await _settle()
+        return provider, result
+
+    provider, result = asyncio.run(run())
+    assert result.stopped
+    assert provider.closed
+
+
+def test_upstream_error_reaches_every_subscriber():
+    async def run():
+        provider = FakeProvider()
+        leader, follower = Client(), Client()
+        first = _start(provider, leader)
+        await _settle()
+        second = _start(provider, follower)
+        await provider.deltas.put('부분 ')
+        await leader.received.wait()
+        await follower.received.wait()
+        await provider.deltas.put(LLMProviderError('upstream failed'))
+        return provider, leader, follower, await asyncio.gather(first, second, return_exceptions=True)
+
+    provider, leader, follower, results = asyncio.run(run())
+    assert provider.calls == 1
+    assert all(isinstance(result, LLMProviderError) for result in results)
+    assert leader.chunks == follower.chunks == ['부분 ']
+
+
+def test_reconnecting_client_attaches_by_generation_id():
+    async def run():
+        provider = FakeProvider()
+        original, reconnected = Client(), Client()
+        stop = StopSignal('gen-attach')
+        first = _start(provider, original, stop)
+        await provider.deltas.put('앞부분 ')
+        await original.received.wait()
+
+        attached = asyncio.ensure_future(attach_to_client(reconnected.send, 'gen-attach', start=0))
+        await _settle()
+        await provider.deltas.put('뒷부분')
+        await provider.deltas.put(None)
+        return provider, reconnected, await first, await attached, await attach_to_client(Client().send, 'unknown')
+
+    provider, reconnected, first, attached, unknown = asyncio.run(run())
+    assert provider.calls == 1
+    assert ''.join(reconnected.chunks) == first.text == '앞부분 뒷부분'
+    assert attached.shared and attached.total_chunks == first.total_chunks
+    assert unknown is None
@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+from src.repositories.chunk_log_store import STATUS_DONE, InMemoryChunkLogStore
+from src.services.chat_stream import StreamResult
+from src.services.stream_resume import ChunkLogger
+
+
+class SlowStore(InMemoryChunkLogStore):
+    def append(self, generation_id, entries):
+        time.sleep(0.2)
+        super().append(generation_id, entries)
+
+
+def test_flush_does_not_block_send():
+    store = SlowStore()
+    chunk_log = ChunkLogger(store, 'gen-1', flush_interval=0)
+    chunk_log.start()
+    sent = []
+
+    async def send(frame):
+        sent.append(frame['chunk_index'])
+
+    async def run():
+        logged = chunk_log.wrap(send)
+        started = time.monotonic()
+        for index in range(5):
+            await logged({'type': 'ai_chunk', 'chunk': f'{index} ', 'chunk_index': index})
+        elapsed = time.monotonic() - started
+        await chunk_log.close(StreamResult(total_chunks=5))
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert elapsed < 0.1
+    assert sent == [0, 1, 2, 3, 4]
+    log = store.read('gen-1')
+    assert log['status'] == STATUS_DONE
+    assert [index for index, _ in log['entries']] == [0, 1, 2, 3, 4]
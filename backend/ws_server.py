@@ -13,14 +13,18 @@ if platform.system() == 'Windows':
 
 import json
 import websockets
-import boto3
 import logging
 
+from src.services.chat_stream import stream_to_client
+from src.services.context_builder import build_messages
+from src.services.llm_provider import get_provider
+from src.services.prompt_service import build_system_prompt
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# AWS Bedrock 클라이언트
-bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
+# 스트리밍 프로바이더 (LLM_PROVIDER 미설정 시 Bedrock)
+llm_provider = get_provider()
 
 async def handle_client(websocket, path):
     logger.info("Client connected")
@@ -34,41 +38,29 @@ async def handle_client(websocket, path):
             # AI 시작 신호
             await websocket.send(json.dumps({"type": "ai_start"}))
             
-            # Bedrock 호출
+            # LLM 스트리밍 호출
             try:
-                response = bedrock.invoke_model_with_response_stream(
-                    modelId='us.anthropic.claude-opus-4-5-20251101-v1:0',
-                    body=json.dumps({
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 4000,
-                        "messages": [{"role": "user", "content": user_message}]
-                    })
-                )
+                async def send(frame):
+                    await websocket.send(json.dumps(frame))
                 
-                chunk_index = 0
-                for event in response['body']:
-                    chunk = event.get('chunk')
-                    if chunk:
-                        chunk_data = json.loads(chunk['bytes'].decode())
-                        if chunk_data.get('type') == 'content_block_delta':
-                            delta = chunk_data.get('delta', {})
-                            if delta.get('type') == 'text_delta':
-                                text = delta.get('text', '')
-                                if text:
-                                    await websocket.send(json.dumps({
-                                        "type": "ai_chunk",
-                                        "chunk": text,
-                                        "chunk_index": chunk_index
-                                    }))
-                                    chunk_index += 1
+                engine_type = data.get('engineType')
+                system = build_system_prompt(engine_type)
+                messages = build_messages(
+                    user_message, data.get('conversationHistory'), engine_type=engine_type, system=system
+                )
+                result = await stream_to_client(
+                    send, llm_provider, messages, engine_type=engine_type, system=system
+                )
+                chunk_index = result.total_chunks
                 
                 await websocket.send(json.dumps({
                     "type": "chat_end",
-                    "total_chunks": chunk_index
+                    "total_chunks": chunk_index,
+                    "cached": result.cached
                 }))
                 
             except Exception as e:
-                logger.error(f"Bedrock error: {e}")
+                logger.error(f"LLM error: {e}")
                 await websocket.send(json.dumps({
                     "type": "error",
                     "message": str(e)
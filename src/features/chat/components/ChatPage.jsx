@@ -447,7 +447,7 @@ const ChatPage = ({
   const expectedChunkIndex = useRef(0); // 청크 순서 추적
   const [usagePercentage, setUsagePercentage] = useState(null); // 사용량 퍼센티지 - null로 시작하여 로딩 상태 표시
   const streamingTimeoutRef = useRef(null); // 스트리밍 타임아웃 추적
-  const chunkBuffer = useRef(new Map()); // 청크 버퍼 (index -> chunk 내용)
+  const chunkBuffer = useRef(new Map()); // 청크 버퍼 (첫 index -> { text, lastIndex })
   const processBufferTimeoutRef = useRef(null); // 버퍼 처리 타임아웃
   const lastUserMessageRef = useRef(null); // 마지막 사용자 메시지 추적
 
@@ -461,12 +461,12 @@ const ChatPage = ({
     let nextExpectedIndex = expectedChunkIndex.current;
     let processedChunks = [];
 
-    // 연속된 청크들을 찾아서 처리
+    // 연속된 청크들을 찾아서 처리 (합쳐진 프레임은 first_chunk_index ~ chunk_index 범위)
     while (buffer.has(nextExpectedIndex)) {
-      const chunkText = buffer.get(nextExpectedIndex);
+      const { text: chunkText, lastIndex } = buffer.get(nextExpectedIndex);
       processedChunks.push(chunkText);
       buffer.delete(nextExpectedIndex);
-      nextExpectedIndex++;
+      nextExpectedIndex = lastIndex + 1;
     }
 
     if (processedChunks.length > 0) {
@@ -674,9 +674,11 @@ const ChatPage = ({
           if (message.chunk && currentAssistantMessageId.current) {
             const chunkText = message.chunk;
             const receivedIndex = message.chunk_index || 0;
+            // 서버 송신 큐가 밀리면 여러 청크가 한 프레임으로 합쳐져 first_chunk_index ~ chunk_index 범위로 온다
+            const firstIndex = message.first_chunk_index ?? receivedIndex;
 
             // 현재 기대하는 인덱스와 일치하면 바로 처리
-            if (receivedIndex === expectedChunkIndex.current) {
+            if (firstIndex === expectedChunkIndex.current) {
               // 먼저 ref 업데이트
               const newContent = streamingContentRef.current + chunkText;
               streamingContentRef.current = newContent;
@@ -732,19 +734,19 @@ const ChatPage = ({
               
 
 
-              expectedChunkIndex.current++;
+              expectedChunkIndex.current = receivedIndex + 1;
 
               // 버퍼에 있는 다음 청크들 확인
               processChunkBuffer();
             } else {
               // 순서가 맞지 않으면 버퍼에 저장
-              console.log(`⏸️ 청크 ${receivedIndex} 버퍼에 저장:`, {
+              console.log(`⏸️ 청크 ${firstIndex} 버퍼에 저장:`, {
                 expected: expectedChunkIndex.current,
-                received: receivedIndex,
+                received: firstIndex,
                 text: chunkText,
                 bufferSize: chunkBuffer.current.size + 1,
               });
-              chunkBuffer.current.set(receivedIndex, chunkText);
+              chunkBuffer.current.set(firstIndex, { text: chunkText, lastIndex: receivedIndex });
             }
           }
           break;
@@ -41,15 +41,15 @@ export const useWebSocketChat = ({
     let nextExpectedIndex = expectedChunkIndex.current;
     let processedChunks = [];
 
-    // Find and process consecutive chunks
+    // Find and process consecutive chunks (merged frames cover first_chunk_index..chunk_index)
     while (buffer.has(nextExpectedIndex)) {
+      const { text: chunkText, lastIndex } = buffer.get(nextExpectedIndex);
       if (!processedIndices.current.has(nextExpectedIndex)) {
-        const chunkText = buffer.get(nextExpectedIndex);
         processedChunks.push(chunkText);
         processedIndices.current.add(nextExpectedIndex);
       }
       buffer.delete(nextExpectedIndex);
-      nextExpectedIndex++;
+      nextExpectedIndex = lastIndex + 1;
     }
 
     if (processedChunks.length > 0) {
@@ -137,11 +137,13 @@ export const useWebSocketChat = ({
           }
           
           const chunkText = message.chunk;
+          // A frame merged by the server under backpressure carries first_chunk_index..chunk_index
           const receivedIndex = message.chunk_index || 0;
+          const firstIndex = message.first_chunk_index ?? receivedIndex;
 
           // Process chunk immediately if it matches expected index
-          if (receivedIndex === expectedChunkIndex.current && !processedIndices.current.has(receivedIndex)) {
-            processedIndices.current.add(receivedIndex);
+          if (firstIndex === expectedChunkIndex.current && !processedIndices.current.has(firstIndex)) {
+            processedIndices.current.add(firstIndex);
             
             setStreamingContent((prev) => {
               const newContent = prev + chunkText;
@@ -149,7 +151,7 @@ export const useWebSocketChat = ({
               return newContent;
             });
             
-            expectedChunkIndex.current++;
+            expectedChunkIndex.current = receivedIndex + 1;
             processChunkBuffer();
             
             return {
@@ -159,7 +161,7 @@ export const useWebSocketChat = ({
             };
           } else {
             // Store in buffer if out of order
-            chunkBuffer.current.set(receivedIndex, chunkText);
+            chunkBuffer.current.set(firstIndex, { text: chunkText, lastIndex: receivedIndex });
           }
         }
         break;